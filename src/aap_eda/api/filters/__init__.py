@@ -16,6 +16,7 @@ from .activation import (
     ActivationFilter,
     ActivationInstanceFilter,
     ActivationInstanceLogFilter,
+    RulebookProcessLogSearchFilter,
 )
 from .credential_type import CredentialTypeFilter
 from .decision_environment import DecisionEnvironmentFilter
@@ -41,6 +42,7 @@ __all__ = (
     "ActivationInstanceFilter",
     "ActivationFilter",
     "ActivationInstanceLogFilter",
+    "RulebookProcessLogSearchFilter",
     # user
     "UserFilter",
     # organization
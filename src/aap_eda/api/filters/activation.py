@@ -66,3 +66,38 @@ class ActivationInstanceLogFilter(django_filters.FilterSet):
     class Meta:
         model = models.RulebookProcessLog
         fields = ["log"]
+
+
+class RulebookProcessLogSearchFilter(django_filters.FilterSet):
+    # Shorter patterns have no trigram to look up in the index
+    log = django_filters.CharFilter(
+        field_name="log",
+        lookup_expr="icontains",
+        required=True,
+        min_length=3,
+        label="Filter by log, at least 3 characters.",
+    )
+    activation_instance_id = django_filters.NumberFilter(
+        field_name="activation_instance_id",
+        lookup_expr="exact",
+        label="Filter by activation instance ID.",
+    )
+    log_timestamp_after = django_filters.NumberFilter(
+        field_name="log_timestamp",
+        lookup_expr="gte",
+        label="Filter by log timestamp, in seconds since the epoch.",
+    )
+    log_timestamp_before = django_filters.NumberFilter(
+        field_name="log_timestamp",
+        lookup_expr="lt",
+        label="Filter by log timestamp, in seconds since the epoch.",
+    )
+
+    class Meta:
+        model = models.RulebookProcessLog
+        fields = [
+            "log",
+            "activation_instance_id",
+            "log_timestamp_after",
+            "log_timestamp_before",
+        ]
@@ -11,8 +11,18 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import base64
+import binascii
+import datetime
+import json
+import typing as tp
+import uuid
 
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q, QuerySet
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.utils.urls import remove_query_param, replace_query_param
 
@@ -94,3 +104,200 @@ class DefaultPagination(pagination.PageNumberPagination):
                 "results": schema,
             },
         }
+
+
+def _cursor_value(value: tp.Any) -> tp.Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """Return the number of rows of a queryset estimated by the planner."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(DefaultPagination):
+    """Page number pagination, keyset pagination when asked for.
+
+    Views opt in by setting keyset_ordering, the fields ordering their
+    rows, the last being unique. A request with the cursor query
+    parameter, empty for the first page, gets the page following the
+    position encoded in the cursor, found by comparing the keys instead
+    of counting and skipping the rows before it. Views setting
+    keyset_default use keyset pagination without the cursor parameter
+    too. The count is null, unless count=estimated asks for the estimate
+    of the planner.
+    """
+
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, "keyset_ordering", None)
+        self.keyset = bool(ordering) and (
+            self.cursor_query_param in request.query_params
+            or getattr(view, "keyset_default", False)
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.ordering = tuple(ordering)
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self._decode_cursor(
+            request.query_params.get(self.cursor_query_param, "")
+        )
+        self.count = (
+            estimate_count(queryset)
+            if request.query_params.get(self.count_query_param) == "estimated"
+            else None
+        )
+
+        if self.reverse:
+            queryset = queryset.order_by(*self._inverted(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.position is not None:
+            try:
+                queryset = queryset.filter(
+                    self._after(self.position, not self.reverse)
+                )
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        self.results = results
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "page_size": self.page_size,
+                "page": None,
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        if self.results:
+            return self._link(self._position_of(self.results[-1]), False)
+        return self._link(self.position, False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        if self.results:
+            return self._link(self._position_of(self.results[0]), True)
+        return self._link(self.position, True)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if not getattr(view, "keyset_ordering", None):
+            return parameters
+        return parameters + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Use keyset pagination from the position of the "
+                    "cursor, empty for the first page"
+                ),
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "With keyset pagination, return an estimated count"
+                ),
+                "schema": {"type": "string", "enum": ["estimated"]},
+            },
+        ]
+
+    @staticmethod
+    def _inverted(ordering: tuple[str, ...]) -> list[str]:
+        return [
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in ordering
+        ]
+
+    def _after(self, position: list, forward: bool) -> Q:
+        """Match the rows after the position, before it if not forward."""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") == forward else "gt"
+            term = Q(**{f"{name}__{lookup}": position[i]})
+            for previous, value in zip(self.ordering[:i], position):
+                term &= Q(**{previous.lstrip("-"): value})
+            condition |= term
+        return condition
+
+    def _position_of(self, item) -> list:
+        return [
+            _cursor_value(getattr(item, field.lstrip("-")))
+            for field in self.ordering
+        ]
+
+    def _encode_cursor(self, position: list, reverse: bool) -> str:
+        data = json.dumps({"p": position, "r": int(reverse)})
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def _decode_cursor(self, cursor: str) -> tuple[tp.Optional[list], bool]:
+        if not cursor:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position = data["p"]
+            reverse = bool(data["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+            or not all(isinstance(v, (str, int)) for v in position)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _link(self, position: list, reverse: bool) -> str:
+        url = remove_query_param(
+            self.request.get_full_path(), self.page_query_param
+        )
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self._encode_cursor(position, reverse),
+        )
@@ -13,6 +13,9 @@
 #  limitations under the License.
 
 from .activation import (
+    ActivationBulkActionSerializer,
+    ActivationBulkResultSerializer,
+    ActivationBulkStatusSerializer,
     ActivationCopySerializer,
     ActivationCreateSerializer,
     ActivationInstanceLogSerializer,
@@ -107,6 +110,9 @@ __all__ = (
     "ActivationUpdateSerializer",
     "ActivationReadSerializer",
     "ActivationCopySerializer",
+    "ActivationBulkActionSerializer",
+    "ActivationBulkResultSerializer",
+    "ActivationBulkStatusSerializer",
     "ActivationInstanceSerializer",
     "ActivationInstanceLogSerializer",
     "PostActivationSerializer",
@@ -20,6 +20,7 @@ from typing import Optional
 
 import yaml
 from django.conf import settings
+from django.db.models import Prefetch, QuerySet
 from django.utils import timezone
 from rest_framework import serializers
 
@@ -31,8 +32,14 @@ from aap_eda.api.exceptions import InvalidEventStreamSource
 from aap_eda.api.serializers.decision_environment import (
     DecisionEnvironmentRefSerializer,
 )
-from aap_eda.api.serializers.eda_credential import EdaCredentialSerializer
-from aap_eda.api.serializers.event_stream import EventStreamOutSerializer
+from aap_eda.api.serializers.eda_credential import (
+    EDA_CREDENTIAL_RELATED,
+    EdaCredentialSerializer,
+)
+from aap_eda.api.serializers.event_stream import (
+    EVENT_STREAM_RELATED,
+    EventStreamOutSerializer,
+)
 from aap_eda.api.serializers.fields.basic_user import BasicUserFieldSerializer
 from aap_eda.api.serializers.fields.yaml import YAMLSerializerField
 from aap_eda.api.serializers.organization import OrganizationRefSerializer
@@ -45,7 +52,11 @@ from aap_eda.api.serializers.rulebook import RulebookRefSerializer
 from aap_eda.api.serializers.user import BasicUserSerializer
 from aap_eda.api.vault import encrypt_string
 from aap_eda.core import models, validators
-from aap_eda.core.enums import DefaultCredentialType, ProcessParentType
+from aap_eda.core.enums import (
+    Action,
+    DefaultCredentialType,
+    ProcessParentType,
+)
 from aap_eda.core.exceptions import ParseError
 from aap_eda.core.utils.credentials import get_secret_fields
 from aap_eda.core.utils.k8s_service_name import create_k8s_service_name
@@ -301,6 +312,26 @@ class ActivationSerializer(serializers.ModelSerializer):
         ]
 
 
+def prefetch_activation_list(queryset: QuerySet) -> QuerySet:
+    """Load the objects read by ActivationListSerializer along."""
+    return queryset.select_related(
+        "created_by", "modified_by", "edited_by"
+    ).prefetch_related(
+        Prefetch(
+            "eda_credentials",
+            queryset=models.EdaCredential.objects.select_related(
+                *EDA_CREDENTIAL_RELATED
+            ),
+        ),
+        Prefetch(
+            "event_streams",
+            queryset=models.EventStream.objects.select_related(
+                *EVENT_STREAM_RELATED
+            ),
+        ),
+    )
+
+
 class ActivationListSerializer(serializers.ModelSerializer):
     """Serializer for listing the Activation model objects."""
 
@@ -373,17 +404,20 @@ class ActivationListSerializer(serializers.ModelSerializer):
         rules_count, rules_fired_count = get_rules_count(
             activation.ruleset_stats
         )
+        # Filtered here to use the credentials prefetched
         eda_credentials = [
             EdaCredentialSerializer(credential).data
-            for credential in activation.eda_credentials.filter(managed=False)
+            for credential in activation.eda_credentials.all()
+            if not credential.managed
         ]
         extra_var = (
             replace_vault_data(activation.extra_var)
             if activation.extra_var
             else None
         )
+        # The context shares the pending statistics across the list
         event_streams = [
-            EventStreamOutSerializer(event_stream).data
+            EventStreamOutSerializer(event_stream, context=self.context).data
             for event_stream in activation.event_streams.all()
         ]
 
@@ -812,6 +846,68 @@ class ActivationInstanceSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "started_at", "ended_at"]
 
 
+class ActivationBulkFilterSerializer(serializers.Serializer):
+    name = serializers.CharField(required=False)
+    status = serializers.CharField(required=False)
+    decision_environment_id = serializers.IntegerField(required=False)
+
+
+class ActivationBulkActionSerializer(serializers.Serializer):
+    """Serializer for an action on many activations."""
+
+    action = serializers.ChoiceField(
+        choices=[
+            Action.ENABLE.value,
+            Action.DISABLE.value,
+            Action.RESTART.value,
+        ],
+        help_text="The action to perform on the activations",
+    )
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        help_text="The IDs of the activations",
+    )
+    filter = ActivationBulkFilterSerializer(
+        required=False,
+        help_text="Select the activations as the activation list does",
+    )
+
+    def validate(self, data):
+        if ("ids" in data) == ("filter" in data):
+            raise serializers.ValidationError(
+                "Exactly one of ids or filter is required."
+            )
+        return data
+
+
+class ActivationBulkSkippedSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    reason = serializers.CharField()
+
+
+class ActivationBulkResultSerializer(serializers.Serializer):
+    """Serializer for the result of an action on many activations."""
+
+    id = serializers.CharField(
+        help_text="The request ID of the action, to track its progress"
+    )
+    action = serializers.CharField()
+    accepted = serializers.ListField(
+        child=serializers.IntegerField(),
+        help_text="The IDs of the activations the action is requested for",
+    )
+    skipped = ActivationBulkSkippedSerializer(many=True)
+
+
+class ActivationBulkStatusSerializer(serializers.Serializer):
+    id = serializers.CharField()
+    pending = serializers.IntegerField(
+        help_text="The number of activation requests not processed yet"
+    )
+
+
 class ActivationInstanceLogSerializer(serializers.ModelSerializer):
     """Serializer for the Activation Instance Log model."""
 
@@ -40,6 +40,15 @@ class EdaCredentialReferenceSerializer(serializers.Serializer):
     )
 
 
+# Related objects read by EdaCredentialSerializer
+EDA_CREDENTIAL_RELATED = (
+    "credential_type",
+    "organization",
+    "created_by",
+    "modified_by",
+)
+
+
 @extend_schema_field(EdaCredentialReferenceSerializer(many=True))
 class EdaCredentialReferenceField(serializers.JSONField):
     pass
@@ -11,9 +11,11 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import logging
 from typing import Optional
 from urllib.parse import urljoin
 
+import redis
 import yaml
 from django.conf import settings
 from django.urls import reverse
@@ -24,6 +26,18 @@ from aap_eda.api.serializers.fields.basic_user import BasicUserFieldSerializer
 from aap_eda.api.serializers.organization import OrganizationRefSerializer
 from aap_eda.api.serializers.user import BasicUserSerializer
 from aap_eda.core import enums, models, validators
+from aap_eda.services.event_stream_stats import pending_event_stream_ids
+
+logger = logging.getLogger(__name__)
+
+# Related objects read by EventStreamOutSerializer
+EVENT_STREAM_RELATED = (
+    "owner",
+    "organization",
+    "eda_credential__credential_type",
+    "created_by",
+    "modified_by",
+)
 
 
 class EventStreamInSerializer(serializers.ModelSerializer):
@@ -84,6 +98,12 @@ class EventStreamOutSerializer(serializers.ModelSerializer):
         required=True, allow_null=False
     )
     url = serializers.SerializerMethodField()
+    stats_pending = serializers.SerializerMethodField(
+        help_text=(
+            "Whether events were received that are not yet reflected in "
+            "events_received and last_event_received_at"
+        )
+    )
     created_by = BasicUserFieldSerializer()
     modified_by = BasicUserFieldSerializer()
 
@@ -101,6 +121,7 @@ class EventStreamOutSerializer(serializers.ModelSerializer):
             "test_headers",
             "events_received",
             "last_event_received_at",
+            "stats_pending",
         ]
         fields = [
             "name",
@@ -124,6 +145,20 @@ class EventStreamOutSerializer(serializers.ModelSerializer):
             return urljoin(settings.EVENT_STREAM_MTLS_BASE_URL, path)
         return urljoin(settings.EVENT_STREAM_BASE_URL, path)
 
+    def get_stats_pending(self, obj) -> bool:
+        # Shared by all the event streams of a list
+        if "pending_event_stream_ids" not in self.context:
+            try:
+                pending = pending_event_stream_ids()
+            except redis.exceptions.RedisError as e:
+                logger.warning(
+                    "Failed to read pending event stream statistics: %s",
+                    str(e),
+                )
+                pending = set()
+            self.context["pending_event_stream_ids"] = pending
+        return obj.id in self.context["pending_event_stream_ids"]
+
     def get_owner(self, obj) -> str:
         if obj.owner:
             return f"{obj.owner.username}"
@@ -103,6 +103,11 @@ eda_v1_urls = [
         name="token-refresh",
     ),
     path("users/me/", views.CurrentUserView.as_view(), name="current-user"),
+    path(
+        "external_event_stream/<str:pk>/post/async/",
+        views.AsyncExternalEventStreamView.as_view(),
+        name="external_event_stream-async-post",
+    ),
     *router.urls,
 ]
 
@@ -12,11 +12,14 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import logging
+import uuid
+from typing import List, Set
 
 import redis
 from ansible_base.rbac.api.related import check_related_permissions
 from ansible_base.rbac.models import RoleDefinition
 from django.db import transaction
+from django.db.models.functions import Now
 from django.forms import model_to_dict
 from django_filters import rest_framework as defaultfilters
 from drf_spectacular.utils import (
@@ -30,12 +33,23 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from aap_eda.api import exceptions as api_exc, filters, serializers
-from aap_eda.api.serializers.activation import is_activation_valid
+from aap_eda.api.pagination import KeysetPagination
+from aap_eda.api.serializers.activation import (
+    is_activation_valid,
+    prefetch_activation_list,
+)
 from aap_eda.core import models
-from aap_eda.core.enums import Action, ActivationStatus, ProcessParentType
+from aap_eda.core.enums import (
+    ACTIVATION_STATUS_MESSAGE_MAP,
+    Action,
+    ActivationRequest,
+    ActivationStatus,
+    ProcessParentType,
+)
 from aap_eda.core.utils import logging_utils
 from aap_eda.tasks.orchestrator import (
     delete_rulebook_process,
+    request_rulebook_processes,
     restart_rulebook_process,
     start_rulebook_process,
     stop_rulebook_process,
@@ -274,12 +288,12 @@ class ActivationViewSet(
         },
     )
     def list(self, request):
-        activations = self.filter_queryset(self.get_queryset())
-
-        serializer = serializers.ActivationListSerializer(
-            activations, many=True
+        activations = self.filter_queryset(
+            prefetch_activation_list(self.get_queryset())
         )
-        result = self.paginate_queryset(serializer.data)
+
+        result = self.paginate_queryset(activations)
+        serializer = serializers.ActivationListSerializer(result, many=True)
 
         logger.info(
             logging_utils.generate_simple_audit_log(
@@ -290,7 +304,7 @@ class ActivationViewSet(
                 "*",
             )
         )
-        return self.get_paginated_response(result)
+        return self.get_paginated_response(serializer.data)
 
     @extend_schema(
         description="List all instances for the Activation",
@@ -573,6 +587,275 @@ class ActivationViewSet(
             status=status.HTTP_201_CREATED,
         )
 
+    @extend_schema(
+        description=(
+            "Enable, disable or restart many activations at once. The "
+            "activations are selected by their IDs or by the filters of "
+            "the activation list. The requests are processed in the "
+            "background and can be tracked with the returned ID."
+        ),
+        request=serializers.ActivationBulkActionSerializer,
+        responses={
+            status.HTTP_202_ACCEPTED: OpenApiResponse(
+                serializers.ActivationBulkResultSerializer,
+                description="The action has been requested.",
+            ),
+        }
+        | RedisDependencyMixin.redis_unavailable_response(),
+    )
+    @action(methods=["post"], detail=False, url_path="bulk", rbac_action=None)
+    def bulk(self, request):
+        serializer = serializers.ActivationBulkActionSerializer(
+            data=request.data
+        )
+        serializer.is_valid(raise_exception=True)
+        bulk_action = serializer.validated_data["action"]
+
+        queryset = models.Activation.access_qs(request.user).prefetch_related(
+            "eda_credentials", "event_streams"
+        )
+        if "ids" in serializer.validated_data:
+            ids = serializer.validated_data["ids"]
+            activations = list(queryset.filter(id__in=ids))
+            found = {activation.id for activation in activations}
+            skipped = [
+                {"id": id, "reason": "Activation not found."}
+                for id in dict.fromkeys(ids)
+                if id not in found
+            ]
+        else:
+            filterset = filters.ActivationFilter(
+                data=serializer.validated_data["filter"],
+                queryset=queryset,
+                request=request,
+            )
+            if not filterset.is_valid():
+                raise exceptions.ValidationError(filterset.errors)
+            activations = list(filterset.qs)
+            skipped = []
+
+        # The permission of the action is checked on each activation, the
+        # ones the user can see but not act on are skipped
+        permitted = set(
+            models.Activation.access_qs(request.user, bulk_action)
+            .filter(id__in=[activation.id for activation in activations])
+            .values_list("id", flat=True)
+        )
+        for activation in activations:
+            if activation.id not in permitted:
+                skipped.append(
+                    {
+                        "id": activation.id,
+                        "reason": "You do not have permission to "
+                        f"{bulk_action} the activation.",
+                    }
+                )
+        activations = [
+            activation
+            for activation in activations
+            if activation.id in permitted
+        ]
+
+        # Redis must be available in order to perform the action.
+        self.redis_is_available()
+
+        request_id = str(uuid.uuid4())
+        if bulk_action == Action.ENABLE:
+            accepted = self._bulk_enable(activations, skipped, request_id)
+        elif bulk_action == Action.DISABLE:
+            accepted = self._bulk_disable(activations, skipped, request_id)
+        else:
+            accepted = self._bulk_restart(activations, skipped, request_id)
+
+        for activation in activations:
+            if activation.id in accepted:
+                logger.info(
+                    logging_utils.generate_simple_audit_log(
+                        bulk_action.capitalize(),
+                        resource_name,
+                        activation.name,
+                        activation.id,
+                        activation.organization,
+                    )
+                )
+
+        return Response(
+            serializers.ActivationBulkResultSerializer(
+                {
+                    "id": request_id,
+                    "action": bulk_action,
+                    "accepted": sorted(accepted),
+                    "skipped": skipped,
+                }
+            ).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @extend_schema(
+        description="Track an action on many activations.",
+        request=None,
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                serializers.ActivationBulkStatusSerializer,
+            ),
+        },
+    )
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path=r"bulk/(?P<bulk_id>[0-9a-f-]+)",
+        rbac_action=Action.READ,
+    )
+    def bulk_status(self, request, bulk_id):
+        pending = models.ActivationRequestQueue.objects.filter(
+            request_id=bulk_id,
+            process_parent_type=ProcessParentType.ACTIVATION,
+            process_parent_id__in=models.Activation.access_ids_qs(
+                request.user
+            ),
+        ).count()
+        return Response(
+            serializers.ActivationBulkStatusSerializer(
+                {"id": bulk_id, "pending": pending}
+            ).data
+        )
+
+    def _bulk_enable(
+        self, activations: List[models.Activation], skipped, request_id
+    ) -> Set[int]:
+        accepted = set()
+        for activation in activations:
+            if activation.is_enabled:
+                skipped.append(
+                    {
+                        "id": activation.id,
+                        "reason": "Activation is already enabled.",
+                    }
+                )
+            elif activation.status in [
+                ActivationStatus.STARTING,
+                ActivationStatus.STOPPING,
+                ActivationStatus.DELETING,
+                ActivationStatus.RUNNING,
+                ActivationStatus.UNRESPONSIVE,
+            ]:
+                skipped.append(
+                    {
+                        "id": activation.id,
+                        "reason": "Activation not enabled due to current "
+                        "activation status",
+                    }
+                )
+            elif self._bulk_is_valid(activation, skipped, Action.ENABLE):
+                accepted.add(activation.id)
+
+        if accepted:
+            with transaction.atomic():
+                models.Activation.objects.filter(id__in=accepted).update(
+                    is_enabled=True,
+                    failure_count=0,
+                    status=ActivationStatus.PENDING,
+                    status_message=ACTIVATION_STATUS_MESSAGE_MAP[
+                        ActivationStatus.PENDING
+                    ],
+                    modified_at=Now(),
+                )
+                request_rulebook_processes(
+                    ProcessParentType.ACTIVATION,
+                    sorted(accepted),
+                    ActivationRequest.START,
+                    request_id,
+                )
+        return accepted
+
+    def _bulk_disable(
+        self, activations: List[models.Activation], skipped, request_id
+    ) -> Set[int]:
+        accepted = set()
+        for activation in activations:
+            if activation.status == ActivationStatus.DELETING:
+                skipped.append(
+                    {"id": activation.id, "reason": "Object is being deleted"}
+                )
+            elif not activation.is_enabled:
+                skipped.append(
+                    {
+                        "id": activation.id,
+                        "reason": "Activation is already disabled.",
+                    }
+                )
+            else:
+                accepted.add(activation.id)
+
+        if accepted:
+            with transaction.atomic():
+                models.Activation.objects.filter(id__in=accepted).update(
+                    is_enabled=False,
+                    status=ActivationStatus.STOPPING,
+                    status_message=ACTIVATION_STATUS_MESSAGE_MAP[
+                        ActivationStatus.STOPPING
+                    ],
+                    modified_at=Now(),
+                )
+                request_rulebook_processes(
+                    ProcessParentType.ACTIVATION,
+                    sorted(accepted),
+                    ActivationRequest.STOP,
+                    request_id,
+                )
+        return accepted
+
+    def _bulk_restart(
+        self, activations: List[models.Activation], skipped, request_id
+    ) -> Set[int]:
+        accepted = set()
+        invalid = []
+        for activation in activations:
+            if activation.status == ActivationStatus.DELETING:
+                skipped.append(
+                    {"id": activation.id, "reason": "Object is being deleted"}
+                )
+            elif not activation.is_enabled:
+                skipped.append(
+                    {
+                        "id": activation.id,
+                        "reason": "Activation is disabled and cannot be run.",
+                    }
+                )
+            elif self._bulk_is_valid(activation, skipped, Action.RESTART):
+                accepted.add(activation.id)
+            else:
+                invalid.append(activation.id)
+
+        # Invalid activations are stopped, like by the restart action
+        if invalid:
+            request_rulebook_processes(
+                ProcessParentType.ACTIVATION,
+                invalid,
+                ActivationRequest.STOP,
+                request_id,
+            )
+        if accepted:
+            request_rulebook_processes(
+                ProcessParentType.ACTIVATION,
+                sorted(accepted),
+                ActivationRequest.RESTART,
+                request_id,
+            )
+        return accepted
+
+    def _bulk_is_valid(
+        self, activation: models.Activation, skipped, bulk_action: str
+    ) -> bool:
+        valid, error = is_activation_valid(activation)
+        if not valid:
+            activation.status = ActivationStatus.ERROR
+            activation.status_message = error
+            activation.save(update_fields=["status", "status_message"])
+            logger.error(f"Failed to {bulk_action} {activation.name}: {error}")
+            skipped.append({"id": activation.id, "reason": error})
+        return valid
+
     def _check_deleting(self, activation):
         if activation.status == ActivationStatus.DELETING:
             raise exceptions.APIException(
@@ -605,6 +888,9 @@ class ActivationInstanceViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = serializers.ActivationInstanceSerializer
     filter_backends = (defaultfilters.DjangoFilterBackend,)
     filterset_class = filters.ActivationInstanceFilter
+    pagination_class = KeysetPagination
+    keyset_ordering = None
+    keyset_default = False
     rbac_action = None
 
     def filter_queryset(self, queryset):
@@ -635,6 +921,7 @@ class ActivationInstanceViewSet(viewsets.ReadOnlyModelViewSet):
         detail=False,
         queryset=models.RulebookProcessLog.objects.order_by("id"),
         filterset_class=filters.ActivationInstanceLogFilter,
+        keyset_ordering=("id",),
         rbac_action=Action.READ,
         url_path="(?P<id>[^/.]+)/logs",
     )
@@ -661,3 +948,40 @@ class ActivationInstanceViewSet(viewsets.ReadOnlyModelViewSet):
             results, many=True
         )
         return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        description=(
+            "Search the logs of all the Activation Instances, newest first. "
+            "The results are paged by cursor, the count is only estimated "
+            "when asked for."
+        ),
+        request=None,
+        responses={
+            status.HTTP_200_OK: serializers.ActivationInstanceLogSerializer(
+                many=True
+            )
+        },
+    )
+    @action(
+        detail=False,
+        queryset=models.RulebookProcessLog.objects.order_by("-id"),
+        filterset_class=filters.RulebookProcessLogSearchFilter,
+        # Counting and skipping all the matches would be as slow as the
+        # search without index
+        keyset_ordering=("-id",),
+        keyset_default=True,
+        rbac_action=Action.READ,
+        url_path="logs",
+    )
+    def search_logs(self, request):
+        logs = models.RulebookProcessLog.objects.filter(
+            activation_instance__in=models.RulebookProcess.access_qs(
+                request.user
+            )
+        ).order_by("-id")
+        logs = self.filter_queryset(logs)
+        results = self.paginate_queryset(logs)
+        serializer = serializers.ActivationInstanceLogSerializer(
+            results, many=True
+        )
+        return self.get_paginated_response(serializer.data)
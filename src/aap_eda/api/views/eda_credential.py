@@ -31,7 +31,10 @@ from rest_framework.response import Response
 
 from aap_eda.analytics.utils import get_analytics_interval_if_exist
 from aap_eda.api import exceptions, filters, serializers
-from aap_eda.api.serializers.eda_credential import get_references
+from aap_eda.api.serializers.eda_credential import (
+    EDA_CREDENTIAL_RELATED,
+    get_references,
+)
 from aap_eda.core import models
 from aap_eda.core.enums import Action
 from aap_eda.core.utils.credentials import (
@@ -155,15 +158,18 @@ class EdaCredentialViewSet(
         },
     )
     def list(self, request):
-        credentials = self.get_queryset().exclude(managed=True)
+        credentials = (
+            self.get_queryset()
+            .exclude(managed=True)
+            .select_related(*EDA_CREDENTIAL_RELATED)
+            .order_by("id")
+        )
         credentials = self.filter_queryset(credentials)
 
-        serializer = serializers.EdaCredentialSerializer(
-            credentials, many=True
-        )
-        result = self.paginate_queryset(serializer.data)
+        result = self.paginate_queryset(credentials)
+        serializer = serializers.EdaCredentialSerializer(result, many=True)
 
-        return self.get_paginated_response(result)
+        return self.get_paginated_response(serializer.data)
 
     @extend_schema(
         description="Partial update of an EDA credential",
@@ -29,6 +29,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from aap_eda.api import exceptions as api_exc, filters, serializers
+from aap_eda.api.serializers.activation import prefetch_activation_list
+from aap_eda.api.serializers.event_stream import EVENT_STREAM_RELATED
 from aap_eda.core import models
 from aap_eda.core.enums import ResourceType
 from aap_eda.core.utils import logging_utils
@@ -134,12 +136,12 @@ class EventStreamViewSet(
         },
     )
     def list(self, request, *args, **kwargs):
-        event_streams = models.EventStream.objects.all()
+        event_streams = models.EventStream.objects.select_related(
+            *EVENT_STREAM_RELATED
+        ).order_by("id")
         event_streams = self.filter_queryset(event_streams)
-        serializer = serializers.EventStreamOutSerializer(
-            event_streams, many=True
-        )
-        result = self.paginate_queryset(serializer.data)
+        result = self.paginate_queryset(event_streams)
+        serializer = serializers.EventStreamOutSerializer(result, many=True)
 
         logger.info(
             logging_utils.generate_simple_audit_log(
@@ -150,7 +152,7 @@ class EventStreamViewSet(
                 "*",
             )
         )
-        return self.get_paginated_response(result)
+        return self.get_paginated_response(serializer.data)
 
     @extend_schema(
         request=serializers.EventStreamInSerializer,
@@ -291,7 +293,7 @@ class EventStreamViewSet(
             )
 
         event_stream = models.EventStream.objects.get(id=id)
-        activations = event_stream.activations.all()
+        activations = prefetch_activation_list(event_stream.activations.all())
 
         filtered_activations = self.filter_queryset(activations)
         result = self.paginate_queryset(filtered_activations)
@@ -13,20 +13,27 @@
 #  limitations under the License.
 """Module providing external event stream post."""
 
-import datetime
+import json
 import logging
+import typing as tp
 import urllib.parse
 
 import yaml
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import transaction
-from django.db.models import F
+from django.http import HttpResponse, JsonResponse
 from django.http.request import HttpHeaders
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from drf_spectacular.utils import extend_schema
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import AuthenticationFailed, ParseError
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    ParseError,
+)
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
@@ -42,22 +49,28 @@ from aap_eda.api.event_stream_authentication import (
 from aap_eda.core.enums import Action, EventStreamAuthType, ResourceType
 from aap_eda.core.exceptions import PGNotifyError
 from aap_eda.core.models import EventStream
-from aap_eda.services.pg_notify import PGNotify
+from aap_eda.services.event_stream_cache import (
+    get_event_stream,
+    load_event_stream,
+    lookup_event_stream,
+)
+from aap_eda.services.event_stream_stats import record_event
+from aap_eda.services.pg_notify import AsyncPGNotify, PGNotify
 
 logger = logging.getLogger(__name__)
 
+# Authentication types which call out to an external service
+BLOCKING_AUTH_TYPES = (
+    EventStreamAuthType.OAUTH2,
+    EventStreamAuthType.OAUTH2JWT,
+)
 
-class ExternalEventStreamViewSet(viewsets.GenericViewSet):
-    """External Event Stream View Set."""
+# Bodies of these media types are parsed as JSON rather than YAML
+JSON_MEDIA_TYPES = ("application/json", "text/json")
 
-    rbac_action = None
-    rbac_resource_type = ResourceType.EVENT_STREAM
-    permission_classes = [AllowAny]
-    authentication_classes = []
 
-    def get_rbac_permission(self):
-        """RBAC Permissions."""
-        return ResourceType.EVENT_STREAM, Action.READ
+class ExternalEventStreamMixin:
+    """Request handling shared by the sync and async event stream posts."""
 
     def __init__(self, *args, **kwargs):
         self.event_stream = None
@@ -74,21 +87,17 @@ class ExternalEventStreamViewSet(viewsets.GenericViewSet):
             "The event stream: %s is currently in test mode",
             self.event_stream.name,
         )
-        self.event_stream.test_error_message = error_message
-        self.event_stream.test_content_type = content_type
-        self.event_stream.test_content = content
-        self.event_stream.test_headers = headers
-        self.event_stream.save(
-            update_fields=[
-                "test_content_type",
-                "test_content",
-                "test_headers",
-                "test_error_message",
-            ]
+        # The event stream is a cached snapshot, update the row directly
+        EventStream.objects.filter(pk=self.event_stream.id).update(
+            test_error_message=error_message,
+            test_content_type=content_type,
+            test_content=content,
+            test_headers=headers,
         )
 
     def _parse_body(self, content_type: str, body: bytes) -> dict:
-        if content_type == "application/x-www-form-urlencoded":
+        media_type = content_type.split(";")[0].strip().lower()
+        if media_type == "application/x-www-form-urlencoded":
             try:
                 data = urllib.parse.parse_qs(
                     body.decode(), strict_parsing=True
@@ -97,13 +106,20 @@ class ExternalEventStreamViewSet(viewsets.GenericViewSet):
                 message = f"Invalid content. Type: {content_type}"
                 logger.error(message)
                 raise ParseError(message) from exc
-        else:
+            return data
+
+        if media_type in JSON_MEDIA_TYPES or media_type.endswith("+json"):
             try:
-                data = yaml.safe_load(body.decode())
-            except yaml.YAMLError as exc:
-                message = f"Invalid content. Type: {content_type}"
-                logger.error(message)
-                raise ParseError(message) from exc
+                return json.loads(body)
+            except ValueError:
+                # Some senders are lax about JSON, YAML accepts more
+                pass
+        try:
+            data = yaml.safe_load(body.decode())
+        except (yaml.YAMLError, UnicodeDecodeError) as exc:
+            message = f"Invalid content. Type: {content_type}"
+            logger.error(message)
+            raise ParseError(message) from exc
         return data
 
     def _create_payload(
@@ -129,119 +145,34 @@ class ExternalEventStreamViewSet(viewsets.GenericViewSet):
             },
         }
 
-    @transaction.atomic
     def _update_stats(self):
-        self.event_stream.events_received = F("events_received") + 1
-        self.event_stream.last_event_received_at = datetime.datetime.now(
-            tz=datetime.timezone.utc
-        )
-        self.event_stream.save(
-            update_fields=[
-                "events_received",
-                "last_event_received_at",
-            ]
-        )
-
-    def _handle_auth(self, request, inputs):
-        try:
-            if inputs["auth_type"] == EventStreamAuthType.HMAC:
-                obj = HMACAuthentication(
-                    signature_encoding=inputs["signature_encoding"],
-                    signature_prefix=inputs.get("signature_prefix", ""),
-                    signature=request.headers[inputs["http_header_key"]],
-                    hash_algorithm=inputs["hash_algorithm"],
-                    secret=inputs["secret"].encode("utf-8"),
-                )
-                obj.authenticate(request.body)
-            elif inputs["auth_type"] == EventStreamAuthType.MTLS:
-                obj = MTLSAuthentication(
-                    subject=inputs.get("subject", ""),
-                    value=request.headers[inputs["http_header_key"]],
-                )
-                obj.authenticate()
-            elif inputs["auth_type"] == EventStreamAuthType.TOKEN:
-                obj = TokenAuthentication(
-                    token=inputs["token"],
-                    value=request.headers[inputs["http_header_key"]],
-                )
-                obj.authenticate()
-            elif inputs["auth_type"] == EventStreamAuthType.BASIC:
-                obj = BasicAuthentication(
-                    password=inputs["password"],
-                    username=inputs["username"],
-                    authorization=request.headers[inputs["http_header_key"]],
-                )
-                obj.authenticate()
-            elif inputs["auth_type"] == EventStreamAuthType.OAUTH2JWT:
-                obj = Oauth2JwtAuthentication(
-                    jwks_url=inputs["jwks_url"],
-                    audience=inputs["audience"],
-                    access_token=request.headers[inputs["http_header_key"]],
-                )
-                obj.authenticate()
-            elif inputs["auth_type"] == EventStreamAuthType.OAUTH2:
-                obj = Oauth2Authentication(
-                    introspection_url=inputs["introspection_url"],
-                    token=request.headers[inputs["http_header_key"]],
-                    client_id=inputs["client_id"],
-                    client_secret=inputs["client_secret"],
-                )
-                obj.authenticate()
-            elif inputs["auth_type"] == EventStreamAuthType.ECDSA:
-                if inputs.get("prefix_http_header_key", ""):
-                    content_prefix = request.headers[
-                        inputs["prefix_http_header_key"]
-                    ]
-                else:
-                    content_prefix = ""
-
-                obj = EcdsaAuthentication(
-                    public_key=inputs["public_key"],
-                    signature=request.headers[inputs["http_header_key"]],
-                    content_prefix=content_prefix,
-                    signature_encoding=inputs["signature_encoding"],
-                    hash_algorithm=inputs["hash_algorithm"],
-                )
-                obj.authenticate(request.body)
-            else:
-                message = "Unknown auth type"
-                logger.error(message)
-                raise ParseError(message)
-        except AuthenticationFailed as err:
-            self._update_stats()
-            if self.event_stream.test_mode:
-                self._update_test_data(
-                    error_message=err,
-                    headers=yaml.dump(dict(request.headers)),
-                )
-            raise
+        record_event(self.event_stream.id)
 
-    @extend_schema(exclude=True)
-    @action(detail=True, methods=["POST"], rbac_action=None)
-    def post(self, request, *_args, **kwargs):
-        """Handle posts from external vendors."""
-        try:
-            self.event_stream = EventStream.objects.get(uuid=kwargs["pk"])
-        except (EventStream.DoesNotExist, ValidationError) as exc:
-            raise ParseError("bad uuid specified") from exc
+    # The steps of a post, the sync and async views only differ in
+    # awaiting the ones doing I/O
 
+    def _missing_header(self, request, inputs) -> str:
+        """Log the request, return its error if the auth header is missing."""
         logger.debug("Headers %s", request.headers)
         logger.debug("Body %s", request.body)
-        inputs = yaml.safe_load(
-            self.event_stream.eda_credential.inputs.get_secret_value()
-        )
-        if inputs["http_header_key"] not in request.headers:
-            message = f"{inputs['http_header_key']} header is missing"
-            logger.error(message)
-            if self.event_stream.test_mode:
-                self._update_test_data(
-                    error_message=message,
-                    headers=yaml.dump(dict(request.headers)),
-                )
-            raise ParseError(message)
+        if inputs["http_header_key"] in request.headers:
+            return ""
+        message = f"{inputs['http_header_key']} header is missing"
+        logger.error(message)
+        return message
 
-        self._handle_auth(request, inputs)
+    def _record_error(self, request, error, stats: bool = False) -> None:
+        """Record a rejected request, in the test data in test mode."""
+        if stats:
+            self._update_stats()
+        if self.event_stream.test_mode:
+            self._update_test_data(
+                error_message=error,
+                headers=yaml.dump(dict(request.headers)),
+            )
 
+    def _read_event(self, request, inputs) -> tuple[tp.Any, dict]:
+        """Return the body of the request and the payload to publish."""
         body = self._parse_body(
             request.headers.get("Content-Type", ""), request.body
         )
@@ -260,6 +191,10 @@ class ExternalEventStreamViewSet(viewsets.GenericViewSet):
             inputs["http_header_key"],
             request.get_full_path(),
         )
+        return body, payload
+
+    def _record_event(self, request, body) -> None:
+        """Record an accepted request, in the test data in test mode."""
         self._update_stats()
         if self.event_stream.test_mode:
             self._update_test_data(
@@ -267,7 +202,113 @@ class ExternalEventStreamViewSet(viewsets.GenericViewSet):
                 content_type=request.headers.get("Content-Type", "unknown"),
                 headers=yaml.dump(dict(request.headers)),
             )
+
+    def _authenticate(self, request, inputs):
+        if inputs["auth_type"] == EventStreamAuthType.HMAC:
+            obj = HMACAuthentication(
+                signature_encoding=inputs["signature_encoding"],
+                signature_prefix=inputs.get("signature_prefix", ""),
+                signature=request.headers[inputs["http_header_key"]],
+                hash_algorithm=inputs["hash_algorithm"],
+                secret=inputs["secret"].encode("utf-8"),
+            )
+            obj.authenticate(request.body)
+        elif inputs["auth_type"] == EventStreamAuthType.MTLS:
+            obj = MTLSAuthentication(
+                subject=inputs.get("subject", ""),
+                value=request.headers[inputs["http_header_key"]],
+            )
+            obj.authenticate()
+        elif inputs["auth_type"] == EventStreamAuthType.TOKEN:
+            obj = TokenAuthentication(
+                token=inputs["token"],
+                value=request.headers[inputs["http_header_key"]],
+            )
+            obj.authenticate()
+        elif inputs["auth_type"] == EventStreamAuthType.BASIC:
+            obj = BasicAuthentication(
+                password=inputs["password"],
+                username=inputs["username"],
+                authorization=request.headers[inputs["http_header_key"]],
+            )
+            obj.authenticate()
+        elif inputs["auth_type"] == EventStreamAuthType.OAUTH2JWT:
+            obj = Oauth2JwtAuthentication(
+                jwks_url=inputs["jwks_url"],
+                audience=inputs["audience"],
+                access_token=request.headers[inputs["http_header_key"]],
+            )
+            obj.authenticate()
+        elif inputs["auth_type"] == EventStreamAuthType.OAUTH2:
+            obj = Oauth2Authentication(
+                introspection_url=inputs["introspection_url"],
+                token=request.headers[inputs["http_header_key"]],
+                client_id=inputs["client_id"],
+                client_secret=inputs["client_secret"],
+            )
+            obj.authenticate()
+        elif inputs["auth_type"] == EventStreamAuthType.ECDSA:
+            if inputs.get("prefix_http_header_key", ""):
+                content_prefix = request.headers[
+                    inputs["prefix_http_header_key"]
+                ]
+            else:
+                content_prefix = ""
+
+            obj = EcdsaAuthentication(
+                public_key=inputs["public_key"],
+                signature=request.headers[inputs["http_header_key"]],
+                content_prefix=content_prefix,
+                signature_encoding=inputs["signature_encoding"],
+                hash_algorithm=inputs["hash_algorithm"],
+            )
+            obj.authenticate(request.body)
         else:
+            message = "Unknown auth type"
+            logger.error(message)
+            raise ParseError(message)
+
+
+class ExternalEventStreamViewSet(
+    ExternalEventStreamMixin, viewsets.GenericViewSet
+):
+    """External Event Stream View Set."""
+
+    rbac_action = None
+    rbac_resource_type = ResourceType.EVENT_STREAM
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get_rbac_permission(self):
+        """RBAC Permissions."""
+        return ResourceType.EVENT_STREAM, Action.READ
+
+    def _handle_auth(self, request, inputs):
+        try:
+            self._authenticate(request, inputs)
+        except AuthenticationFailed as err:
+            self._record_error(request, err, stats=True)
+            raise
+
+    @extend_schema(exclude=True)
+    @action(detail=True, methods=["POST"], rbac_action=None)
+    def post(self, request, *_args, **kwargs):
+        """Handle posts from external vendors."""
+        try:
+            self.event_stream = get_event_stream(kwargs["pk"])
+        except (EventStream.DoesNotExist, ValidationError) as exc:
+            raise ParseError("bad uuid specified") from exc
+
+        inputs = self.event_stream.inputs
+        message = self._missing_header(request, inputs)
+        if message:
+            self._record_error(request, message)
+            raise ParseError(message)
+
+        self._handle_auth(request, inputs)
+        body, payload = self._read_event(request, inputs)
+        self._record_event(request, body)
+        if not self.event_stream.test_mode:
             try:
                 PGNotify(
                     settings.PG_NOTIFY_DSN_SERVER,
@@ -279,3 +320,76 @@ class ExternalEventStreamViewSet(viewsets.GenericViewSet):
                 return Response(status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response(status=status.HTTP_200_OK)
+
+
+class AsyncExternalEventStreamView(ExternalEventStreamMixin, View):
+    """Async variant of the external event stream post.
+
+    It runs natively on the ASGI event loop and publishes with an async
+    psycopg connection, so a request waiting on PG Notify does not hold
+    a worker thread. Authentication types which call out to an external
+    service are run in a thread.
+    """
+
+    http_method_names = ["post"]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        """Exempt the view from CSRF checks like DRF views are."""
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def _ahandle_auth(self, request, inputs):
+        try:
+            if inputs["auth_type"] in BLOCKING_AUTH_TYPES:
+                await sync_to_async(
+                    self._authenticate, thread_sensitive=False
+                )(request, inputs)
+            else:
+                self._authenticate(request, inputs)
+        except AuthenticationFailed as err:
+            await sync_to_async(self._record_error)(request, err, stats=True)
+            raise
+
+    async def post(self, request, *_args, **kwargs):
+        """Handle posts from external vendors."""
+        try:
+            return await self._post(request, kwargs["pk"])
+        except AuthenticationFailed as exc:
+            # Same as DRF when the view has no authentication classes
+            return JsonResponse(
+                {"detail": exc.detail}, status=status.HTTP_403_FORBIDDEN
+            )
+        except APIException as exc:
+            return JsonResponse({"detail": exc.detail}, status=exc.status_code)
+
+    async def _post(self, request, pk: str) -> HttpResponse:
+        self.event_stream = lookup_event_stream(pk)
+        if self.event_stream is None:
+            try:
+                self.event_stream = await sync_to_async(load_event_stream)(pk)
+            except (EventStream.DoesNotExist, ValidationError) as exc:
+                raise ParseError("bad uuid specified") from exc
+
+        inputs = self.event_stream.inputs
+        message = self._missing_header(request, inputs)
+        if message:
+            await sync_to_async(self._record_error)(request, message)
+            raise ParseError(message)
+
+        await self._ahandle_auth(request, inputs)
+        body, payload = self._read_event(request, inputs)
+        await sync_to_async(self._record_event)(request, body)
+        if not self.event_stream.test_mode:
+            try:
+                await AsyncPGNotify(
+                    settings.PG_NOTIFY_DSN_SERVER,
+                    self.event_stream.channel_name,
+                    payload,
+                )()
+            except PGNotifyError as e:
+                logger.error(e)
+                return HttpResponse(
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+
+        return HttpResponse(status=status.HTTP_200_OK)
@@ -27,6 +27,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from aap_eda.api import exceptions as api_exc, filters, serializers
+from aap_eda.api.pagination import KeysetPagination
 from aap_eda.core import models
 from aap_eda.core.enums import Action
 from aap_eda.core.exceptions import ParseError
@@ -153,6 +154,8 @@ class AuditRuleViewSet(
     viewsets.ReadOnlyModelViewSet,
 ):
     queryset = models.AuditRule.objects.all()
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-fired_at", "-id")
 
     def filter_queryset(self, queryset):
         if queryset.model is models.AuditRule:
@@ -195,6 +198,7 @@ class AuditRuleViewSet(
     @action(
         detail=False,
         queryset=models.AuditAction.objects.order_by("id"),
+        keyset_ordering=("-fired_at", "-id"),
         rbac_action=Action.READ,
         url_path="(?P<id>[^/.]+)/actions",
     )
@@ -232,6 +236,7 @@ class AuditRuleViewSet(
     @action(
         detail=False,
         queryset=models.AuditEvent.objects.order_by("-received_at"),
+        keyset_ordering=("-received_at", "-id"),
         rbac_action=Action.READ,
         url_path="(?P<id>[^/.]+)/events",
     )
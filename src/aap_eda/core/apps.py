@@ -14,6 +14,12 @@ class CoreConfig(AppConfig):
         # make sure we apply DAB decorations in case they are not yet imported
         from aap_eda.api.views import dab_decorate  # noqa: F401
 
+        # connect the signal handlers keeping the event stream cache fresh
+        from aap_eda.services import event_stream_cache  # noqa: F401
+
+        # publish the node capacity with the activation worker heartbeats
+        from aap_eda.services.activation import capacity  # noqa: F401
+
         # Run the startup logging for rq worker
 
         if "rqworker" in sys.argv:
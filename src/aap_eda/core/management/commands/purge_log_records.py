@@ -13,17 +13,16 @@
 #  limitations under the License.
 
 from datetime import datetime
-from typing import Union
 
 from django.core.management.base import (
     BaseCommand,
     CommandError,
     CommandParser,
 )
-from django.db import transaction
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 
 from aap_eda.core import models
+from aap_eda.services import log_partitions
 
 
 class Command(BaseCommand):
@@ -32,7 +31,8 @@ class Command(BaseCommand):
     help = (
         "Purge log records from rulebook processes. "
         "If activation ids or names are not specified, "
-        "all log records older than the cutoff date will be purged."
+        "all log records older than the cutoff date will be purged, "
+        "dropping the daily partitions older than the cutoff date."
     )
 
     def add_arguments(self, parser: CommandParser) -> None:
@@ -70,8 +70,9 @@ class Command(BaseCommand):
     def purge_log_records(
         self, ids: list[int], names: list[str], cutoff_timestamp: datetime
     ) -> None:
-        new_instance_logs = []
-        if not bool(ids) and not bool(names):
+        cutoff = int(cutoff_timestamp.timestamp())
+        purge_all = not bool(ids) and not bool(names)
+        if purge_all:
             instances = models.RulebookProcess.objects.all()
         else:
             instances = models.RulebookProcess.objects.filter(
@@ -84,49 +85,50 @@ class Command(BaseCommand):
             )
             return
 
-        for instance in instances:
-            new_instance_logs.append(
-                self.clean_instance_logs(instance, cutoff_timestamp)
-            )
-
-        new_instance_logs = [
-            item for item in new_instance_logs if item is not None
-        ]
-        if len(new_instance_logs) > 0:
-            models.RulebookProcessLog.objects.bulk_create(new_instance_logs)
-
-            self.stdout.write(
-                self.style.SUCCESS(
-                    "Log records older than "
-                    f"{cutoff_timestamp.strftime('%Y-%m-%d')} are purged."
+        purged_ids = list(
+            instances.filter(
+                Exists(
+                    models.RulebookProcessLog.objects.filter(
+                        activation_instance=OuterRef("pk"),
+                        log_timestamp__lt=cutoff,
+                    )
                 )
-            )
-
-    def clean_instance_logs(
-        self,
-        instance: models.RulebookProcess,
-        cutoff_timestamp: datetime,
-    ) -> Union[models.RulebookProcessLog, None]:
-        log_records = models.RulebookProcessLog.objects.filter(
-            activation_instance=instance,
-            log_timestamp__lt=int(cutoff_timestamp.timestamp()),
+            ).values_list("id", flat=True)
         )
-        if not log_records.exists():
+        if not purged_ids:
             return
 
-        log_records.delete()
+        # The partitions older than the cutoff are dropped as a whole, only
+        # the ones straddling it have their rows deleted
+        if purge_all:
+            log_partitions.drop_partitions(cutoff)
+            log_partitions.delete_logs(cutoff)
+        else:
+            log_partitions.delete_logs(cutoff, purged_ids)
+
         dt = f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        models.RulebookProcessLog.objects.bulk_create(
+            [
+                models.RulebookProcessLog(
+                    log=(
+                        "All log records older than "
+                        f"{cutoff_timestamp.strftime('%Y-%m-%d')} "
+                        f"are purged at {dt}."
+                    ),
+                    activation_instance_id=instance_id,
+                    log_timestamp=cutoff,
+                )
+                for instance_id in purged_ids
+            ]
+        )
 
-        return models.RulebookProcessLog(
-            log=(
-                "All log records older than "
-                f"{cutoff_timestamp.strftime('%Y-%m-%d')} are purged at {dt}."
-            ),
-            activation_instance_id=instance.id,
-            log_timestamp=int(cutoff_timestamp.timestamp()),
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Log records older than "
+                f"{cutoff_timestamp.strftime('%Y-%m-%d')} are purged."
+            )
         )
 
-    @transaction.atomic
     def handle(self, *args, **options):
         input_ids = options.get("activation-ids") or []
         input_names = options.get("activation-names") or []
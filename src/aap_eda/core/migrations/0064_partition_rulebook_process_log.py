@@ -0,0 +1,134 @@
+# Partition core_rulebook_process_log by day of log_timestamp.
+#
+# The existing rows are kept in place: the table is attached to the new
+# partitioned table as its first partition, covering everything up to the
+# end of the day of its latest row, so no data is copied. It is dropped by
+# the retention once all its rows are older than the cutoff. An empty
+# table is dropped right away. Rows outside of the daily partitions go to
+# a default partition.
+
+from django.db import migrations
+
+DAYS_AHEAD = 7
+
+PARTITION_SQL = f"""
+DO $$
+DECLARE
+    legacy_sequence text;
+    last_id bigint;
+    day_start bigint;
+BEGIN
+    ALTER TABLE core_rulebook_process_log
+        RENAME TO core_rulebook_process_log_legacy;
+
+    -- The ids of the partitions are given by a plain sequence
+    legacy_sequence := pg_get_serial_sequence(
+        'core_rulebook_process_log_legacy', 'id'
+    );
+    SELECT COALESCE(max(id), 0) INTO last_id
+        FROM core_rulebook_process_log_legacy;
+    ALTER TABLE core_rulebook_process_log_legacy
+        ALTER COLUMN id DROP IDENTITY IF EXISTS;
+    ALTER TABLE core_rulebook_process_log_legacy
+        ALTER COLUMN id DROP DEFAULT;
+    IF legacy_sequence IS NOT NULL THEN
+        EXECUTE format('DROP SEQUENCE IF EXISTS %s', legacy_sequence);
+    END IF;
+    CREATE SEQUENCE core_rulebook_process_log_id_seq;
+    PERFORM setval('core_rulebook_process_log_id_seq', last_id + 1, false);
+
+    -- The primary key of a partitioned table must include the partition
+    -- key; ids stay unique through the sequence.
+    CREATE TABLE core_rulebook_process_log (
+        id bigint NOT NULL
+            DEFAULT nextval('core_rulebook_process_log_id_seq'),
+        log text NOT NULL,
+        log_timestamp bigint NOT NULL,
+        activation_instance_id bigint NOT NULL
+            CONSTRAINT core_rulebook_process_log_activation_instance_id_fk
+            REFERENCES core_rulebook_process (id)
+            DEFERRABLE INITIALLY DEFERRED,
+        log_created_at timestamp with time zone NULL
+    ) PARTITION BY RANGE (log_timestamp);
+    ALTER SEQUENCE core_rulebook_process_log_id_seq
+        OWNED BY core_rulebook_process_log.id;
+    -- Indexes of the parent are created on every partition: the logs are
+    -- read by instance in id order and paged by id
+    CREATE INDEX core_rulebook_process_log_instance_id_idx
+        ON core_rulebook_process_log (activation_instance_id, id);
+    CREATE INDEX core_rulebook_process_log_id_idx
+        ON core_rulebook_process_log (id);
+    CREATE TABLE core_rulebook_process_log_default
+        PARTITION OF core_rulebook_process_log DEFAULT;
+
+    IF EXISTS (SELECT 1 FROM core_rulebook_process_log_legacy) THEN
+        SELECT GREATEST(
+            max(log_timestamp), extract(epoch FROM now())::bigint
+        ) / 86400 * 86400 + 86400
+        INTO day_start
+        FROM core_rulebook_process_log_legacy;
+        EXECUTE format(
+            'ALTER TABLE core_rulebook_process_log '
+            'ATTACH PARTITION core_rulebook_process_log_legacy '
+            'FOR VALUES FROM (MINVALUE) TO (%s)',
+            day_start
+        );
+    ELSE
+        DROP TABLE core_rulebook_process_log_legacy;
+        day_start := extract(epoch FROM now())::bigint / 86400 * 86400;
+    END IF;
+
+    FOR day IN 0..{DAYS_AHEAD} LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF core_rulebook_process_log '
+            'FOR VALUES FROM (%s) TO (%s)',
+            'core_rulebook_process_log_p' || to_char(
+                to_timestamp(day_start) AT TIME ZONE 'UTC', 'YYYYMMDD'
+            ),
+            day_start,
+            day_start + 86400
+        );
+        day_start := day_start + 86400;
+    END LOOP;
+END
+$$;
+"""
+
+UNPARTITION_SQL = """
+CREATE TABLE core_rulebook_process_log_unpartitioned (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    log text NOT NULL,
+    log_timestamp bigint NOT NULL,
+    activation_instance_id bigint NOT NULL
+        CONSTRAINT core_rulebook_process_log_activation_instance_id_fk
+        REFERENCES core_rulebook_process (id)
+        DEFERRABLE INITIALLY DEFERRED,
+    log_created_at timestamp with time zone NULL
+);
+INSERT INTO core_rulebook_process_log_unpartitioned
+    (id, log, log_timestamp, activation_instance_id, log_created_at)
+    SELECT id, log, log_timestamp, activation_instance_id, log_created_at
+    FROM core_rulebook_process_log;
+SELECT setval(
+    pg_get_serial_sequence('core_rulebook_process_log_unpartitioned', 'id'),
+    COALESCE(max(id), 0) + 1,
+    false
+) FROM core_rulebook_process_log_unpartitioned;
+DROP TABLE core_rulebook_process_log;
+ALTER TABLE core_rulebook_process_log_unpartitioned
+    RENAME TO core_rulebook_process_log;
+ALTER SEQUENCE core_rulebook_process_log_unpartitioned_id_seq
+    RENAME TO core_rulebook_process_log_id_seq;
+CREATE INDEX core_rulebook_process_log_activation_instance_id_idx
+    ON core_rulebook_process_log (activation_instance_id);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0063_remove_decisionenvironment_credential_and_more"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=PARTITION_SQL, reverse_sql=UNPARTITION_SQL),
+    ]
@@ -0,0 +1,87 @@
+# Index the rulebook process logs for substring search.
+#
+# A trigram GIN index on UPPER(log) serves the icontains lookups of the
+# log filters, which django writes as UPPER(log::text) LIKE UPPER(...).
+# The index of the partitioned table is created invalid on the parent
+# only, the index of each partition concurrently, then attached: the
+# logs keep being written while the existing partitions are indexed.
+# The partitions created later get the index from the parent. An index
+# left invalid by a failed concurrent build is rebuilt when the migration
+# is run again, the parent index is valid only once all are attached.
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+from django.db.models.functions import Upper
+
+INDEX_NAME = "core_rulebook_process_log_trgm"
+INDEX_EXPRESSION = "USING gin (UPPER(log) gin_trgm_ops)"
+
+
+def index_is_valid(cursor, name):
+    """Return whether the index is valid, None if it does not exist."""
+    cursor.execute(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+        [name],
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def create_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} "
+            f"ON ONLY core_rulebook_process_log {INDEX_EXPRESSION}"
+        )
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'core_rulebook_process_log'::regclass"
+        )
+        partitions = [row[0] for row in cursor.fetchall()]
+        for partition in partitions:
+            index = f"{partition}_trgm"
+            valid = index_is_valid(cursor, index)
+            if valid is False:
+                cursor.execute(f"DROP INDEX CONCURRENTLY {index}")
+            if not valid:
+                cursor.execute(
+                    f"CREATE INDEX CONCURRENTLY {index} "
+                    f"ON {partition} {INDEX_EXPRESSION}"
+                )
+            cursor.execute(
+                f"ALTER INDEX {INDEX_NAME} ATTACH PARTITION {index}"
+            )
+
+
+def drop_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction
+    atomic = False
+
+    dependencies = [
+        ("core", "0064_partition_rulebook_process_log"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_index, drop_index),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="rulebookprocesslog",
+                    index=GinIndex(
+                        OpClass(Upper("log"), name="gin_trgm_ops"),
+                        name=INDEX_NAME,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -14,8 +14,10 @@
 
 import typing as tp
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 
 from aap_eda.core.enums import (
     ACTIVATION_STATUS_MESSAGE_MAP,
@@ -183,6 +185,13 @@ class RulebookProcess(BaseOrgModel):
 class RulebookProcessLog(models.Model):
     class Meta:
         db_table = "core_rulebook_process_log"
+        # Serves the icontains lookups on log, see migration 0065
+        indexes = [
+            GinIndex(
+                OpClass(Upper("log"), name="gin_trgm_ops"),
+                name="core_rulebook_process_log_trgm",
+            )
+        ]
 
     # TODO(alex): this field should be renamed to rulebook_process
     # requires coordination with UI and QE teams.
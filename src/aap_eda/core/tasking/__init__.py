@@ -1,8 +1,11 @@
 """Tools for running background tasks."""
 from __future__ import annotations
 
+import contextlib
 import functools
 import logging
+import os
+import signal
 import time
 import typing
 from datetime import datetime, timedelta
@@ -549,6 +552,13 @@ class ActivationWorker(Worker):
     Uses JSONSerializer as a default one.
     """
 
+    # How often the running work horses are checked, in seconds
+    horse_poll_interval = 1
+    # Field of the worker hash holding the capacity of the node and the
+    # function measuring it as JSON, set by the services layer
+    capacity_field: typing.Optional[str] = None
+    measure_capacity: typing.Optional[typing.Callable[[], str]] = None
+
     def __init__(
         self,
         queues: typing.Iterable[typing.Union[Queue, str]],
@@ -576,6 +586,255 @@ class ActivationWorker(Worker):
             serializer=rq.serializers.JSONSerializer,
             **kwargs,
         )
+        self.concurrency = max(settings.RULEBOOK_WORKER_CONCURRENCY, 1)
+        # Work horses running concurrently, by pid
+        self._horses: dict[int, tuple[Job, Queue]] = {}
+        self._horses_heartbeat_at = time.monotonic()
+        self._capacity_published_at: typing.Optional[float] = None
+
+    # Running several work horses at once replaces the loop of rq's
+    # Worker.execute_job() and Worker.monitor_work_horse(), and depends on
+    # these rq 1.13 internals, to be checked when upgrading rq:
+    # - fork_work_horse() forks the horse and leaves its pid in _horse_pid,
+    #   which execute_job() moves to _horses right away.
+    # - The horse reports its job with set_current_job_id() and
+    #   set_current_job_working_time(), which write the single
+    #   "current_job" and "current_job_working_time" fields of the worker
+    #   hash, so only the worker writes them when horses run concurrently.
+    # - handle_payload() routes the "stop-job" command to
+    #   rq.command.handle_stop_job_command(), which only knows _horse_pid;
+    #   the override sets _stopped_job_id itself, which
+    #   handle_job_failure() reads to mark the job as stopped.
+    # - dequeue_job_and_maintain_ttl() blocks on the queues unless its
+    #   timeout is None.
+    # - maintain_heartbeats() derives the job heartbeat TTL from
+    #   current_job_working_time.
+    # - handle_work_horse_killed() and handle_job_failure() move the job
+    #   of a crashed horse to the FailedJobRegistry.
+
+    def execute_job(self, job: Job, queue: Queue) -> None:
+        """Run the job in a work horse without waiting for it to finish.
+
+        Up to RULEBOOK_WORKER_CONCURRENCY jobs run at once, so a slow
+        image pull or pod start does not hold back the other activations.
+        Each activation is still managed by one job at a time thanks to
+        the advisory lock of the orchestrator.
+        """
+        if self.concurrency == 1:
+            super().execute_job(job, queue)
+            return
+
+        self.set_state(rq.worker.WorkerStatus.BUSY)
+        job.started_at = rq.utils.utcnow()
+        self.fork_work_horse(job, queue)
+        self._horses[self._horse_pid] = (job, queue)
+        self._horse_pid = 0
+        self._update_current_job()
+
+        # Do not dequeue jobs that could not run right away
+        while len(self._horses) >= self.concurrency:
+            time.sleep(self.horse_poll_interval)
+            self._tend_horses()
+        self.set_state(rq.worker.WorkerStatus.IDLE)
+
+    def dequeue_job_and_maintain_ttl(
+        self, timeout: typing.Optional[int]
+    ) -> typing.Optional[tuple[Job, Queue]]:
+        # Blocking on the queues would leave the running horses untended
+        while self._horses:
+            result = super().dequeue_job_and_maintain_ttl(None)
+            if result is not None or timeout is None:
+                return result
+            time.sleep(self.horse_poll_interval)
+            self._tend_horses()
+        return super().dequeue_job_and_maintain_ttl(timeout)
+
+    def set_current_job_id(
+        self,
+        job_id: typing.Optional[str] = None,
+        pipeline: typing.Optional[redis.client.Pipeline] = None,
+    ) -> None:
+        # Concurrent horses would overwrite each other's job, the worker
+        # reports the job of its latest horse instead
+        if self.is_horse and self.concurrency > 1:
+            return
+        super().set_current_job_id(job_id, pipeline)
+
+    def set_current_job_working_time(
+        self,
+        current_job_working_time: float,
+        pipeline: typing.Optional[redis.client.Pipeline] = None,
+    ) -> None:
+        if self.is_horse and self.concurrency > 1:
+            self.current_job_working_time = current_job_working_time
+            return
+        super().set_current_job_working_time(
+            current_job_working_time, pipeline
+        )
+
+    def handle_payload(self, message: dict) -> None:
+        """Stop the horse running the job of a "stop-job" command."""
+        payload = rq.command.parse_payload(message)
+        if self.concurrency == 1 or payload["command"] != "stop-job":
+            super().handle_payload(message)
+            return
+
+        job_id = payload.get("job_id")
+        for pid, (job, _) in list(self._horses.items()):
+            if job.id == job_id:
+                self._stopped_job_id = job_id
+                self._kill_horse(pid)
+                return
+        self.log.info(f"Not working on job {job_id}, command ignored.")
+
+    def teardown(self) -> None:
+        if not self.is_horse:
+            while self._horses:
+                self.log.info(
+                    f"Waiting for {len(self._horses)} running jobs to finish"
+                )
+                time.sleep(self.horse_poll_interval)
+                self._tend_horses()
+        super().teardown()
+
+    def request_force_stop(self, signum, frame) -> None:
+        for pid in list(self._horses):
+            self._kill_horse(pid)
+            with contextlib.suppress(ChildProcessError):
+                os.wait4(pid, 0)
+        self._horses.clear()
+        super().request_force_stop(signum, frame)
+
+    def _kill_horse(self, pid: int) -> None:
+        try:
+            os.killpg(os.getpgid(pid), signal.SIGKILL)
+            self.log.info(f"Killed horse pid {pid}")
+        except ProcessLookupError:
+            self.log.debug(f"Horse {pid} already dead")
+
+    def _update_current_job(self) -> None:
+        """Report the job of the latest running horse as the current one."""
+        if not self._horses:
+            self.set_current_job_id(None)
+            self.set_current_job_working_time(0)
+            return
+
+        job, _ = next(reversed(self._horses.values()))
+        self.set_current_job_id(job.id)
+        self.set_current_job_working_time(
+            (rq.utils.utcnow() - job.started_at).total_seconds()
+        )
+
+    def _tend_horses(self) -> None:
+        """Reap the finished horses and keep the running jobs alive."""
+        reaped = False
+        for pid, (job, queue) in list(self._horses.items()):
+            try:
+                retpid, ret_val, rusage = os.wait4(pid, os.WNOHANG)
+            except ChildProcessError:
+                retpid, ret_val, rusage = pid, None, None
+            if retpid == pid:
+                del self._horses[pid]
+                reaped = True
+                self._handle_horse_exit(job, queue, pid, ret_val, rusage)
+                continue
+
+            # Kill the job if something is really wrong, the horse enforces
+            # the job timeout itself
+            timeout = job.timeout or self.queue_class.DEFAULT_TIMEOUT
+            working_time = rq.utils.utcnow() - job.started_at
+            if timeout != -1 and working_time.total_seconds() > timeout + 60:
+                self._kill_horse(pid)
+
+        now = time.monotonic()
+        beat = now - self._horses_heartbeat_at >= self.job_monitoring_interval
+        if beat:
+            self._horses_heartbeat_at = now
+            for job, _ in self._horses.values():
+                # The job heartbeat TTL depends on the job working time
+                self.current_job_working_time = (
+                    rq.utils.utcnow() - job.started_at
+                ).total_seconds()
+                self.maintain_heartbeats(job)
+        if reaped or beat:
+            self._update_current_job()
+
+    def _handle_horse_exit(
+        self,
+        job: Job,
+        queue: Queue,
+        pid: int,
+        ret_val: typing.Optional[int],
+        rusage,
+    ) -> None:
+        if ret_val == os.EX_OK:
+            return
+
+        job_status = job.get_status()
+        if job_status is None:
+            # The job completed and its result expired
+            return
+
+        if self._stopped_job_id == job.id:
+            self.log.warning(
+                "Job stopped by user, moving job to FailedJobRegistry"
+            )
+            self.handle_job_failure(
+                job,
+                queue=queue,
+                exc_string="Job stopped by user, work-horse terminated.",
+            )
+        elif job_status not in [
+            rq.job.JobStatus.FINISHED,
+            rq.job.JobStatus.FAILED,
+        ]:
+            if not job.ended_at:
+                job.ended_at = rq.utils.utcnow()
+            signal_msg = (
+                f" (signal {os.WTERMSIG(ret_val)})"
+                if ret_val and os.WIFSIGNALED(ret_val)
+                else ""
+            )
+            exc_string = (
+                "Work-horse terminated unexpectedly; "
+                f"waitpid returned {ret_val}{signal_msg}"
+            )
+            logger.warning(f"Moving job to FailedJobRegistry ({exc_string})")
+            self.handle_work_horse_killed(job, pid, ret_val, rusage)
+            self.handle_job_failure(job, queue=queue, exc_string=exc_string)
+
+    def register_birth(self) -> None:
+        # The worker hash is recreated without the capacity
+        self._capacity_published_at = None
+        super().register_birth()
+
+    def heartbeat(
+        self,
+        timeout: typing.Optional[int] = None,
+        pipeline: typing.Optional[redis.client.Pipeline] = None,
+    ) -> None:
+        """Publish the capacity of the node with the heartbeat.
+
+        The orchestrator places new rulebook processes by it. It is only
+        measured again once older than RULEBOOK_WORKER_CAPACITY_SECONDS.
+        """
+        super().heartbeat(timeout, pipeline)
+        if self.is_horse or self.measure_capacity is None:
+            return
+
+        now = time.monotonic()
+        published_at = self._capacity_published_at
+        if (
+            published_at is not None
+            and now - published_at < settings.RULEBOOK_WORKER_CAPACITY_SECONDS
+        ):
+            return
+        self._capacity_published_at = now
+        # Not on the pipeline, maintain_heartbeats() reads its results by
+        # position
+        self.connection.hset(
+            self.key, self.capacity_field, self.measure_capacity()
+        )
 
 
 @redis_connect_retry()
@@ -19,18 +19,12 @@ from typing import Optional, Tuple
 from django.utils.timezone import make_aware
 
 TIMESTAMP_PATTERNS = re.compile(
-    r"^(\*{2} )?"
-    r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})"
+    r"^(?:\*{2} )?"
+    r"(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2}):(\d{2})"
     r"[ ,.](\d{1,6})"
     r"(?: -)?\s+"  # for '-' or ' '
 )
 
-DATETIME_FORMATS = (
-    "%Y-%m-%d %H:%M:%S,%f",
-    "%Y-%m-%d %H:%M:%S.%f",
-    "%Y-%m-%d %H:%M:%S %f",
-)
-
 
 def extract_datetime_and_message_from_log_entry(
     log_entry: str,
@@ -43,6 +37,9 @@ def extract_datetime_and_message_from_log_entry(
     - "2023-01-01 12:34:56 789 message"
     - "** 2023-01-01 12:34:56.789 - message"
 
+    The fields of the timestamp are read by position, which is much
+    faster than strptime on the hot path of the log handler.
+
     Args:
         log_entry: Raw log entry string
 
@@ -53,21 +50,22 @@ def extract_datetime_and_message_from_log_entry(
     if not match:
         return None, log_entry.strip()
 
-    prefix, base_time, microseconds = match.groups()
-    timestamp_str = (
-        f"{base_time}{'.' if prefix else ','}{microseconds.ljust(6, '0')}"
-    )
-
-    for fmt in DATETIME_FORMATS:
-        try:
-            dt = datetime.strptime(timestamp_str, fmt)
-            aware_dt = make_aware(dt)
-            break
-        except ValueError:
-            continue
+    year, month, day, hour, minute, second, fraction = match.groups()
+    try:
+        dt = datetime(
+            int(year),
+            int(month),
+            int(day),
+            int(hour),
+            int(minute),
+            int(second),
+            int(fraction.ljust(6, "0")),
+        )
+    except ValueError:
+        return None, log_entry.strip()
 
     message = log_entry[match.end() :].strip()
     if message.startswith("- "):
         message = message[2:]
 
-    return aware_dt, message
+    return make_aware(dt), message
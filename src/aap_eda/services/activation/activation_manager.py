@@ -28,6 +28,7 @@ from pydantic import ValidationError
 from aap_eda.api.serializers.activation import is_activation_valid
 from aap_eda.core import models, tasking
 from aap_eda.core.enums import ActivationStatus, RestartPolicy
+from aap_eda.services import heartbeats
 from aap_eda.services.activation import exceptions
 from aap_eda.services.activation.engine import exceptions as engine_exceptions
 from aap_eda.services.activation.engine.common import ContainerRequest
@@ -369,7 +370,8 @@ class ActivationManager(StatusManager):
             ActivationStatus.RUNNING,
             ActivationStatus.STARTING,
         ]:
-            previous_time = self.latest_instance.updated_at
+            # Include the heartbeat not flushed to the database yet
+            previous_time = heartbeats.get_updated_at(self.latest_instance)
             timeout = settings.RULEBOOK_LIVENESS_TIMEOUT_SECONDS
 
         if previous_time:
@@ -0,0 +1,166 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Capacity of the node of a rulebook worker.
+
+Activation workers publish the capacity of their node in their
+heartbeats; the orchestrator places new rulebook processes by it.
+"""
+import json
+import logging
+import os
+import re
+import time
+import typing as tp
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from aap_eda.core.tasking import ActivationWorker
+
+LOGGER = logging.getLogger(__name__)
+
+# Field of the rq worker hash holding the capacity
+CAPACITY_FIELD = "eda_capacity"
+
+MEMINFO_PATH = "/proc/meminfo"
+
+MEMORY_UNITS = {
+    "": 1,
+    "b": 1,
+    "k": 1024,
+    "m": 1024**2,
+    "g": 1024**3,
+    "t": 1024**4,
+}
+
+_images_cache: dict[str, tp.Any] = {"images": frozenset(), "read_at": None}
+
+
+@dataclass
+class WorkerCapacity:
+    """Resources of a node available to rulebook processes."""
+
+    total_memory: tp.Optional[int] = None
+    free_memory: tp.Optional[int] = None
+    cpus: tp.Optional[int] = None
+    load: tp.Optional[float] = None
+    images: frozenset[str] = field(default_factory=frozenset)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "total_memory": self.total_memory,
+                "free_memory": self.free_memory,
+                "cpus": self.cpus,
+                "load": self.load,
+                "images": sorted(self.images),
+            }
+        )
+
+    @classmethod
+    def from_json(cls, data: tp.Union[str, bytes]) -> "WorkerCapacity":
+        """Parse a published capacity, raising ValueError if invalid."""
+        try:
+            values = json.loads(data)
+            return cls(
+                total_memory=values.get("total_memory"),
+                free_memory=values.get("free_memory"),
+                cpus=values.get("cpus"),
+                load=values.get("load"),
+                images=frozenset(values.get("images") or []),
+            )
+        except (AttributeError, TypeError) as e:
+            raise ValueError(str(e)) from e
+
+
+def parse_memory(value: tp.Optional[str]) -> tp.Optional[int]:
+    """Return the bytes of a podman memory size like 200m."""
+    if not value:
+        return None
+    match = re.fullmatch(r"\s*(\d+)\s*([bkmgt]?)b?\s*", str(value).lower())
+    if not match:
+        LOGGER.warning(f"Invalid memory size {value}")
+        return None
+    return int(match.group(1)) * MEMORY_UNITS[match.group(2)]
+
+
+def process_memory() -> tp.Optional[int]:
+    """Return the memory a rulebook process is limited to."""
+    if settings.DEPLOYMENT_TYPE != "podman":
+        return None
+    return parse_memory(settings.PODMAN_MEM_LIMIT)
+
+
+def _read_meminfo() -> tuple[tp.Optional[int], tp.Optional[int]]:
+    values = {}
+    try:
+        with open(MEMINFO_PATH) as meminfo:
+            for line in meminfo:
+                name, _, value = line.partition(":")
+                if name in ("MemTotal", "MemAvailable"):
+                    values[name] = int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None, None
+    return values.get("MemTotal"), values.get("MemAvailable")
+
+
+def _list_images() -> frozenset[str]:
+    if settings.DEPLOYMENT_TYPE != "podman":
+        return frozenset()
+
+    now = time.monotonic()
+    read_at = _images_cache["read_at"]
+    if (
+        read_at is not None
+        and now - read_at < settings.RULEBOOK_WORKER_IMAGES_REFRESH_SECONDS
+    ):
+        return _images_cache["images"]
+
+    from aap_eda.services.activation.engine.podman import get_podman_client
+
+    try:
+        images = frozenset(
+            tag
+            for image in get_podman_client().images.list()
+            for tag in image.tags
+        )
+    except Exception as e:
+        LOGGER.warning(f"Failed to list the decision environment images: {e}")
+        images = _images_cache["images"]
+    _images_cache.update(images=images, read_at=now)
+    return images
+
+
+def measure() -> WorkerCapacity:
+    """Measure the capacity of the node of the current worker."""
+    total_memory, free_memory = _read_meminfo()
+    try:
+        load = os.getloadavg()[0]
+    except OSError:
+        load = None
+    return WorkerCapacity(
+        total_memory=total_memory,
+        free_memory=free_memory,
+        cpus=os.cpu_count(),
+        load=load,
+        images=_list_images(),
+    )
+
+
+def _measure_json() -> str:
+    return measure().to_json()
+
+
+ActivationWorker.capacity_field = CAPACITY_FIELD
+ActivationWorker.measure_capacity = staticmethod(_measure_json)
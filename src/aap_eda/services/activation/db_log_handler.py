@@ -14,15 +14,16 @@
 
 import logging
 from datetime import datetime
-from typing import Optional, Union
+from typing import NamedTuple, Optional, Union
 
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, transaction
 
 from aap_eda.core import models
 from aap_eda.core.utils.rulebook_process_logs import (
     extract_datetime_and_message_from_log_entry,
 )
+from aap_eda.services import log_stream
 from aap_eda.services.activation.engine.common import LogHandler
 from aap_eda.services.activation.engine.exceptions import (
     ContainerUpdateLogsError,
@@ -30,6 +31,21 @@ from aap_eda.services.activation.engine.exceptions import (
 
 LOGGER = logging.getLogger(__name__)
 
+COPY_LOGS_SQL = (
+    f"COPY {models.RulebookProcessLog._meta.db_table} "
+    "(activation_instance_id, log, log_timestamp, log_created_at) "
+    "FROM STDIN"
+)
+
+
+class LogRow(NamedTuple):
+    """A buffered line, in the column order of COPY_LOGS_SQL."""
+
+    activation_instance_id: int
+    log: str
+    log_timestamp: int
+    log_created_at: Optional[datetime]
+
 
 class DBLogger(LogHandler):
     def __init__(self, activation_instance_id: int):
@@ -65,12 +81,7 @@ class DBLogger(LogHandler):
             dt, message = extract_datetime_and_message_from_log_entry(line)
 
             self.activation_instance_log_buffer.append(
-                models.RulebookProcessLog(
-                    log=message,
-                    activation_instance_id=self.activation_instance_id,
-                    log_timestamp=log_timestamp,
-                    log_created_at=dt,
-                )
+                LogRow(self.activation_instance_id, message, log_timestamp, dt)
             )
             self.line_count += 1
 
@@ -78,19 +89,39 @@ class DBLogger(LogHandler):
             self.flush()
 
     def flush(self) -> None:
+        """Write the buffered lines with COPY.
+
+        Streaming the rows skips building a model instance per line and
+        the parameters of a multi-row INSERT. The lines written are then
+        published to the clients following the logs live.
+        """
         try:
             if self.activation_instance_log_buffer:
-                models.RulebookProcessLog.objects.bulk_create(
-                    self.activation_instance_log_buffer
-                )
+                # COPY errors are raised by psycopg, not by django
+                with connection.wrap_database_errors:
+                    self._copy_buffer()
         except IntegrityError:
             message = (
                 f"Instance id: {self.activation_instance_id} is not present."
             )
             raise ContainerUpdateLogsError(message)
 
+        if self.activation_instance_log_buffer:
+            rows = [row[1:] for row in self.activation_instance_log_buffer]
+            transaction.on_commit(
+                lambda: log_stream.publish_logs(
+                    self.activation_instance_id, rows
+                )
+            )
+
         self.activation_instance_log_buffer = []
 
+    def _copy_buffer(self) -> None:
+        with connection.cursor() as cursor:
+            with cursor.copy(COPY_LOGS_SQL) as copy:
+                for row in self.activation_instance_log_buffer:
+                    copy.write_row(row)
+
     def get_log_read_at(self) -> Optional[datetime]:
         try:
             activation_instance = models.RulebookProcess.objects.get(
@@ -121,12 +152,3 @@ class DBLogger(LogHandler):
             activation_instance_id=self.activation_instance_id,
             log_timestamp=log_timestamp,
         ).count()
-
-    def clear_log_write_from(self, log_timestamp: int) -> int:
-        try:
-            models.RulebookProcessLog.objects.filter(
-                activation_instance_id=self.activation_instance_id,
-                log_timestamp=log_timestamp,
-            ).delete()
-        except IntegrityError as e:
-            raise ContainerUpdateLogsError(str(e))
@@ -19,6 +19,7 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 
 import yaml
+from dateutil import parser
 from django.conf import settings
 from pydantic import BaseModel, validator
 
@@ -53,6 +54,65 @@ class LogHandler(ABC):
         pass
 
 
+class ContainerLogReader:
+    """Write the container log lines that were not persisted yet.
+
+    The log handler keeps the timestamp of the last line persisted as a
+    cursor. The engines read the logs from the second of the cursor and
+    the lines up to the cursor are skipped in memory, so each update only
+    writes the new output. Timestamps without a fraction of a second are
+    ambiguous; the lines already written in that second are counted
+    instead.
+    """
+
+    def __init__(self, log_handler: LogHandler):
+        self.log_handler = log_handler
+        self.read_at = log_handler.get_log_read_at()
+        self.last_read_at = None
+        self.skip_lines = 0
+        if self.read_at and not self.read_at.microsecond:
+            self.skip_lines = log_handler.num_log_write_from(
+                int(self.read_at.timestamp())
+            )
+
+    @property
+    def since(self) -> tp.Optional[int]:
+        if self.read_at:
+            return int(self.read_at.timestamp())
+        return None
+
+    def write(self, line: str) -> None:
+        """Write a log line prefixed by its timestamp."""
+        line = line.strip()
+        if not line:
+            return
+        log_timestamp, _, content = line.partition(" ")
+        read_at = parser.isoparse(log_timestamp)
+        if self.read_at:
+            if read_at < self.read_at.replace(microsecond=0):
+                return
+            if self.read_at.microsecond and read_at <= self.read_at:
+                return
+            if self.skip_lines and content:
+                self.skip_lines -= 1
+                return
+
+        self.last_read_at = read_at
+        if content:
+            self.log_handler.write(
+                lines=content,
+                flush=False,
+                timestamp=False,
+                log_timestamp=int(read_at.timestamp()),
+            )
+
+    def flush(self) -> None:
+        """Persist the lines written and move the cursor after them."""
+        if self.last_read_at:
+            self.log_handler.flush()
+            self.log_handler.set_log_read_at(self.last_read_at)
+
+
 class AnsibleRulebookCmdLine(BaseModel):
     ws_url: str
     ws_ssl_verify: str
@@ -18,7 +18,6 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
-from dateutil import parser
 from kubernetes import client as k8sclient, config, watch
 from kubernetes.client.rest import ApiException
 from kubernetes.config.config_exception import ConfigException
@@ -38,6 +37,7 @@ from aap_eda.services.activation.engine.exceptions import (
 from . import messages
 from .common import (
     ContainerEngine,
+    ContainerLogReader,
     ContainerRequest,
     ContainerStatus,
     LogHandler,
@@ -210,50 +210,32 @@ class Engine(ContainerEngine):
                 container_status.state.running
                 or container_status.state.terminated
             ):
+                reader = ContainerLogReader(log_handler)
                 log_args = {
                     "name": pod.metadata.name,
                     "namespace": self.namespace,
                     "timestamps": True,
+                    "_preload_content": False,
                 }
 
-                log_at = log_handler.get_log_read_at()
-
-                if log_at:
-                    current_dt = datetime.now(timezone.utc)
-
-                    # 'since_seconds' can only accept integer of seconds
-                    # read an extra second, the overlapped will be removed
-                    log_args["since_seconds"] = (
-                        current_dt - log_at
-                    ).seconds + 1
-                    log_handler.clear_log_write_from(int(log_at.timestamp()))
-
-                log = self.client.core_api.read_namespaced_pod_log(**log_args)
-                timestamp = None
-
-                for line in log.splitlines():
-                    timestamp, content = line.split(" ", 1)
-
-                    # remove the overlapped lines
-                    if log_at and log_at.timestamp() > self._set_log_timestamp(
-                        timestamp
-                    ):
-                        continue
-
-                    log_handler.write(
-                        lines=content,
-                        flush=False,
-                        timestamp=False,
-                        log_timestamp=self._set_log_timestamp(timestamp),
+                if reader.read_at:
+                    # 'since_seconds' can only accept integer of seconds,
+                    # the lines already read are skipped by the reader
+                    elapsed = datetime.now(timezone.utc) - reader.read_at
+                    log_args["since_seconds"] = max(
+                        int(elapsed.total_seconds()) + 1, 1
                     )
 
-                if timestamp:
-                    log_timestamp = self._set_log_timestamp(timestamp)
-                    dt = datetime.fromtimestamp(
-                        int(log_timestamp), timezone.utc  # remove millisecond
-                    )
-                    log_handler.flush()
-                    log_handler.set_log_read_at(dt)
+                # stream the lines instead of loading the whole log
+                response = self.client.core_api.read_namespaced_pod_log(
+                    **log_args
+                )
+                try:
+                    for line in response:
+                        reader.write(line.decode("utf-8"))
+                finally:
+                    response.release_conn()
+                reader.flush()
             else:
                 msg = (
                     f"Pod with label {container_id} has unhandled state: "
@@ -266,9 +248,6 @@ class Engine(ContainerEngine):
         except ApiException as e:
             raise ContainerUpdateLogsError(str(e)) from e
 
-    def _set_log_timestamp(self, log_timestamp: str) -> int:
-        return int(parser.isoparse(log_timestamp).timestamp())
-
     def _get_job_pod(self, job_name: str) -> k8sclient.V1Pod:
         job_label = f"job-name={job_name}"
         try:
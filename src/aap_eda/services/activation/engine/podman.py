@@ -16,7 +16,6 @@ import logging
 import os
 
 import rq
-from dateutil import parser
 from django.conf import settings
 from podman import PodmanClient
 from podman.domain.images import Image
@@ -29,6 +28,7 @@ from aap_eda.utils import str_to_bool
 from . import exceptions, messages
 from .common import (
     ContainerEngine,
+    ContainerLogReader,
     ContainerRequest,
     ContainerStatus,
     LogHandler,
@@ -262,41 +262,15 @@ class Engine(ContainerEngine):
                 log_handler.write(f"Container {container_id} not found.", True)
                 return
 
-            since = None
-            log_read_at = log_handler.get_log_read_at()
-            if log_read_at:
-                since = int(log_handler.get_log_read_at().timestamp())
-
+            reader = ContainerLogReader(log_handler)
             log_args = {"timestamps": True, "stderr": True}
-            last_timestamp = None
-            num_wrote_lines = 0
-            if since:
-                log_args["since"] = since
-                num_wrote_lines = log_handler.num_log_write_from(since)
+            if reader.since:
+                log_args["since"] = reader.since
 
             container = self.client.containers.get(container_id)
-
-            for i, logline in enumerate(container.logs(**log_args)):
-                if i < num_wrote_lines:
-                    continue
-
-                log = logline.decode("utf-8").strip()
-                log_parts = log.split(" ", 1)
-                last_timestamp = log_parts[0]
-                if len(log_parts) > 1:
-                    log_handler.write(
-                        lines=log_parts[1],
-                        flush=False,
-                        timestamp=False,
-                        log_timestamp=int(
-                            parser.parse(last_timestamp).timestamp()
-                        ),
-                    )
-
-            if last_timestamp:
-                dt = parser.parse(last_timestamp)
-                log_handler.flush()
-                log_handler.set_log_read_at(dt)
+            for logline in container.logs(**log_args):
+                reader.write(logline.decode("utf-8"))
+            reader.flush()
 
         # ContainerUpdateLogsError handled by the manager
         except APIError as e:
@@ -0,0 +1,289 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Per-process cache of the event streams posted to by external vendors.
+
+Posting an event needs the event stream and the decrypted inputs of its
+credential. Both rarely change, so they are kept in a bounded LRU cache
+with a TTL. Saving or deleting an EventStream or EdaCredential evicts the
+affected entries locally and broadcasts the eviction over Redis to every
+other process, where a listener thread applies it.
+"""
+import collections
+import json
+import logging
+import os
+import threading
+import time
+import typing as tp
+import uuid
+from dataclasses import dataclass
+
+import redis
+import yaml
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from aap_eda.core import tasking
+from aap_eda.core.models import EdaCredential, EventStream
+from aap_eda.settings import redis as redis_settings
+
+logger = logging.getLogger(__name__)
+
+LISTENER_RETRY_SECONDS = 5
+
+
+@dataclass(frozen=True)
+class CachedEventStream:
+    """The event stream attributes needed to accept an event."""
+
+    id: int
+    uuid: str
+    name: str
+    channel_name: str
+    test_mode: bool
+    additional_data_headers: str
+    eda_credential_id: tp.Optional[int]
+    inputs: dict
+
+    @classmethod
+    def from_model(cls, event_stream: EventStream) -> "CachedEventStream":
+        return cls(
+            id=event_stream.id,
+            uuid=str(event_stream.uuid),
+            name=event_stream.name,
+            channel_name=event_stream.channel_name,
+            test_mode=event_stream.test_mode,
+            additional_data_headers=event_stream.additional_data_headers,
+            eda_credential_id=event_stream.eda_credential_id,
+            inputs=yaml.safe_load(
+                event_stream.eda_credential.inputs.get_secret_value()
+            ),
+        )
+
+
+class EventStreamCache:
+    """A thread-safe LRU cache of event streams with a TTL.
+
+    Every eviction bumps the generation of the cache. An entry loaded
+    while the generation changed may predate the eviction and is not
+    stored.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max(max_size, 1)
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tp.Optional[CachedEventStream]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires_at = item
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, entry: CachedEventStream, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[entry.uuid] = (entry, time.monotonic() + self.ttl)
+            self._entries.move_to_end(entry.uuid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(
+        self,
+        event_stream_uuid: tp.Optional[str] = None,
+        eda_credential_id: tp.Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            self.generation += 1
+            if event_stream_uuid is not None:
+                self._entries.pop(event_stream_uuid, None)
+            if eda_credential_id is not None:
+                for key, (entry, _) in list(self._entries.items()):
+                    if entry.eda_credential_id == eda_credential_id:
+                        del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+class InvalidationListener(threading.Thread):
+    """Apply the evictions broadcast by other processes to a cache."""
+
+    def __init__(self, cache: EventStreamCache):
+        super().__init__(name="event-stream-cache-listener", daemon=True)
+        self.cache = cache
+        self.subscribed = threading.Event()
+
+    def run(self):
+        while True:
+            try:
+                client = tasking.get_redis_client(
+                    **redis_settings.rq_redis_client_instantiation_parameters()
+                )
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(invalidation_channel())
+                # Evictions may have been missed while not subscribed
+                self.cache.clear()
+                self.subscribed.set()
+                for message in pubsub.listen():
+                    self.handle(message["data"])
+            except redis.exceptions.RedisError as e:
+                logger.warning(
+                    "Event stream cache invalidation listener failed, "
+                    "retrying in %d seconds: %s",
+                    LISTENER_RETRY_SECONDS,
+                    str(e),
+                )
+                self.subscribed.clear()
+                self.cache.clear()
+                time.sleep(LISTENER_RETRY_SECONDS)
+
+    def handle(self, data: tp.Union[str, bytes]) -> None:
+        try:
+            message = json.loads(data)
+            self.cache.evict(
+                event_stream_uuid=message.get("uuid"),
+                eda_credential_id=message.get("eda_credential_id"),
+            )
+        except (TypeError, ValueError, AttributeError):
+            logger.warning("Invalid event stream cache message: %s", data)
+
+
+_cache: tp.Optional[EventStreamCache] = None
+_listener: tp.Optional[InvalidationListener] = None
+_cache_pid: tp.Optional[int] = None
+_cache_lock = threading.Lock()
+
+
+def invalidation_channel() -> str:
+    return f"{settings.RQ_REDIS_PREFIX}:event_stream_cache"
+
+
+def get_cache() -> tp.Optional[EventStreamCache]:
+    """Return the process-wide cache, None when caching is disabled."""
+    global _cache, _cache_pid, _listener
+
+    if settings.EVENT_STREAM_CACHE_TTL_SECONDS <= 0:
+        return None
+    pid = os.getpid()
+    if _cache is not None and _cache_pid == pid:
+        return _cache
+    with _cache_lock:
+        if _cache is None or _cache_pid != pid:
+            cache = EventStreamCache(
+                max_size=settings.EVENT_STREAM_CACHE_MAX_SIZE,
+                ttl=settings.EVENT_STREAM_CACHE_TTL_SECONDS,
+            )
+            listener = InvalidationListener(cache)
+            listener.start()
+            _cache, _cache_pid, _listener = cache, pid, listener
+    return _cache
+
+
+def _cache_key(event_stream_uuid) -> tp.Optional[str]:
+    try:
+        return str(uuid.UUID(str(event_stream_uuid)))
+    except ValueError:
+        return None
+
+
+def lookup_event_stream(event_stream_uuid) -> tp.Optional[CachedEventStream]:
+    """Return the cached event stream without touching the database."""
+    cache = get_cache()
+    key = _cache_key(event_stream_uuid)
+    if cache is None or key is None:
+        return None
+    return cache.get(key)
+
+
+def load_event_stream(event_stream_uuid) -> CachedEventStream:
+    """Load the event stream from the database and cache it.
+
+    Raises EventStream.DoesNotExist or ValidationError as the lookup
+    by uuid does.
+    """
+    cache = get_cache()
+    generation = cache.generation if cache is not None else 0
+    event_stream = EventStream.objects.select_related("eda_credential").get(
+        uuid=event_stream_uuid
+    )
+    entry = CachedEventStream.from_model(event_stream)
+    if cache is not None:
+        cache.put(entry, generation)
+    return entry
+
+
+def get_event_stream(event_stream_uuid) -> CachedEventStream:
+    """Return the event stream, loading it on a cache miss."""
+    return lookup_event_stream(event_stream_uuid) or load_event_stream(
+        event_stream_uuid
+    )
+
+
+def invalidate(
+    event_stream_uuid: tp.Optional[str] = None,
+    eda_credential_id: tp.Optional[int] = None,
+) -> None:
+    """Evict entries in this process and, on commit, in all others."""
+    message = {
+        "uuid": event_stream_uuid,
+        "eda_credential_id": eda_credential_id,
+    }
+
+    def evict():
+        if _cache is not None:
+            _cache.evict(event_stream_uuid, eda_credential_id)
+
+    def broadcast():
+        evict()
+        try:
+            client = tasking.get_redis_client(
+                **redis_settings.rq_redis_client_instantiation_parameters()
+            )
+            client.publish(invalidation_channel(), json.dumps(message))
+        except redis.exceptions.RedisError as e:
+            logger.warning(
+                "Failed to broadcast event stream cache eviction: %s", str(e)
+            )
+
+    evict()
+    transaction.on_commit(broadcast)
+
+
+@receiver(post_save, sender=EventStream)
+@receiver(post_delete, sender=EventStream)
+def _event_stream_changed(sender, instance: EventStream, **kwargs) -> None:
+    invalidate(event_stream_uuid=str(instance.uuid))
+
+
+@receiver(post_save, sender=EdaCredential)
+@receiver(post_delete, sender=EdaCredential)
+def _eda_credential_changed(sender, instance: EdaCredential, **kwargs) -> None:
+    invalidate(eda_credential_id=instance.id)
@@ -0,0 +1,156 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Coalesced event stream statistics.
+
+Updating events_received and last_event_received_at on every event makes
+all the requests posted to an event stream wait on the lock of its row.
+Instead the statistics are accumulated in a Redis hash and periodically
+flushed to the database in a single statement.
+
+The flush is at least once: the flushed hash is only deleted after the
+statement commits, a flush interrupted in between is applied again by
+the next one and counts its events twice. The last received times are
+kept at their maximum, so they are not affected.
+"""
+import datetime
+import logging
+import time
+import typing as tp
+
+import redis
+from django.db import connection
+from django.db.models import F
+
+from aap_eda.core.models import EventStream
+from aap_eda.services.pending_writes import PendingHash, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+COUNT_FIELD_PREFIX = "count:"
+LAST_FIELD_PREFIX = "last:"
+
+STATS = PendingHash("event_stream_stats")
+
+# Counts an event and keeps the latest received time, whatever the order
+# the events are recorded in
+RECORD_EVENT_SCRIPT = """
+redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+local last = redis.call('HGET', KEYS[1], ARGV[2])
+if not last or tonumber(ARGV[3]) > tonumber(last) then
+    redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+end
+"""
+
+
+def _update_event_stream(event_stream_id: int, received_at: float) -> None:
+    EventStream.objects.filter(pk=event_stream_id).update(
+        events_received=F("events_received") + 1,
+        last_event_received_at=datetime.datetime.fromtimestamp(
+            received_at, tz=datetime.timezone.utc
+        ),
+    )
+
+
+def record_event(event_stream_id: int) -> None:
+    """Count an event received by the event stream.
+
+    Falls back to updating the event stream directly when Redis is not
+    available.
+    """
+    received_at = time.time()
+    try:
+        get_redis_client().eval(
+            RECORD_EVENT_SCRIPT,
+            1,
+            STATS.pending_key,
+            f"{COUNT_FIELD_PREFIX}{event_stream_id}",
+            f"{LAST_FIELD_PREFIX}{event_stream_id}",
+            repr(received_at),
+        )
+    except redis.exceptions.RedisError as e:
+        logger.warning(
+            "Failed to record event stream statistics in Redis, "
+            "updating the database: %s",
+            str(e),
+        )
+        _update_event_stream(event_stream_id, received_at)
+
+
+def pending_event_stream_ids() -> set[int]:
+    """Return the ids of the event streams with unflushed statistics."""
+    return {
+        int(field[len(COUNT_FIELD_PREFIX) :])
+        for field in STATS.fields(get_redis_client())
+        if field.startswith(COUNT_FIELD_PREFIX)
+    }
+
+
+def _parse_stats(
+    stats: dict,
+) -> dict[int, tuple[int, tp.Optional[datetime.datetime]]]:
+    counts = {}
+    last_received = {}
+    for field, value in stats.items():
+        try:
+            if field.startswith(COUNT_FIELD_PREFIX):
+                event_stream_id = int(field[len(COUNT_FIELD_PREFIX) :])
+                counts[event_stream_id] = int(value)
+            elif field.startswith(LAST_FIELD_PREFIX):
+                event_stream_id = int(field[len(LAST_FIELD_PREFIX) :])
+                last_received[
+                    event_stream_id
+                ] = datetime.datetime.fromtimestamp(
+                    float(value), tz=datetime.timezone.utc
+                )
+        except ValueError:
+            logger.warning("Invalid event stream statistic %s", field)
+    return {
+        event_stream_id: (count, last_received.get(event_stream_id))
+        for event_stream_id, count in counts.items()
+    }
+
+
+def _write_stats(
+    stats: dict[int, tuple[int, tp.Optional[datetime.datetime]]]
+) -> None:
+    table = EventStream._meta.db_table
+    values = ", ".join(["(%s, %s, %s::timestamptz)"] * len(stats))
+    params = []
+    for event_stream_id, (count, last_received) in sorted(stats.items()):
+        params.extend([event_stream_id, count, last_received])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS es "
+            "SET events_received = es.events_received + v.count, "
+            "last_event_received_at = "
+            "GREATEST(es.last_event_received_at, v.last_received) "
+            f"FROM (VALUES {values}) AS v(id, count, last_received) "
+            "WHERE es.id = v.id",
+            params,
+        )
+
+
+def _write_pending(pending: dict[str, str]) -> int:
+    stats = _parse_stats(pending)
+    if stats:
+        _write_stats(stats)
+    return len(stats)
+
+
+def flush_stats() -> int:
+    """Write the accumulated statistics to the database.
+
+    Returns the number of event streams updated.
+    """
+    return STATS.flush(get_redis_client(), _write_pending)
@@ -0,0 +1,171 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Debounced rulebook process heartbeats.
+
+Every running rulebook process reports the stats of each of its rulesets
+periodically. Instead of updating the process and rewriting the stats of
+its activation for every report, the latest reports are kept in a Redis
+hash and periodically flushed to the database in two statements.
+"""
+import datetime
+import json
+import logging
+import typing as tp
+
+import redis
+from django.db import connection
+from django.utils.dateparse import parse_datetime
+
+from aap_eda.core.models import Activation, RulebookProcess
+from aap_eda.services.pending_writes import PendingHash, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+UPDATED_AT_FIELD_PREFIX = "updated_at:"
+STATS_FIELD_PREFIX = "stats:"
+
+HEARTBEATS = PendingHash("rulebook_process_heartbeats")
+
+
+def _write_heartbeats(
+    updated_at: dict[int, datetime.datetime],
+    ruleset_stats: dict[int, dict],
+) -> None:
+    with connection.cursor() as cursor:
+        if updated_at:
+            values = ", ".join(["(%s, %s::timestamptz)"] * len(updated_at))
+            params = [
+                param for item in sorted(updated_at.items()) for param in item
+            ]
+            cursor.execute(
+                f"UPDATE {RulebookProcess._meta.db_table} AS p "
+                "SET updated_at = GREATEST(p.updated_at, v.updated_at) "
+                f"FROM (VALUES {values}) AS v(id, updated_at) "
+                "WHERE p.id = v.id",
+                params,
+            )
+        if ruleset_stats:
+            # Replace the stats of the reported rulesets, keep the others
+            values = ", ".join(["(%s, %s::jsonb)"] * len(ruleset_stats))
+            params = [
+                param
+                for activation_id, stats in sorted(ruleset_stats.items())
+                for param in (activation_id, json.dumps(stats))
+            ]
+            cursor.execute(
+                f"UPDATE {Activation._meta.db_table} AS a "
+                "SET ruleset_stats = a.ruleset_stats || v.stats "
+                f"FROM (VALUES {values}) AS v(id, stats) "
+                "WHERE a.id = v.id",
+                params,
+            )
+
+
+def write_heartbeat(
+    rulebook_process_id: int,
+    activation_id: int,
+    reported_at: datetime.datetime,
+    stats: dict,
+) -> None:
+    """Write a heartbeat to the database."""
+    _write_heartbeats(
+        {rulebook_process_id: reported_at},
+        {activation_id: {stats["ruleSetName"]: stats}},
+    )
+
+
+def record_heartbeat(
+    rulebook_process_id: int,
+    activation_id: int,
+    reported_at: datetime.datetime,
+    stats: dict,
+) -> None:
+    """Keep a heartbeat to be written by the next flush.
+
+    Falls back to writing it to the database when Redis is not available.
+    """
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        pipe.hset(
+            HEARTBEATS.pending_key,
+            f"{UPDATED_AT_FIELD_PREFIX}{rulebook_process_id}",
+            reported_at.isoformat(),
+        )
+        pipe.hset(
+            HEARTBEATS.pending_key,
+            f"{STATS_FIELD_PREFIX}{activation_id}:{stats['ruleSetName']}",
+            json.dumps(stats),
+        )
+        pipe.execute()
+    except redis.exceptions.RedisError as e:
+        logger.warning(
+            "Failed to record heartbeat in Redis, "
+            "updating the database: %s",
+            str(e),
+        )
+        write_heartbeat(rulebook_process_id, activation_id, reported_at, stats)
+
+
+def get_updated_at(
+    rulebook_process: RulebookProcess,
+) -> tp.Optional[datetime.datetime]:
+    """Return the time of the latest heartbeat of a rulebook process.
+
+    Includes the heartbeat not flushed to the database yet.
+    """
+    updated_at = rulebook_process.updated_at
+    try:
+        pending = HEARTBEATS.get(
+            get_redis_client(),
+            f"{UPDATED_AT_FIELD_PREFIX}{rulebook_process.id}",
+        )
+    except redis.exceptions.RedisError as e:
+        logger.warning("Failed to read pending heartbeat: %s", str(e))
+        return updated_at
+
+    pending_at = parse_datetime(pending) if pending else None
+    if pending_at is None:
+        return updated_at
+    if updated_at is None:
+        return pending_at
+    return max(updated_at, pending_at)
+
+
+def _write_pending(pending: dict[str, str]) -> int:
+    updated_at = {}
+    ruleset_stats = {}
+    for field, value in pending.items():
+        try:
+            if field.startswith(UPDATED_AT_FIELD_PREFIX):
+                process_id = int(field[len(UPDATED_AT_FIELD_PREFIX) :])
+                updated_at[process_id] = parse_datetime(value)
+            elif field.startswith(STATS_FIELD_PREFIX):
+                activation_id, _, ruleset_name = field[
+                    len(STATS_FIELD_PREFIX) :
+                ].partition(":")
+                ruleset_stats.setdefault(int(activation_id), {})[
+                    ruleset_name
+                ] = json.loads(value)
+        except ValueError:
+            logger.warning("Invalid pending heartbeat %s", field)
+    _write_heartbeats(updated_at, ruleset_stats)
+    return len(updated_at)
+
+
+def flush_heartbeats() -> int:
+    """Write the pending heartbeats to the database.
+
+    Returns the number of rulebook processes updated.
+    """
+    return HEARTBEATS.flush(get_redis_client(), _write_pending)
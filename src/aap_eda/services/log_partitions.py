@@ -0,0 +1,211 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Daily partitions of the rulebook process logs.
+
+The rulebook process log table is partitioned by range of log_timestamp,
+one partition per UTC day. Retention drops the partitions older than the
+cutoff instead of deleting their rows. Only the partitions straddling the
+cutoff, the default one and the one holding the logs written before the
+table was partitioned, have their old rows deleted, in chunks, each in its
+own transaction.
+"""
+import datetime
+import logging
+import re
+import typing as tp
+
+from django.db import (
+    DatabaseError,
+    OperationalError,
+    connection,
+    transaction,
+)
+
+from aap_eda.core.models import RulebookProcessLog
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 86400
+DELETE_CHUNK_SIZE = 10000
+
+TABLE = RulebookProcessLog._meta.db_table
+PARTITION_PREFIX = f"{TABLE}_p"
+
+BOUND_PATTERN = re.compile(
+    r"FOR VALUES FROM \((?P<lower>[^)]+)\) TO \((?P<upper>[^)]+)\)"
+)
+
+
+class Partition(tp.NamedTuple):
+    name: str
+    # None for MINVALUE, MAXVALUE and the default partition
+    lower: tp.Optional[int]
+    upper: tp.Optional[int]
+    is_default: bool = False
+
+
+def _parse_bound(bound: str) -> tp.Optional[int]:
+    bound = bound.strip("'")
+    if bound in ("MINVALUE", "MAXVALUE"):
+        return None
+    return int(bound)
+
+
+def list_partitions() -> list[Partition]:
+    """Return the partitions of the rulebook process logs by range."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        if bound == "DEFAULT":
+            partitions.append(Partition(name, None, None, is_default=True))
+            continue
+        match = BOUND_PATTERN.match(bound)
+        if not match:
+            logger.warning("Unexpected bound of partition %s: %s", name, bound)
+            continue
+        partitions.append(
+            Partition(
+                name,
+                _parse_bound(match.group("lower")),
+                _parse_bound(match.group("upper")),
+            )
+        )
+    return sorted(
+        partitions,
+        key=lambda p: (p.is_default, p.lower is not None, p.lower or 0),
+    )
+
+
+def _overlaps(partition: Partition, lower: int, upper: int) -> bool:
+    if partition.is_default:
+        return False
+    return (partition.lower is None or partition.lower < upper) and (
+        partition.upper is None or lower < partition.upper
+    )
+
+
+def create_partitions(start: datetime.date, days: int) -> list[str]:
+    """Create the daily partitions from start for the given number of days.
+
+    The days already covered by a partition are skipped. Returns the names
+    of the partitions created.
+    """
+    partitions = list_partitions()
+    created = []
+    for offset in range(days):
+        day = start + datetime.timedelta(days=offset)
+        lower = int(
+            datetime.datetime.combine(
+                day, datetime.time(), tzinfo=datetime.timezone.utc
+            ).timestamp()
+        )
+        upper = lower + DAY_SECONDS
+        if any(_overlaps(p, lower, upper) for p in partitions):
+            continue
+
+        name = f"{PARTITION_PREFIX}{day.strftime('%Y%m%d')}"
+        try:
+            # Fails when the default partition holds logs of that day
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                    f"FOR VALUES FROM ({lower}) TO ({upper})"
+                )
+        except DatabaseError as e:
+            logger.warning("Failed to create partition %s: %s", name, str(e))
+            continue
+        created.append(name)
+    return created
+
+
+def drop_partitions(cutoff: int, lock_timeout_ms: int = 0) -> list[str]:
+    """Drop the partitions holding only logs older than the cutoff.
+
+    Dropping a partition locks the whole table, with a lock timeout the
+    partitions that cannot be locked in time are left for the next time.
+    Returns the names of the partitions dropped.
+    """
+    dropped = []
+    for partition in list_partitions():
+        if partition.upper is None or partition.upper > cutoff:
+            continue
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                if lock_timeout_ms:
+                    cursor.execute(
+                        "SELECT set_config('lock_timeout', %s, true)",
+                        [f"{lock_timeout_ms}ms"],
+                    )
+                cursor.execute(f"DROP TABLE {partition.name}")
+        except OperationalError as e:
+            logger.warning(
+                "Failed to drop partition %s: %s", partition.name, str(e)
+            )
+            continue
+        dropped.append(partition.name)
+    return dropped
+
+
+def delete_logs(
+    cutoff: int,
+    activation_instance_ids: tp.Optional[list[int]] = None,
+    chunk_size: int = DELETE_CHUNK_SIZE,
+) -> int:
+    """Delete the logs older than the cutoff, a chunk at a time.
+
+    When activation_instance_ids is None the partitions older than the
+    cutoff are expected to be dropped already, only those straddling it
+    are visited. Returns the number of logs deleted.
+    """
+    condition = "log_timestamp < %s"
+    params = [cutoff]
+    if activation_instance_ids is not None:
+        condition += " AND activation_instance_id = ANY(%s)"
+        params.append(list(activation_instance_ids))
+
+    deleted = 0
+    for partition in list_partitions():
+        if partition.lower is not None and partition.lower >= cutoff:
+            continue
+        if activation_instance_ids is None and not (
+            partition.upper is None or partition.upper > cutoff
+        ):
+            continue
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {partition.name} WHERE ctid IN ("
+                    f"SELECT ctid FROM {partition.name} "
+                    f"WHERE {condition} LIMIT %s)",
+                    [*params, chunk_size],
+                )
+                count = cursor.rowcount
+            deleted += count
+            if count < chunk_size:
+                break
+    return deleted
+
+
+def maintain_partitions(days_ahead: int) -> list[str]:
+    """Create the partitions of today and of the days ahead."""
+    today = datetime.datetime.now(tz=datetime.timezone.utc).date()
+    return create_partitions(today, days_ahead + 1)
@@ -0,0 +1,187 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Live stream of the rulebook process logs.
+
+Each batch of logs written by a rulebook process logger is published to
+a Redis channel of its rulebook process. Every API process keeps a single
+subscription per channel watched by its websocket clients, read by a
+thread, and hands the batches to the queues of those clients. A batch is
+one message per client however many lines it holds.
+"""
+import asyncio
+import collections
+import json
+import logging
+import threading
+import time
+import typing as tp
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from aap_eda.services.pending_writes import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = f"{settings.RQ_REDIS_PREFIX}:rulebook_process_logs"
+
+# How long the reader waits for a message before it (un)subscribes the
+# channels requested in the meantime
+POLL_SECONDS = 1.0
+RECONNECT_DELAY_SECONDS = 5.0
+
+
+def channel_name(activation_instance_id: int) -> str:
+    return f"{CHANNEL_PREFIX}:{activation_instance_id}"
+
+
+def encode_logs(activation_instance_id: int, rows: tp.Iterable) -> str:
+    """Encode a batch of logs, rows of log, log_timestamp, log_created_at."""
+    return json.dumps(
+        {
+            "type": "Logs",
+            "activation_instance_id": activation_instance_id,
+            "logs": [
+                {
+                    "log": log,
+                    "log_timestamp": log_timestamp,
+                    "log_created_at": (
+                        log_created_at.isoformat() if log_created_at else None
+                    ),
+                }
+                for log, log_timestamp, log_created_at in rows
+            ],
+        }
+    )
+
+
+def publish_logs(activation_instance_id: int, rows: tp.Iterable) -> None:
+    """Publish a batch of logs written, best effort.
+
+    The logs are in the database already, a client missing a batch gets
+    it from the logs endpoint.
+    """
+    try:
+        get_redis_client().publish(
+            channel_name(activation_instance_id),
+            encode_logs(activation_instance_id, rows),
+        )
+    except RedisError as e:
+        logger.warning(
+            "Failed to publish the logs of activation instance %s: %s",
+            activation_instance_id,
+            str(e),
+        )
+
+
+class Subscription(tp.NamedTuple):
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+
+
+class LogStreamHub:
+    """The subscriptions of the websocket clients of an API process."""
+
+    def __init__(self):
+        self.groups: dict[str, list[Subscription]] = collections.defaultdict(
+            list
+        )
+        self.lock = threading.Lock()
+        self.thread: tp.Optional[threading.Thread] = None
+
+    def subscribe(self, activation_instance_id: int) -> asyncio.Queue:
+        """Return the queue receiving the logs of a rulebook process.
+
+        Must be called from the event loop of the client.
+        """
+        queue = asyncio.Queue(maxsize=settings.LOG_STREAM_QUEUE_SIZE)
+        subscription = Subscription(asyncio.get_running_loop(), queue)
+        with self.lock:
+            self.groups[channel_name(activation_instance_id)].append(
+                subscription
+            )
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="log-stream", daemon=True
+                )
+                self.thread.start()
+        return queue
+
+    def unsubscribe(
+        self, activation_instance_id: int, queue: asyncio.Queue
+    ) -> None:
+        channel = channel_name(activation_instance_id)
+        with self.lock:
+            group = [s for s in self.groups[channel] if s.queue is not queue]
+            if group:
+                self.groups[channel] = group
+            else:
+                del self.groups[channel]
+
+    def dispatch(self, channel: str, data: str) -> None:
+        with self.lock:
+            group = list(self.groups.get(channel, ()))
+        for subscription in group:
+            subscription.loop.call_soon_threadsafe(
+                self._put, subscription.queue, data
+            )
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, data: str) -> None:
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning("Log stream client too slow, a batch was dropped")
+
+    def run(self) -> None:
+        while True:
+            try:
+                self._read()
+            except RedisError as e:
+                logger.warning("Log stream subscription failed: %s", str(e))
+                time.sleep(RECONNECT_DELAY_SECONDS)
+
+    def _read(self) -> None:
+        pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+        subscribed: set[str] = set()
+        try:
+            while True:
+                with self.lock:
+                    wanted = set(self.groups)
+                if wanted - subscribed:
+                    pubsub.subscribe(*(wanted - subscribed))
+                if subscribed - wanted:
+                    pubsub.unsubscribe(*(subscribed - wanted))
+                subscribed = wanted
+                if not subscribed:
+                    time.sleep(POLL_SECONDS)
+                    continue
+
+                message = pubsub.get_message(timeout=POLL_SECONDS)
+                if message and message["type"] == "message":
+                    channel = message["channel"]
+                    data = message["data"]
+                    self.dispatch(
+                        (
+                            channel.decode()
+                            if isinstance(channel, bytes)
+                            else channel
+                        ),
+                        data.decode() if isinstance(data, bytes) else data,
+                    )
+        finally:
+            pubsub.close()
+
+
+hub = LogStreamHub()
@@ -0,0 +1,83 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Writes accumulated in Redis and periodically flushed to the database."""
+import typing as tp
+
+import redis
+from django.conf import settings
+
+from aap_eda.core import tasking
+from aap_eda.settings import redis as redis_settings
+
+
+def get_redis_client():
+    return tasking.get_redis_client(
+        **redis_settings.rq_redis_client_instantiation_parameters()
+    )
+
+
+class PendingHash:
+    """A Redis hash of pending writes.
+
+    The hash is renamed before it is flushed, so writes recorded during a
+    flush are kept for the next one. The renamed hash is only deleted
+    after the flush succeeds, a flush interrupted before that is retried
+    by the next one.
+    """
+
+    def __init__(self, name: str):
+        # The hash tag keeps both keys in the same slot of a Redis cluster
+        self.name = name
+        self.pending_key = f"{settings.RQ_REDIS_PREFIX}:{{{name}}}:pending"
+        self.flushing_key = f"{settings.RQ_REDIS_PREFIX}:{{{name}}}:flushing"
+
+    def fields(self, client) -> list[str]:
+        """Return the fields of the pending and flushing hashes."""
+        fields = client.hkeys(self.pending_key) + client.hkeys(
+            self.flushing_key
+        )
+        return [f.decode() if isinstance(f, bytes) else f for f in fields]
+
+    def get(self, client, field: str) -> tp.Optional[str]:
+        """Return the pending value of a field, the newest if any."""
+        for key in (self.pending_key, self.flushing_key):
+            value = client.hget(key, field)
+            if value is not None:
+                return value.decode() if isinstance(value, bytes) else value
+        return None
+
+    def flush(self, client, write: tp.Callable[[dict[str, str]], int]) -> int:
+        """Pass the pending fields and values to write, then drop them.
+
+        Returns what write returns, 0 when nothing was pending.
+        """
+        if not client.exists(self.flushing_key):
+            try:
+                client.rename(self.pending_key, self.flushing_key)
+            except redis.exceptions.ResponseError:
+                # Nothing was recorded since the last flush
+                return 0
+
+        pending = {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else v
+            )
+            for k, v in client.hgetall(self.flushing_key).items()
+        }
+        count = write(pending) if pending else 0
+        client.delete(self.flushing_key)
+        return count
+
+    def clear(self, client) -> None:
+        client.delete(self.pending_key, self.flushing_key)
@@ -12,9 +12,18 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 """Module to perform PG Notify to send data to activations."""
+import asyncio
+import collections
+import contextlib
 import json
 import logging
+import math
+import os
+import threading
+import time
+import typing as tp
 import uuid
+import weakref
 
 import psycopg
 import xxhash
@@ -25,6 +34,9 @@ from aap_eda.core.exceptions import PGNotifyError
 logger = logging.getLogger(__name__)
 
 MAX_MESSAGE_LENGTH = settings.MAX_PG_NOTIFY_MESSAGE_SIZE
+NOTIFY_STATEMENT = "SELECT pg_notify(%s, %s)"
+CONNECT_BACKOFF_SECONDS = 0.1
+MAX_CONNECT_BACKOFF_SECONDS = 2.0
 MESSAGE_CHUNKED_UUID = "_message_chunked_uuid"
 MESSAGE_CHUNK_COUNT = "_message_chunk_count"
 MESSAGE_CHUNK_SEQUENCE = "_message_chunk_sequence"
@@ -33,6 +45,420 @@ MESSAGE_LENGTH = "_message_length"
 MESSAGE_XX_HASH = "_message_xx_hash"
 
 
+class BaseConnectionPool:
+    """Bookkeeping shared by the sync and async PG Notify pools.
+
+    A bounded pool of autocommit connections to one DSN. Connections are
+    handed out LIFO so that a small steady-state load keeps reusing the
+    same warm connections. A connection that has been idle longer than
+    health_check_seconds is probed with a trivial query before it is
+    reused, broken connections are discarded, and new connections are
+    opened with an exponential backoff between attempts. Once closed the
+    pool hands out no connection, those checked out are closed when they
+    are returned.
+
+    The methods below change the pool state and must be called with the
+    lock of the subclass held.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        max_size: int,
+        timeout: float,
+        health_check_seconds: float,
+        connect_retries: int,
+    ):
+        self.dsn = dsn
+        self.max_size = max(max_size, 1)
+        self.timeout = timeout
+        self.health_check_seconds = health_check_seconds
+        self.connect_retries = max(connect_retries, 1)
+        self._idle: collections.deque = collections.deque()
+        self._size = 0
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """Return the number of connections owned by the pool."""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        """Return the number of connections ready to be handed out."""
+        return len(self._idle)
+
+    def _can_check_out(self) -> bool:
+        return self._closed or bool(self._idle) or self._size < self.max_size
+
+    def _check_out(self) -> tuple[tp.Any, float]:
+        """Return an idle connection and its last use, or count a new one.
+
+        The connection is None when a new one has to be opened.
+        """
+        if self._closed:
+            raise PGNotifyError("The PG Notify pool is closed")
+        if self._idle:
+            return self._idle.pop()
+        self._size += 1
+        return None, 0.0
+
+    def _check_in(self, conn) -> bool:
+        """Return whether the connection was kept, else it must be closed."""
+        if self._closed:
+            return False
+        self._idle.append((conn, time.monotonic()))
+        return True
+
+    def _forget(self) -> None:
+        self._size = max(self._size - 1, 0)
+
+    def _take_idle(self) -> list:
+        """Close the pool and return its idle connections to be closed."""
+        self._closed = True
+        conns = [conn for conn, _ in self._idle]
+        self._idle.clear()
+        self._size -= len(conns)
+        return conns
+
+    @staticmethod
+    def _is_reusable(conn) -> bool:
+        return not (
+            conn.closed
+            or conn.broken
+            or conn.info.transaction_status
+            != psycopg.pq.TransactionStatus.IDLE
+        )
+
+    def _needs_probe(self, conn, last_used: float) -> tp.Optional[bool]:
+        """Return whether an idle connection must be probed before reuse.
+
+        None when it is broken and must be discarded.
+        """
+        if conn.closed or conn.broken:
+            return None
+        return time.monotonic() - last_used >= self.health_check_seconds
+
+    def _connect_delays(self) -> tp.Iterator[tuple[int, tp.Optional[float]]]:
+        """Yield each connection attempt with the delay before the next.
+
+        The delay is None for the last attempt.
+        """
+        delay = CONNECT_BACKOFF_SECONDS
+        for attempt in range(1, self.connect_retries):
+            yield attempt, delay
+            delay = min(delay * 2, MAX_CONNECT_BACKOFF_SECONDS)
+        yield self.connect_retries, None
+
+    @staticmethod
+    def _log_retry(attempt: int, delay: float, error: Exception) -> None:
+        logger.warning(
+            "PG Notify connection attempt %d failed, "
+            "retrying in %.1f seconds: %s",
+            attempt,
+            delay,
+            str(error),
+        )
+
+
+class PGNotifyConnectionPool(BaseConnectionPool):
+    """A bounded, thread-safe pool of autocommit connections to one DSN."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+
+    @contextlib.contextmanager
+    def connection(self) -> tp.Iterator[psycopg.Connection]:
+        """Borrow a connection, returning it to the pool on exit."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self) -> None:
+        """Close all idle connections, the checked out ones on return."""
+        with self._cond:
+            for conn in self._take_idle():
+                conn.close()
+            self._cond.notify_all()
+
+    def _acquire(self) -> psycopg.Connection:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                self._reset_after_fork()
+                while not self._can_check_out():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PGNotifyError(
+                            "Timed out waiting for a PG Notify connection"
+                        )
+                    self._cond.wait(remaining)
+                conn, last_used = self._check_out()
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except psycopg.OperationalError:
+                    self._discard(None)
+                    raise
+
+            if self._is_healthy(conn, last_used):
+                return conn
+            self._discard(conn)
+
+    def _release(self, conn: psycopg.Connection) -> None:
+        if self._is_reusable(conn):
+            with self._cond:
+                if os.getpid() != self._pid:
+                    return
+                if self._check_in(conn):
+                    self._cond.notify()
+                    return
+        self._discard(conn)
+
+    def _discard(self, conn: tp.Optional[psycopg.Connection]) -> None:
+        try:
+            if conn is not None:
+                logger.debug("Discarding PG Notify connection")
+                conn.close()
+        finally:
+            with self._cond:
+                self._forget()
+                self._cond.notify()
+
+    def _connect(self) -> psycopg.Connection:
+        for attempt, delay in self._connect_delays():
+            try:
+                return psycopg.connect(conninfo=self.dsn, autocommit=True)
+            except psycopg.OperationalError as e:
+                if delay is None:
+                    raise
+                self._log_retry(attempt, delay, e)
+                time.sleep(delay)
+
+    def _is_healthy(self, conn: psycopg.Connection, last_used: float) -> bool:
+        needs_probe = self._needs_probe(conn, last_used)
+        if needs_probe is None:
+            return False
+        if not needs_probe:
+            return True
+        try:
+            conn.execute("SELECT 1")
+        except psycopg.Error as e:
+            logger.debug("PG Notify connection failed health check: %s", e)
+            return False
+        return True
+
+    def _reset_after_fork(self) -> None:
+        # Connections inherited from the parent process share its sockets,
+        # they must be dropped without being closed.
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._idle.clear()
+            self._size = 0
+
+
+_pools: dict[str, PGNotifyConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(dsn: str) -> PGNotifyConnectionPool:
+    """Return the process-wide connection pool for a DSN."""
+    with _pools_lock:
+        pool = _pools.get(dsn)
+        if pool is None:
+            pool = PGNotifyConnectionPool(
+                dsn,
+                max_size=settings.PG_NOTIFY_POOL_MAX_SIZE,
+                timeout=settings.PG_NOTIFY_POOL_TIMEOUT,
+                health_check_seconds=settings.PG_NOTIFY_HEALTH_CHECK_SECONDS,
+                connect_retries=settings.PG_NOTIFY_CONNECT_RETRIES,
+            )
+            _pools[dsn] = pool
+        return pool
+
+
+def close_connection_pools() -> None:
+    """Close and drop every process-wide connection pool."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+class AsyncPGNotifyConnectionPool(BaseConnectionPool):
+    """An asyncio flavour of PGNotifyConnectionPool.
+
+    The pool and its connections belong to the event loop they were
+    created on, so get_async_connection_pool keeps one pool per loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cond = asyncio.Condition()
+
+    @contextlib.asynccontextmanager
+    async def connection(self) -> tp.AsyncIterator[psycopg.AsyncConnection]:
+        """Borrow a connection, returning it to the pool on exit."""
+        conn = await self._acquire()
+        try:
+            yield conn
+        finally:
+            await self._release(conn)
+
+    async def close(self) -> None:
+        """Close all idle connections, the checked out ones on return."""
+        async with self._cond:
+            for conn in self._take_idle():
+                await conn.close()
+            self._cond.notify_all()
+
+    async def _acquire(self) -> psycopg.AsyncConnection:
+        while True:
+            async with self._cond:
+                try:
+                    await asyncio.wait_for(
+                        self._cond.wait_for(self._can_check_out),
+                        self.timeout,
+                    )
+                except asyncio.TimeoutError as e:
+                    raise PGNotifyError(
+                        "Timed out waiting for a PG Notify connection"
+                    ) from e
+                conn, last_used = self._check_out()
+
+            if conn is None:
+                try:
+                    return await self._connect()
+                except psycopg.OperationalError:
+                    await self._discard(None)
+                    raise
+
+            if await self._is_healthy(conn, last_used):
+                return conn
+            await self._discard(conn)
+
+    async def _release(self, conn: psycopg.AsyncConnection) -> None:
+        if self._is_reusable(conn):
+            async with self._cond:
+                if self._check_in(conn):
+                    self._cond.notify()
+                    return
+        await self._discard(conn)
+
+    async def _discard(
+        self, conn: tp.Optional[psycopg.AsyncConnection]
+    ) -> None:
+        try:
+            if conn is not None:
+                logger.debug("Discarding PG Notify connection")
+                await conn.close()
+        finally:
+            async with self._cond:
+                self._forget()
+                self._cond.notify()
+
+    async def _connect(self) -> psycopg.AsyncConnection:
+        for attempt, delay in self._connect_delays():
+            try:
+                return await psycopg.AsyncConnection.connect(
+                    conninfo=self.dsn, autocommit=True
+                )
+            except psycopg.OperationalError as e:
+                if delay is None:
+                    raise
+                self._log_retry(attempt, delay, e)
+                await asyncio.sleep(delay)
+
+    async def _is_healthy(
+        self, conn: psycopg.AsyncConnection, last_used: float
+    ) -> bool:
+        needs_probe = self._needs_probe(conn, last_used)
+        if needs_probe is None:
+            return False
+        if not needs_probe:
+            return True
+        try:
+            await conn.execute("SELECT 1")
+        except psycopg.Error as e:
+            logger.debug("PG Notify connection failed health check: %s", e)
+            return False
+        return True
+
+
+_async_pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_async_connection_pool(dsn: str) -> AsyncPGNotifyConnectionPool:
+    """Return the connection pool for a DSN on the running event loop."""
+    pools = _async_pools.setdefault(asyncio.get_running_loop(), {})
+    pool = pools.get(dsn)
+    if pool is None:
+        pool = AsyncPGNotifyConnectionPool(
+            dsn,
+            max_size=settings.PG_NOTIFY_POOL_MAX_SIZE,
+            timeout=settings.PG_NOTIFY_POOL_TIMEOUT,
+            health_check_seconds=settings.PG_NOTIFY_HEALTH_CHECK_SECONDS,
+            connect_retries=settings.PG_NOTIFY_CONNECT_RETRIES,
+        )
+        pools[dsn] = pool
+    return pool
+
+
+async def close_async_connection_pools() -> None:
+    """Close and drop the connection pools of the running event loop."""
+    pools = _async_pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        await pool.close()
+
+
+def encode_messages(data: dict) -> list[str]:
+    """Serialize data into the PG Notify messages needed to send it.
+
+    The data is serialized once. When it is too large for a single
+    notification the serialized text is sliced into chunks, each wrapped
+    in an envelope which is itself encoded only once, so per chunk only
+    the slice has to be encoded.
+    """
+    payload = json.dumps(data)
+    message_length = len(payload)
+    logger.debug("Message length %d", message_length)
+    if message_length < MAX_MESSAGE_LENGTH:
+        return [payload]
+
+    xx_hash = xxhash.xxh32(payload.encode("utf-8")).hexdigest()
+    logger.debug("Message length exceeds, will chunk")
+    message_uuid = str(uuid.uuid4())
+    number_of_chunks = math.ceil(message_length / MAX_MESSAGE_LENGTH)
+    logger.debug("Chunk info %s", message_uuid)
+    logger.debug("Number of chunks %d", number_of_chunks)
+    logger.debug("Total data size %d", message_length)
+    logger.debug("XX Hash %s", xx_hash)
+
+    envelope = json.dumps(
+        {
+            MESSAGE_CHUNKED_UUID: message_uuid,
+            MESSAGE_CHUNK_COUNT: number_of_chunks,
+            MESSAGE_LENGTH: message_length,
+            MESSAGE_XX_HASH: xx_hash,
+        }
+    )[:-1]
+    return [
+        f"{envelope}, "
+        f'"{MESSAGE_CHUNK}": '
+        f"{json.dumps(payload[i : i + MAX_MESSAGE_LENGTH])}, "
+        f'"{MESSAGE_CHUNK_SEQUENCE}": {sequence}}}'
+        for sequence, i in enumerate(
+            range(0, message_length, MAX_MESSAGE_LENGTH), start=1
+        )
+    ]
+
+
 class PGNotify:
     """The PGNotify action sends an event to a PG Pub Sub Channel.
 
@@ -49,54 +475,68 @@ class PGNotify:
         self.data = data
 
     def __call__(self):
+        pool = get_connection_pool(self.dsn)
         try:
-            with psycopg.connect(
-                conninfo=self.dsn,
-                autocommit=True,
-            ) as conn:
+            try:
+                self._publish(pool)
+            except psycopg.OperationalError as e:
+                # A pooled connection may have been dropped by the server
+                # since its last health check, retry once on a fresh one.
+                logger.warning("PG Notify failed, retrying: %s", str(e))
+                self._publish(pool)
+        except psycopg.OperationalError as e:
+            logger.error("PG Notify operational error %s", str(e))
+            raise PGNotifyError() from e
+
+    def _publish(self, pool: PGNotifyConnectionPool) -> None:
+        messages = encode_messages(self.data)
+        with pool.connection() as conn:
+            if len(messages) == 1:
+                conn.execute(NOTIFY_STATEMENT, (self.channel, messages[0]))
+                return
+            # Chunks are sent in one transaction so that listeners receive
+            # all of them or none, pipelined when libpq supports it so the
+            # whole message costs a single network round trip.
+            with contextlib.ExitStack() as stack:
+                if psycopg.Pipeline.is_supported():
+                    stack.enter_context(conn.pipeline())
+                stack.enter_context(conn.transaction())
                 with conn.cursor() as cursor:
-                    payload = json.dumps(self.data)
-                    message_length = len(payload)
-                    logger.debug("Message length %d", message_length)
-                    if message_length >= MAX_MESSAGE_LENGTH:
-                        xx_hash = xxhash.xxh32(
-                            payload.encode("utf-8")
-                        ).hexdigest()
-                        logger.debug("Message length exceeds, will chunk")
-                        message_uuid = str(uuid.uuid4())
-                        number_of_chunks = (
-                            int(message_length / MAX_MESSAGE_LENGTH) + 1
-                        )
-                        chunked = {
-                            MESSAGE_CHUNKED_UUID: message_uuid,
-                            MESSAGE_CHUNK_COUNT: number_of_chunks,
-                            MESSAGE_LENGTH: message_length,
-                            MESSAGE_XX_HASH: xx_hash,
-                        }
-                        logger.debug("Chunk info %s", message_uuid)
-                        logger.debug("Number of chunks %d", number_of_chunks)
-                        logger.debug("Total data size %d", message_length)
-                        logger.debug("XX Hash %s", xx_hash)
-
-                        sequence = 1
-                        for i in range(0, message_length, MAX_MESSAGE_LENGTH):
-                            chunked[MESSAGE_CHUNK] = payload[
-                                i : i + MAX_MESSAGE_LENGTH
-                            ]
-                            chunked[MESSAGE_CHUNK_SEQUENCE] = sequence
-                            sequence += 1
-
-                            logger.debug(
-                                "Chunked Length %d", len(json.dumps(chunked))
-                            )
-                            cursor.execute(
-                                f"NOTIFY {self.channel}, "
-                                f"$${json.dumps(chunked)}$$;"
-                            )
-                    else:
-                        cursor.execute(
-                            f"NOTIFY {self.channel}, $${payload}$$;"
-                        )
+                    cursor.executemany(
+                        NOTIFY_STATEMENT,
+                        [(self.channel, message) for message in messages],
+                    )
+
+
+class AsyncPGNotify(PGNotify):
+    """The PGNotify action for use from asyncio code."""
+
+    async def __call__(self):
+        pool = get_async_connection_pool(self.dsn)
+        try:
+            try:
+                await self._apublish(pool)
+            except psycopg.OperationalError as e:
+                logger.warning("PG Notify failed, retrying: %s", str(e))
+                await self._apublish(pool)
         except psycopg.OperationalError as e:
             logger.error("PG Notify operational error %s", str(e))
             raise PGNotifyError() from e
+
+    async def _apublish(self, pool: AsyncPGNotifyConnectionPool) -> None:
+        messages = encode_messages(self.data)
+        async with pool.connection() as conn:
+            if len(messages) == 1:
+                await conn.execute(
+                    NOTIFY_STATEMENT, (self.channel, messages[0])
+                )
+                return
+            async with contextlib.AsyncExitStack() as stack:
+                if psycopg.Pipeline.is_supported():
+                    await stack.enter_async_context(conn.pipeline())
+                await stack.enter_async_context(conn.transaction())
+                async with conn.cursor() as cursor:
+                    await cursor.executemany(
+                        NOTIFY_STATEMENT,
+                        [(self.channel, message) for message in messages],
+                    )
@@ -0,0 +1,287 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Retention of the rulebook process logs, audit and job instance rows.
+
+Each policy deletes the rows of a table older than its retention days.
+The rulebook process logs drop their daily partitions. The other tables
+are walked by ranges of pages of the heap, the old rows of each range
+being deleted in a short transaction, together with the rows referencing
+them. A lock timeout keeps a batch from queueing the inserts of the live
+rows behind it, a batch that times out is retried by the next run. The
+page reached by each policy is kept in Redis, a run that stops before
+the end of a table is resumed from there by the next one.
+"""
+import datetime
+import logging
+import time
+import typing as tp
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from aap_eda.core.models import (
+    AuditAction,
+    AuditEvent,
+    AuditRule,
+    JobInstanceEvent,
+    JobInstanceHost,
+)
+from aap_eda.services import log_partitions
+from aap_eda.services.pending_writes import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+CURSORS_KEY = f"{settings.RQ_REDIS_PREFIX}:retention:cursors"
+
+AUDIT_EVENT_ACTIONS = AuditEvent.audit_actions.through
+AUDIT_EVENT_ACTIONS_EVENT = AuditEvent._meta.get_field(
+    "audit_actions"
+).m2m_column_name()
+AUDIT_EVENT_ACTIONS_ACTION = AuditEvent._meta.get_field(
+    "audit_actions"
+).m2m_reverse_name()
+
+# Rows of the pages from %(start)s to %(end)s older than %(cutoff)s
+PAGE_RANGE_CONDITION = (
+    "ctid >= %(start)s::tid AND ctid < %(end)s::tid "
+    "AND {timestamp} < %(cutoff)s"
+)
+
+
+class RetentionPolicy(tp.NamedTuple):
+    name: str
+    table: str
+    days_setting: str
+    # Deletes the old rows of a range of pages, see PAGE_RANGE_CONDITION
+    delete_sql: str
+
+
+def _delete_audit_rules_sql() -> str:
+    condition = PAGE_RANGE_CONDITION.format(timestamp="fired_at")
+    return (
+        "WITH rules AS ("
+        f"SELECT id FROM {AuditRule._meta.db_table} WHERE {condition}"
+        "), actions AS ("
+        f"SELECT id FROM {AuditAction._meta.db_table} "
+        "WHERE audit_rule_id IN (SELECT id FROM rules)"
+        "), links AS ("
+        f"DELETE FROM {AUDIT_EVENT_ACTIONS._meta.db_table} "
+        f"WHERE {AUDIT_EVENT_ACTIONS_ACTION} IN (SELECT id FROM actions)"
+        "), deleted_actions AS ("
+        f"DELETE FROM {AuditAction._meta.db_table} "
+        "WHERE id IN (SELECT id FROM actions)"
+        ") "
+        f"DELETE FROM {AuditRule._meta.db_table} "
+        "WHERE id IN (SELECT id FROM rules)"
+    )
+
+
+def _delete_with_links_sql(table: str, timestamp: str, column: str) -> str:
+    condition = PAGE_RANGE_CONDITION.format(timestamp=timestamp)
+    return (
+        f"WITH deleted AS (SELECT id FROM {table} WHERE {condition}"
+        "), links AS ("
+        f"DELETE FROM {AUDIT_EVENT_ACTIONS._meta.db_table} "
+        f"WHERE {column} IN (SELECT id FROM deleted)"
+        ") "
+        f"DELETE FROM {table} WHERE id IN (SELECT id FROM deleted)"
+    )
+
+
+def _delete_job_instance_events_sql() -> str:
+    # The hosts of a job go with its last events
+    events = JobInstanceEvent._meta.db_table
+    condition = PAGE_RANGE_CONDITION.format(timestamp="created_at")
+    return (
+        f"WITH deleted AS (DELETE FROM {events} WHERE {condition} "
+        "RETURNING job_uuid) "
+        f"DELETE FROM {JobInstanceHost._meta.db_table} AS h "
+        "WHERE h.job_uuid IN (SELECT job_uuid FROM deleted) "
+        f"AND NOT EXISTS (SELECT 1 FROM {events} AS e "
+        "WHERE e.job_uuid = h.job_uuid AND e.created_at >= %(cutoff)s)"
+    )
+
+
+# Deleting the audit rules first deletes their actions along
+POLICIES = [
+    RetentionPolicy(
+        "audit_rule",
+        AuditRule._meta.db_table,
+        "AUDIT_RULE_RETENTION_DAYS",
+        _delete_audit_rules_sql(),
+    ),
+    RetentionPolicy(
+        "audit_action",
+        AuditAction._meta.db_table,
+        "AUDIT_ACTION_RETENTION_DAYS",
+        _delete_with_links_sql(
+            AuditAction._meta.db_table,
+            "fired_at",
+            AUDIT_EVENT_ACTIONS_ACTION,
+        ),
+    ),
+    RetentionPolicy(
+        "audit_event",
+        AuditEvent._meta.db_table,
+        "AUDIT_EVENT_RETENTION_DAYS",
+        _delete_with_links_sql(
+            AuditEvent._meta.db_table,
+            "received_at",
+            AUDIT_EVENT_ACTIONS_EVENT,
+        ),
+    ),
+    RetentionPolicy(
+        "job_instance_event",
+        JobInstanceEvent._meta.db_table,
+        "JOB_INSTANCE_EVENT_RETENTION_DAYS",
+        _delete_job_instance_events_sql(),
+    ),
+]
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.at = time.monotonic() + seconds
+
+    def passed(self) -> bool:
+        return time.monotonic() >= self.at
+
+
+def _set_lock_timeout(cursor) -> None:
+    cursor.execute(
+        "SELECT set_config('lock_timeout', %s, true)",
+        [f"{settings.RETENTION_LOCK_TIMEOUT_MS}ms"],
+    )
+
+
+def _table_pages(table: str) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_relation_size(%s::regclass) "
+            "/ current_setting('block_size')::int",
+            [table],
+        )
+        return cursor.fetchone()[0]
+
+
+def _get_cursor(client, policy: RetentionPolicy) -> int:
+    value = client.hget(CURSORS_KEY, policy.name)
+    return int(value) if value is not None else 0
+
+
+def _set_cursor(client, policy: RetentionPolicy, page: int) -> None:
+    if page:
+        client.hset(CURSORS_KEY, policy.name, page)
+    else:
+        client.hdel(CURSORS_KEY, policy.name)
+
+
+def _delete_page_range(
+    policy: RetentionPolicy, cutoff: datetime.datetime, start: int, end: int
+) -> int:
+    with transaction.atomic(), connection.cursor() as cursor:
+        _set_lock_timeout(cursor)
+        cursor.execute(
+            policy.delete_sql,
+            {
+                "start": f"({start},0)",
+                "end": f"({end},0)",
+                "cutoff": cutoff,
+            },
+        )
+        return cursor.rowcount
+
+
+def apply_policy(
+    policy: RetentionPolicy, cutoff: datetime.datetime, deadline: Deadline
+) -> int:
+    """Delete the rows of a table older than the cutoff, batch by batch.
+
+    Starts from the page reached by the last run. Returns the number of
+    rows deleted.
+    """
+    client = get_redis_client()
+    batch_pages = settings.RETENTION_BATCH_PAGES
+    pages = _table_pages(policy.table)
+    page = _get_cursor(client, policy)
+    deleted = 0
+    while page < pages:
+        if deadline.passed():
+            logger.info(
+                "Retention of %s stopped at page %d of %d, "
+                "it is resumed by the next run",
+                policy.table,
+                page,
+                pages,
+            )
+            return deleted
+        try:
+            deleted += _delete_page_range(
+                policy, cutoff, page, page + batch_pages
+            )
+        except OperationalError as e:
+            # Most likely the lock timeout, retried by the next run
+            logger.warning(
+                "Retention of %s failed at page %d: %s",
+                policy.table,
+                page,
+                str(e),
+            )
+            return deleted
+        page += batch_pages
+        _set_cursor(client, policy, page)
+        time.sleep(settings.RETENTION_BATCH_DELAY_MS / 1000)
+
+    _set_cursor(client, policy, 0)
+    return deleted
+
+
+def apply_log_policy(cutoff: datetime.datetime) -> int:
+    """Drop the partitions of the rulebook process logs older than cutoff.
+
+    The old rows of the partitions straddling the cutoff are deleted in
+    chunks. Returns the number of partitions dropped.
+    """
+    timestamp = int(cutoff.timestamp())
+    dropped = log_partitions.drop_partitions(
+        timestamp, settings.RETENTION_LOCK_TIMEOUT_MS
+    )
+    log_partitions.delete_logs(timestamp)
+    return len(dropped)
+
+
+def _cutoff(days_setting: str) -> tp.Optional[datetime.datetime]:
+    days = getattr(settings, days_setting)
+    if days <= 0:
+        return None
+    return timezone.now() - datetime.timedelta(days=days)
+
+
+def apply_policies() -> dict[str, int]:
+    """Apply the retention policies with retention days set.
+
+    Returns the number of rows deleted by policy, of partitions dropped
+    for the rulebook process logs.
+    """
+    deadline = Deadline(settings.RETENTION_MAX_RUN_SECONDS)
+    results = {}
+    cutoff = _cutoff("RULEBOOK_PROCESS_LOG_RETENTION_DAYS")
+    if cutoff:
+        results["rulebook_process_log"] = apply_log_policy(cutoff)
+    for policy in POLICIES:
+        cutoff = _cutoff(policy.days_setting)
+        if cutoff and not deadline.passed():
+            results[policy.name] = apply_policy(policy, cutoff, deadline)
+    return results
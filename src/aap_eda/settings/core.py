@@ -146,6 +146,25 @@ REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "aap_eda.api.exceptions.api_fallback_handler",
 }
 
+# Query parameters not taken as field lookups by the DAB filters, with
+# those of the keyset pagination
+ANSIBLE_BASE_REST_FILTERS_RESERVED_NAMES = (
+    "page",
+    "page_size",
+    "format",
+    "order",
+    "order_by",
+    "search",
+    "type",
+    "host_filter",
+    "count_disabled",
+    "no_truncate",
+    "limit",
+    "validate",
+    "cursor",
+    "count",
+)
+
 DEFAULT_REDIS_DB = 0
 
 # ---------------------------------------------------------
@@ -182,6 +201,29 @@ RQ_PERIODIC_JOBS = [
         "interval": 30,
         "id": "monitor_project_tasks",
     },
+    {
+        "func": "aap_eda.tasks.event_stream.flush_event_stream_stats",
+        "interval": 5,
+        "id": "flush_event_stream_stats",
+    },
+    {
+        "func": "aap_eda.tasks.heartbeat.flush_rulebook_process_heartbeats",
+        "interval": 5,
+        "id": "flush_rulebook_process_heartbeats",
+    },
+    {
+        "func": (
+            "aap_eda.tasks.rulebook_process_log."
+            "create_rulebook_process_log_partitions"
+        ),
+        "interval": 3600,
+        "id": "create_rulebook_process_log_partitions",
+    },
+    {
+        "func": "aap_eda.tasks.retention.apply_retention_policies",
+        "interval": 3600,
+        "id": "apply_retention_policies",
+    },
 ]
 RQ_CRON_JOBS = []
 
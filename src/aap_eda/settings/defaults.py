@@ -140,6 +140,20 @@ DEPLOYMENT_TYPE: str = "podman"
 WEBSOCKET_BASE_URL: str = "ws://localhost:8000"
 WEBSOCKET_SSL_VERIFY: Union[bool, str] = "yes"
 WEBSOCKET_TOKEN_BASE_URL: Optional[str] = None
+# Messages received from ansible-rulebook are written in batches of up to
+# this size, at most this many milliseconds after they are received
+WEBSOCKET_ACTION_BATCH_SIZE: int = 100
+WEBSOCKET_ACTION_BATCH_DELAY_MS: int = 50
+WEBSOCKET_JOB_BATCH_SIZE: int = 100
+WEBSOCKET_JOB_BATCH_DELAY_MS: int = 50
+WEBSOCKET_EVENT_BATCH_SIZE: int = 1000
+WEBSOCKET_EVENT_BATCH_DELAY_MS: int = 200
+# How long a websocket connection keeps the activation of its rulebook
+# process before reloading it
+WEBSOCKET_ACTIVATION_CONTEXT_TTL_SECONDS: int = 60
+# Batches of logs kept for a client following the logs of a rulebook
+# process live, the newer ones are dropped while it is this far behind
+LOG_STREAM_QUEUE_SIZE: int = 100
 PODMAN_SOCKET_URL: Optional[str] = None
 PODMAN_SOCKET_TIMEOUT: Optional[int] = 0
 PODMAN_MEM_LIMIT: Optional[str] = "200m"
@@ -176,6 +190,21 @@ MQ_CLUSTER_ERROR_RETRY_ATTEMPTS: int = 3
 # A list of queues to be used in multinode mode
 # If the list is empty, use the default singlenode queue name
 RULEBOOK_WORKER_QUEUES: StrToList = []
+# At most this many start and restart requests are dispatched by each
+# monitor_rulebook_processes task, the rest wait for the next one;
+# 0 disables the limit
+RULEBOOK_START_REQUESTS_PER_TICK: int = 100
+# How new rulebook processes are placed on the queues: least-busy,
+# spread, bin-pack or the import path of a PlacementStrategy subclass
+RULEBOOK_PLACEMENT_STRATEGY: str = "least-busy"
+# How often the workers list the images they publish in their capacity
+RULEBOOK_WORKER_IMAGES_REFRESH_SECONDS: int = 60
+# How often the workers measure the capacity they publish with their
+# heartbeats
+RULEBOOK_WORKER_CAPACITY_SECONDS: int = 30
+# How many activation jobs each rulebook worker runs at once, each in its
+# own work horse; activations are still managed one at a time
+RULEBOOK_WORKER_CONCURRENCY: int = 1
 
 DEFAULT_QUEUE_TIMEOUT: int = 300
 DEFAULT_RULEBOOK_QUEUE_TIMEOUT: int = 120
@@ -187,6 +216,11 @@ API_PREFIX: str = "api/eda"
 APP_LOG_LEVEL: str = "INFO"
 
 SCHEDULER_JOB_INTERVAL: int = 5
+# Running rulebook processes are monitored this often; starting ones at
+# every scheduler job. All the active processes are swept every
+# RULEBOOK_MONITOR_SWEEP_SECONDS in case a monitor schedule was lost.
+RULEBOOK_MONITOR_INTERVAL_SECONDS: int = 30
+RULEBOOK_MONITOR_SWEEP_SECONDS: int = 300
 
 # ---------------------------------------------------------
 # CONTROLLER SETTINGS
@@ -213,6 +247,28 @@ MAX_RUNNING_ACTIVATIONS: int = 5
 # ---------------------------------------------------------
 ANSIBLE_RULEBOOK_LOG_LEVEL: str = "error"
 ANSIBLE_RULEBOOK_FLUSH_AFTER: int = 100
+# The rulebook process logs are partitioned by day, the partitions of
+# today and of this many days ahead are kept created
+RULEBOOK_PROCESS_LOG_PARTITION_DAYS_AHEAD: int = 7
+
+# ---------------------------------------------------------
+# RETENTION SETTINGS
+# ---------------------------------------------------------
+# Rows older than this many days are deleted by the retention job,
+# 0 keeps them forever
+RULEBOOK_PROCESS_LOG_RETENTION_DAYS: int = 0
+AUDIT_RULE_RETENTION_DAYS: int = 0
+AUDIT_ACTION_RETENTION_DAYS: int = 0
+AUDIT_EVENT_RETENTION_DAYS: int = 0
+JOB_INSTANCE_EVENT_RETENTION_DAYS: int = 0
+# Each batch deletes the old rows of this many pages of a table in its
+# own transaction, then waits before the next one
+RETENTION_BATCH_PAGES: int = 100
+RETENTION_BATCH_DELAY_MS: int = 100
+RETENTION_LOCK_TIMEOUT_MS: int = 1000
+# A run stops after this long, within DEFAULT_QUEUE_TIMEOUT; the next one
+# resumes where it stopped
+RETENTION_MAX_RUN_SECONDS: int = 240
 
 # ---------------------------------------------------------
 # DJANGO ANSIBLE BASE JWT SETTINGS
@@ -251,6 +307,15 @@ PG_NOTIFY_DSN_SERVER: Optional[str] = None
 EVENT_STREAM_BASE_URL: UrlSlash = None
 EVENT_STREAM_MTLS_BASE_URL: UrlSlash = None
 MAX_PG_NOTIFY_MESSAGE_SIZE: int = 6144
+# Process-wide pool of connections used to publish events via PG Notify
+PG_NOTIFY_POOL_MAX_SIZE: int = 10
+PG_NOTIFY_POOL_TIMEOUT: int = 10
+PG_NOTIFY_HEALTH_CHECK_SECONDS: int = 30
+PG_NOTIFY_CONNECT_RETRIES: int = 3
+# Per-process cache of event streams and their decrypted credential inputs,
+# a TTL of 0 disables the cache
+EVENT_STREAM_CACHE_TTL_SECONDS: int = 60
+EVENT_STREAM_CACHE_MAX_SIZE: int = 1024
 
 # --------------------------------------------------------
 # METRICS COLLECTIONS:
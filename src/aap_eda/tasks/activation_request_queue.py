@@ -12,8 +12,9 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+from typing import Optional
+
 from django.db import transaction
-from django.db.models.query import QuerySet
 from django.db.utils import IntegrityError
 
 from aap_eda.core.enums import ActivationRequest, ProcessParentType
@@ -51,11 +52,51 @@ def push(
         )
 
 
+@transaction.atomic
+def push_many(
+    parent_type: str,
+    parent_ids: list[int],
+    request: ActivationRequest,
+    request_id: str = "",
+) -> int:
+    """Push the request for all the parents with a single insert.
+
+    Returns the number of requests pushed; the parents that no longer
+    exist are ignored.
+    """
+    if parent_type == ProcessParentType.ACTIVATION:
+        model = Activation
+    else:
+        raise UnknownProcessParentType(
+            f"Unknown parent type {parent_type}",
+        )
+
+    requests = ActivationRequestQueue.objects.bulk_create(
+        ActivationRequestQueue(
+            process_parent_type=parent_type,
+            process_parent_id=parent_id,
+            request=request,
+            request_id=request_id,
+        )
+        for parent_id in parent_ids
+    )
+
+    # Drop the requests of the parents deleted meanwhile
+    existing = set(
+        model.objects.filter(id__in=parent_ids).values_list("id", flat=True)
+    )
+    missing = [
+        queued.id
+        for queued in requests
+        if queued.process_parent_id not in existing
+    ]
+    if missing:
+        ActivationRequestQueue.objects.filter(id__in=missing).delete()
+    return len(requests) - len(missing)
+
+
 def peek_all(parent_type: str, parent_id: int) -> list[ActivationRequestQueue]:
-    requests = ActivationRequestQueue.objects.filter(
-        process_parent_type=parent_type, process_parent_id=parent_id
-    ).all()
-    return _arbitrate(requests)
+    return _arbitrate(parent_type, parent_id)
 
 
 def pop_until(parent_type: str, parent_id: int, queue_id: int) -> None:
@@ -66,61 +107,99 @@ def pop_until(parent_type: str, parent_id: int, queue_id: int) -> None:
     ).delete()
 
 
-def list_requests() -> QuerySet[ActivationRequestQueue]:
-    return ActivationRequestQueue.objects.order_by(
-        "process_parent_id",
-    ).distinct("process_parent_type", "process_parent_id")
+def list_requests() -> list[ActivationRequestQueue]:
+    """Arbitrate the requests of all the parents at once.
+
+    Returns the first effective request of each parent.
+    """
+    requests = {}
+    for request in _arbitrate():
+        requests.setdefault(
+            (request.process_parent_type, request.process_parent_id), request
+        )
+    return list(requests.values())
+
+
+# The requests are arbitrated per parent in order of arrival:
+# * auto_start is only kept when it is the only kind of request queued;
+# * nothing can be done after delete, so the first delete wins;
+# * stop supersedes everything queued before it and repeated stops are
+#   deduplicated, keeping the first stop of the last run of stops;
+# * start and restart are deduplicated, keeping the first one after the
+#   effective stop, or the first one if there is no stop.
+ARBITRATE_SQL = f"""
+WITH ordered AS (
+    SELECT id, process_parent_type, process_parent_id, request,
+        LAG(request) OVER (
+            PARTITION BY process_parent_type, process_parent_id
+            ORDER BY id
+        ) AS previous
+    FROM {{table}}
+    WHERE request <> '{ActivationRequest.AUTO_START}' {{scope}}
+    UNION ALL
+    SELECT MIN(id), process_parent_type, process_parent_id, request, NULL
+    FROM {{table}} AS auto
+    WHERE request = '{ActivationRequest.AUTO_START}' {{scope}}
+    AND NOT EXISTS (
+        SELECT 1 FROM {{table}} AS other
+        WHERE other.process_parent_type = auto.process_parent_type
+        AND other.process_parent_id = auto.process_parent_id
+        AND other.request <> '{ActivationRequest.AUTO_START}'
+    )
+    GROUP BY process_parent_type, process_parent_id, request
+),
+marked AS (
+    SELECT id, request, previous,
+        MIN(id) OVER parent AS first_id,
+        MIN(id) FILTER (
+            WHERE request = '{ActivationRequest.DELETE}'
+        ) OVER parent AS delete_id,
+        MAX(id) FILTER (
+            WHERE request = '{ActivationRequest.STOP}'
+            AND previous IS DISTINCT FROM '{ActivationRequest.STOP}'
+        ) OVER parent AS stop_id,
+        MAX(id) FILTER (
+            WHERE request = '{ActivationRequest.STOP}'
+        ) OVER parent AS last_stop_id
+    FROM ordered
+    WINDOW parent AS (PARTITION BY process_parent_type, process_parent_id)
+),
+effective AS (
+    SELECT id FROM marked
+    WHERE CASE
+        WHEN delete_id IS NOT NULL THEN id = delete_id
+        WHEN stop_id IS NOT NULL THEN id = stop_id OR (
+            id > last_stop_id AND previous = '{ActivationRequest.STOP}'
+        )
+        ELSE id = first_id
+    END
+),
+superseded AS (
+    DELETE FROM {{table}}
+    WHERE id NOT IN (SELECT id FROM effective) {{scope}}
+)
+SELECT * FROM {{table}}
+WHERE id IN (SELECT id FROM effective)
+ORDER BY process_parent_type, process_parent_id, id
+"""
 
 
 def _arbitrate(
-    requests: list[ActivationRequestQueue],
+    parent_type: Optional[str] = None,
+    parent_id: Optional[int] = None,
 ) -> list[ActivationRequestQueue]:
-    if len(requests) < 2:
-        return requests
-
-    ref_request = None
-    qualified_requests = []
-    starts = [ActivationRequest.START, ActivationRequest.RESTART]
-    for request in requests:
-        if not ref_request:
-            ref_request = request
-            continue
-
-        # nothing can be done after delete
-        # or dedup
-        # or skip auto_start
-        if (
-            ref_request.request == ActivationRequest.DELETE
-            or request.request == ref_request.request
-            or request.request == ActivationRequest.AUTO_START
-        ):
-            request.delete()
-            continue
-
-        if ref_request.request == ActivationRequest.AUTO_START:
-            ref_request.delete()
-            ref_request = request
-            continue
-
-        if (
-            request.request == ActivationRequest.STOP
-            or request.request == ActivationRequest.DELETE
-        ):
-            while qualified_requests:
-                qualified = qualified_requests.pop()
-                qualified.delete()
-            ref_request.delete()
-            ref_request = request
-            continue
-
-        if request.request in starts and ref_request.request in starts:
-            request.delete()
-            continue
-
-        qualified_requests.append(ref_request)
-        ref_request = request
-
-    if ref_request:
-        qualified_requests.append(ref_request)
-
-    return qualified_requests
+    """Compute the effective requests and delete the superseded ones.
+
+    Both are done with a single statement, for one parent or for all of
+    them when no parent is given.
+    """
+    scope = ""
+    params = []
+    if parent_type is not None:
+        scope = "AND process_parent_type = %s AND process_parent_id = %s"
+        params = [parent_type, parent_id]
+    sql = ARBITRATE_SQL.format(
+        table=ActivationRequestQueue._meta.db_table, scope=scope
+    )
+    # the scope appears three times in the statement
+    return list(ActivationRequestQueue.objects.raw(sql, params * 3))
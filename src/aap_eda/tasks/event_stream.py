@@ -0,0 +1,44 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import logging
+
+import django_rq
+from ansible_base.lib.utils.db import advisory_lock
+
+from aap_eda.core import tasking
+from aap_eda.services.event_stream_stats import flush_stats
+
+logger = logging.getLogger(__name__)
+
+# Wrap the django_rq job decorator so its processing is within our retry
+# code.
+job = tasking.redis_connect_retry()(django_rq.job)
+
+
+@job("default")
+def flush_event_stream_stats() -> None:
+    """Write the coalesced event stream statistics to the database.
+
+    Started by the scheduler, executed by the default worker.
+    """
+    with advisory_lock("flush_event_stream_stats", wait=False) as acquired:
+        if not acquired:
+            logger.debug(
+                "flush_event_stream_stats being ran by "
+                "another process, exiting",
+            )
+            return
+
+        flush_stats()
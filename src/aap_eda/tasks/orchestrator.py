@@ -13,9 +13,10 @@
 #  limitations under the License.
 
 import logging
-import random
+import time
 import uuid
 from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -23,6 +24,10 @@ import django_rq
 from ansible_base.lib.utils.db import advisory_lock
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Count
+from rq.utils import as_text, utcparse
+from rq.worker_registration import WORKERS_BY_QUEUE_KEY
 
 import aap_eda.tasks.activation_request_queue as requests_queue
 from aap_eda.core import models, tasking
@@ -41,7 +46,10 @@ from aap_eda.services.activation.activation_manager import (
     ActivationManager,
     StatusManager,
 )
+from aap_eda.services.activation.capacity import CAPACITY_FIELD, WorkerCapacity
+from aap_eda.settings import redis as redis_settings
 
+from . import placement
 from .exceptions import UnknownProcessParentType
 
 # Wrap the django_rq job decorator so its processing is within our retry
@@ -58,11 +66,127 @@ class HealthyQueueNotFoundError(Exception):
     ...
 
 
+ACTIVE_STATUSES = [
+    ActivationStatus.STARTING,
+    ActivationStatus.RUNNING,
+    ActivationStatus.WORKERS_OFFLINE,
+]
+
+# Requests that start a rulebook process
+START_REQUESTS = [
+    ActivationRequest.START,
+    ActivationRequest.AUTO_START,
+    ActivationRequest.RESTART,
+]
+
+# Statuses of the processes counted in the load of a queue
+LOAD_STATUSES = [ActivationStatus.RUNNING, ActivationStatus.STARTING]
+
+
 def _manage_process_job_id(process_parent_type: str, id: int) -> str:
     """Return the unique job id for the activation manager task."""
     return f"{process_parent_type}-{id}"
 
 
+def _get_redis_client():
+    return tasking.get_redis_client(
+        **redis_settings.rq_redis_client_instantiation_parameters()
+    )
+
+
+def _monitor_schedule_key() -> str:
+    return f"{settings.RQ_REDIS_PREFIX}:monitor-schedule"
+
+
+def _monitor_sweep_key() -> str:
+    return f"{settings.RQ_REDIS_PREFIX}:monitor-sweep"
+
+
+def schedule_monitor(
+    process_parent_type: str, process_parent_id: int, delay: int = 0
+) -> None:
+    """Schedule monitoring the process parent in delay seconds.
+
+    A process parent is monitored by the next monitor_rulebook_processes
+    task after it is due. Scheduling it again replaces the due time.
+    """
+    _get_redis_client().zadd(
+        _monitor_schedule_key(),
+        {f"{process_parent_type}:{process_parent_id}": time.time() + delay},
+    )
+
+
+def unschedule_monitor(
+    process_parent_type: str, process_parent_id: int
+) -> None:
+    """Stop monitoring the process parent."""
+    _get_redis_client().zrem(
+        _monitor_schedule_key(), f"{process_parent_type}:{process_parent_id}"
+    )
+
+
+def _pop_due_monitors() -> list[tuple[str, int]]:
+    """Return the process parents due to be monitored and unschedule them."""
+    now = time.time()
+    pipe = _get_redis_client().pipeline()
+    pipe.zrangebyscore(_monitor_schedule_key(), "-inf", now)
+    pipe.zremrangebyscore(_monitor_schedule_key(), "-inf", now)
+    members, _ = pipe.execute()
+
+    due = []
+    for member in members:
+        if isinstance(member, bytes):
+            member = member.decode()
+        process_parent_type, _, process_parent_id = member.rpartition(":")
+        try:
+            due.append((process_parent_type, int(process_parent_id)))
+        except ValueError:
+            LOGGER.warning(f"Invalid monitor schedule entry {member}")
+    return due
+
+
+def _start_sweep() -> bool:
+    """Return True when all the active processes are due to be swept.
+
+    At most one sweep is started every RULEBOOK_MONITOR_SWEEP_SECONDS.
+    """
+    return bool(
+        _get_redis_client().set(
+            _monitor_sweep_key(),
+            int(time.time()),
+            nx=True,
+            ex=settings.RULEBOOK_MONITOR_SWEEP_SECONDS,
+        )
+    )
+
+
+def _reschedule_monitor(
+    process_parent_type: str, process_parent: Activation
+) -> None:
+    """Schedule the next monitoring of the process parent by its status."""
+    try:
+        process_parent.refresh_from_db(fields=["status"])
+    except ObjectDoesNotExist:
+        unschedule_monitor(process_parent_type, process_parent.id)
+        return
+
+    if process_parent.status == ActivationStatus.STARTING:
+        # Starting processes are checked at every tick until they run
+        schedule_monitor(
+            process_parent_type,
+            process_parent.id,
+            settings.SCHEDULER_JOB_INTERVAL,
+        )
+    elif process_parent.status in ACTIVE_STATUSES:
+        schedule_monitor(
+            process_parent_type,
+            process_parent.id,
+            settings.RULEBOOK_MONITOR_INTERVAL_SECONDS,
+        )
+    else:
+        unschedule_monitor(process_parent_type, process_parent.id)
+
+
 def get_process_parent(
     process_parent_type: str,
     parent_id: int,
@@ -110,32 +234,38 @@ def _manage_no_lock(
             f"{process_parent_type} with {id} no longer exists, "
             "activation manager task will not be processed",
         )
+        unschedule_monitor(process_parent_type, id)
         return
 
-    has_request_processed = False
-    while_condition = True
-    while while_condition:
-        pending_requests = requests_queue.peek_all(process_parent_type, id)
-        while_condition = bool(pending_requests)
-        for request in pending_requests:
-            if _run_request(process_parent, request):
-                requests_queue.pop_until(process_parent_type, id, request.id)
-                has_request_processed = True
-            else:
-                while_condition = False
-                break
-
-    if not has_request_processed and process_parent.status in [
-        ActivationStatus.STARTING,
-        ActivationStatus.RUNNING,
-        ActivationStatus.WORKERS_OFFLINE,
-    ]:
-        assign_request_id(request_id)
-        assign_log_tracking_id(process_parent.log_tracking_id)
-        LOGGER.info(
-            f"Processing monitor request for {process_parent_type} {id}",
-        )
-        ActivationManager(process_parent).monitor()
+    try:
+        has_request_processed = False
+        while_condition = True
+        while while_condition:
+            pending_requests = requests_queue.peek_all(process_parent_type, id)
+            while_condition = bool(pending_requests)
+            for request in pending_requests:
+                if _run_request(process_parent, request):
+                    requests_queue.pop_until(
+                        process_parent_type, id, request.id
+                    )
+                    has_request_processed = True
+                else:
+                    while_condition = False
+                    break
+
+        if (
+            not has_request_processed
+            and process_parent.status in ACTIVE_STATUSES
+        ):
+            assign_request_id(request_id)
+            assign_log_tracking_id(process_parent.log_tracking_id)
+            LOGGER.info(
+                f"Processing monitor request for {process_parent_type} {id}",
+            )
+            ActivationManager(process_parent).monitor()
+    finally:
+        # Also when the manager fails, so that it is retried
+        _reschedule_monitor(process_parent_type, process_parent)
 
 
 def _run_request(
@@ -185,6 +315,7 @@ def dispatch(
     process_parent_id: int,
     request_type: Optional[ActivationRequest],
     request_id: str = "",
+    snapshot: Optional["QueueSnapshot"] = None,
 ):
     """Dispatch the request to the right queue.
 
@@ -193,6 +324,9 @@ def dispatch(
     that selects the least busy queue to process the request and
     checks the health of the queue before dispatching the request.
     Handles workers offline and unhealthy queues.
+    The health and load of the queues are read from the snapshot when
+    one is given, new processes are then placed by the placement
+    strategy and the snapshot is updated with them.
     """
     job_id = _manage_process_job_id(process_parent_type, process_parent_id)
 
@@ -209,6 +343,7 @@ def dispatch(
             f"{process_parent_type} {process_parent_id} no longer exists, "
             f"request {request_type} can not be dispatched.",
         )
+        unschedule_monitor(process_parent_type, process_parent_id)
         return
 
     assign_request_id(request_id)
@@ -248,7 +383,7 @@ def dispatch(
             f"{process_parent_id} as new process.",
         )
         try:
-            queue_name = get_least_busy_queue_name()
+            queue_name = get_least_busy_queue_name(snapshot, process_parent)
         except HealthyQueueNotFoundError:
             msg = (
                 f"There are no healthy queues to process the start request "
@@ -291,7 +426,9 @@ def dispatch(
                     "previous configuation settings.",
                 )
             try:
-                queue_name = get_least_busy_queue_name()
+                queue_name = get_least_busy_queue_name(
+                    snapshot, process_parent
+                )
             except HealthyQueueNotFoundError:
                 msg = (
                     f"There are no healthy queues to process operation "
@@ -306,7 +443,7 @@ def dispatch(
                     msg,
                 )
                 return
-        elif not check_rulebook_queue_health(queue_name):
+        elif not check_rulebook_queue_health(queue_name, snapshot):
             # The queue is unhealthy.  If we're not restarting it there's
             # nothing we can do except update its status to WORKERS_OFFLINE.
             if request_type != ActivationRequest.RESTART:
@@ -349,7 +486,9 @@ def dispatch(
                 "after failing liveness checks of current associated queue"
             )
             try:
-                queue_name = get_least_busy_queue_name()
+                queue_name = get_least_busy_queue_name(
+                    snapshot, process_parent
+                )
             except HealthyQueueNotFoundError:
                 msg = (
                     f"There are no healthy queues to process the "
@@ -376,17 +515,32 @@ def dispatch(
         process_parent_id,
         request_id,
     )
+    if snapshot is not None and request_type in [
+        ActivationRequest.START,
+        ActivationRequest.AUTO_START,
+    ]:
+        snapshot.add_process(queue_name, process_parent)
+
 
+def get_least_busy_queue_name(
+    snapshot: Optional["QueueSnapshot"] = None,
+    process_parent: Optional[Activation] = None,
+) -> str:
+    """Return the queue name with the least running processes.
+
+    With a snapshot the queue is chosen among the healthy queues by the
+    RULEBOOK_PLACEMENT_STRATEGY, the least busy one by default.
+    """
+    if snapshot is not None:
+        return snapshot.select_queue_name(process_parent)
 
-def get_least_busy_queue_name() -> str:
-    """Return the queue name with the least running processes."""
     queue_counter = Counter()
 
     for queue_name in settings.RULEBOOK_WORKER_QUEUES:
         if not check_rulebook_queue_health(queue_name):
             continue
         running_processes_count = models.RulebookProcess.objects.filter(
-            status__in=[ActivationStatus.RUNNING, ActivationStatus.STARTING],
+            status__in=LOAD_STATUSES,
             rulebookprocessqueue__queue_name=queue_name,
         ).count()
         queue_counter[queue_name] = running_processes_count
@@ -396,13 +550,7 @@ def get_least_busy_queue_name() -> str:
             "No healthy queue found to dispatch the request",
         )
 
-    min_count = queue_counter.most_common()[-1][1]
-    least_common = [
-        queue for queue, count in queue_counter.items() if count == min_count
-    ]
-    if len(least_common) == 1:
-        return least_common[0]
-    return random.choice(least_common)
+    return placement.least_busy(queue_counter)
 
 
 def get_queue_name_by_parent_id(
@@ -434,13 +582,24 @@ def get_queue_name_by_parent_id(
     return process.rulebookprocessqueue.queue_name
 
 
+def _heartbeat_threshold() -> datetime:
+    return datetime.now() - timedelta(
+        seconds=settings.DEFAULT_WORKER_HEARTBEAT_TIMEOUT,
+    )
+
+
 @tasking.redis_connect_retry()
-def check_rulebook_queue_health(queue_name: str) -> bool:
+def check_rulebook_queue_health(
+    queue_name: str, snapshot: Optional["QueueSnapshot"] = None
+) -> bool:
     """Check for the state of the queue.
 
     Returns True if the queue is healthy, False otherwise.
     Clears the queue if all workers are dead to avoid stuck processes.
     """
+    if snapshot is not None:
+        return snapshot.is_healthy(queue_name)
+
     queue = django_rq.get_queue(queue_name)
 
     all_workers_dead = True
@@ -448,10 +607,7 @@ def check_rulebook_queue_health(queue_name: str) -> bool:
         last_heartbeat = worker.last_heartbeat
         if last_heartbeat is None:
             continue
-        threshold = datetime.now() - timedelta(
-            seconds=settings.DEFAULT_WORKER_HEARTBEAT_TIMEOUT,
-        )
-        if last_heartbeat >= threshold:
+        if last_heartbeat >= _heartbeat_threshold():
             all_workers_dead = False
             break
 
@@ -462,6 +618,146 @@ def check_rulebook_queue_health(queue_name: str) -> bool:
     return True
 
 
+@dataclass
+class QueueStatus:
+    """Health and load of a rulebook worker queue."""
+
+    name: str
+    live_workers: int = 0
+    last_heartbeat: Optional[datetime] = None
+    running_processes: int = 0
+    capacity: Optional[WorkerCapacity] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.live_workers > 0
+
+    @property
+    def heartbeat_age(self) -> Optional[timedelta]:
+        if self.last_heartbeat is None:
+            return None
+        return datetime.now() - self.last_heartbeat
+
+    def add_process(self, request: placement.PlacementRequest) -> None:
+        """Count a new process, deducting its resources from the capacity."""
+        self.running_processes += 1
+        if self.capacity is None:
+            return
+        if request.memory and self.capacity.free_memory is not None:
+            self.capacity.free_memory -= request.memory
+        if request.image_url:
+            self.capacity.images |= {request.image_url}
+
+
+class QueueSnapshot:
+    """Health and load of the rulebook worker queues at a point in time.
+
+    Taken once per monitor_rulebook_processes task and shared by all
+    its dispatches, so that selecting the queues costs one query and two
+    pipelined Redis reads however many requests are dispatched.
+    """
+
+    def __init__(
+        self,
+        queues: dict[str, QueueStatus],
+        strategy: Optional[placement.PlacementStrategy] = None,
+    ):
+        self.queues = queues
+        self.strategy = strategy or placement.get_strategy()
+
+    @classmethod
+    @tasking.redis_connect_retry()
+    def take(cls) -> "QueueSnapshot":
+        """Read the state of the configured queues.
+
+        Clears the queues whose workers are all dead, like
+        check_rulebook_queue_health.
+        """
+        queue_names = list(settings.RULEBOOK_WORKER_QUEUES)
+        queues = {name: QueueStatus(name) for name in queue_names}
+
+        counts = (
+            models.RulebookProcess.objects.filter(
+                status__in=LOAD_STATUSES,
+                rulebookprocessqueue__queue_name__in=queue_names,
+            )
+            .values_list("rulebookprocessqueue__queue_name")
+            .annotate(count=Count("id"))
+        )
+        for queue_name, count in counts:
+            queues[queue_name].running_processes = count
+
+        client = _get_redis_client()
+        pipe = client.pipeline(transaction=False)
+        for name in queue_names:
+            pipe.smembers(WORKERS_BY_QUEUE_KEY % name)
+        worker_keys = [
+            sorted(as_text(key) for key in keys) for keys in pipe.execute()
+        ]
+
+        pipe = client.pipeline(transaction=False)
+        for keys in worker_keys:
+            for key in keys:
+                pipe.hmget(key, "last_heartbeat", CAPACITY_FIELD)
+        heartbeats = iter(pipe.execute())
+
+        threshold = _heartbeat_threshold()
+        for name, keys in zip(queue_names, worker_keys):
+            status = queues[name]
+            for heartbeat, capacity in (next(heartbeats) for _ in keys):
+                if not heartbeat:
+                    continue
+                last_heartbeat = utcparse(as_text(heartbeat))
+                if last_heartbeat >= threshold:
+                    status.live_workers += 1
+                if (
+                    status.last_heartbeat is None
+                    or last_heartbeat > status.last_heartbeat
+                ):
+                    # The freshest worker reports the capacity of the node
+                    status.last_heartbeat = last_heartbeat
+                    status.capacity = _parse_capacity(capacity)
+            if not status.healthy:
+                django_rq.get_queue(name).empty()
+
+        return cls(queues)
+
+    def is_healthy(self, queue_name: str) -> bool:
+        status = self.queues.get(queue_name)
+        return status is not None and status.healthy
+
+    def select_queue_name(
+        self, process_parent: Optional[Activation] = None
+    ) -> str:
+        """Return the healthy queue to place a new process on."""
+        healthy = [status for status in self.queues.values() if status.healthy]
+        if not healthy:
+            raise HealthyQueueNotFoundError(
+                "No healthy queue found to dispatch the request",
+            )
+        return self.strategy.select(
+            healthy, self.strategy.request_for(process_parent)
+        )
+
+    def add_process(
+        self, queue_name: str, process_parent: Optional[Activation] = None
+    ) -> None:
+        """Count a process dispatched to the queue."""
+        status = self.queues.get(queue_name)
+        if status is not None:
+            status.add_process(self.strategy.request_for(process_parent))
+
+
+def _parse_capacity(data: Optional[bytes]) -> Optional[WorkerCapacity]:
+    if not data:
+        return None
+    try:
+        return WorkerCapacity.from_json(data)
+    except ValueError:
+        LOGGER.warning(f"Invalid worker capacity {data}")
+        return None
+
+
 # Internal start/restart requests are sent by the manager in restart_helper.py
 def start_rulebook_process(
     process_parent_type: ProcessParentType,
@@ -523,40 +819,93 @@ def restart_rulebook_process(
     monitor_rulebook_processes.delay()
 
 
+def request_rulebook_processes(
+    process_parent_type: ProcessParentType,
+    process_parent_ids: list[int],
+    request: ActivationRequest,
+    request_id: str = "",
+) -> int:
+    """Create the request for many process parents at once.
+
+    A single monitor task is started for all of them once the requests
+    are committed. Returns the number of requests created.
+    """
+    count = requests_queue.push_many(
+        process_parent_type,
+        process_parent_ids,
+        request,
+        request_id,
+    )
+    if count:
+        transaction.on_commit(monitor_rulebook_processes.delay)
+    return count
+
+
 def monitor_rulebook_processes_no_lock() -> None:
     """Monitor activations scheduled task.
 
     Started by the scheduler, executed by the default worker.
-    It dispatches a task for each activation that needs to be managed.
-    Handles both user requests and monitoring of running activations.
+    It dispatches a task for each activation that needs to be managed:
+    the activations with pending user requests and the activations due
+    to be monitored. Each due activation is scheduled again in
+    RULEBOOK_MONITOR_INTERVAL_SECONDS before it is dispatched, its manager
+    then schedules its next monitoring by its status and a deleted one is
+    unscheduled; heartbeats and closed websocket connections schedule it
+    immediately. All the active processes are swept every
+    RULEBOOK_MONITOR_SWEEP_SECONDS in case a schedule was lost.
     It will not enqueue a task if there is already one for the same
     activation.
+    The health and load of the queues are read once for all the
+    dispatches.
     """
-    # run pending user requests
+    snapshot = QueueSnapshot.take()
+
+    # run pending user requests, starting at most
+    # RULEBOOK_START_REQUESTS_PER_TICK processes per task so that the
+    # container engines are not stampeded by bulk requests
+    max_starts = settings.RULEBOOK_START_REQUESTS_PER_TICK
+    starts = 0
+    deferred = 0
     for request in requests_queue.list_requests():
+        if request.request in START_REQUESTS:
+            if max_starts and starts >= max_starts:
+                deferred += 1
+                continue
+            starts += 1
         dispatch(
             request.process_parent_type,
             request.process_parent_id,
             request.request,
             request.request_id,
+            snapshot,
         )
+    if deferred:
+        LOGGER.info(f"Deferring {deferred} start requests to the next run")
 
     # monitor running instances
-    for process in models.RulebookProcess.objects.filter(
-        status__in=[
-            ActivationStatus.STARTING,
-            ActivationStatus.RUNNING,
-            ActivationStatus.WORKERS_OFFLINE,
-        ]
-    ):
-        process_parent_type = str(process.parent_type)
-        process_parent_id = process.activation_id
-
+    due = dict.fromkeys(_pop_due_monitors())
+    if _start_sweep():
+        for process in models.RulebookProcess.objects.filter(
+            status__in=ACTIVE_STATUSES
+        ).only("parent_type", "activation_id"):
+            due[(str(process.parent_type), process.activation_id)] = None
+        LOGGER.info(f"Sweeping {len(due)} active rulebook processes")
+
+    for process_parent_type, process_parent_id in due:
+        # Monitored again later unless its manager reschedules it: the
+        # activations not dispatched, e.g. with their workers offline, are
+        # retried at the next interval
+        schedule_monitor(
+            process_parent_type,
+            process_parent_id,
+            settings.RULEBOOK_MONITOR_INTERVAL_SECONDS,
+        )
         dispatch(
             process_parent_type,
             process_parent_id,
             None,
             str(uuid.uuid4()),
+            snapshot,
         )
 
 
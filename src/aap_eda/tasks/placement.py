@@ -0,0 +1,240 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Placement of new rulebook processes on the rulebook worker queues.
+
+In multinode deployments every queue is served by the workers of a node.
+The strategy is selected by the RULEBOOK_PLACEMENT_STRATEGY setting:
+
+least-busy
+    The queue with the fewest running processes, the default.
+spread
+    The node left with the most free memory and CPU.
+bin-pack
+    The node left with the least free memory and CPU that still fits the
+    process, keeping the other nodes free.
+
+The spread and bin-pack strategies use the capacity published by the
+workers in their heartbeats and prefer the nodes that already have the
+decision environment image.
+"""
+from __future__ import annotations
+
+import inspect
+import logging
+import random
+import typing as tp
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from aap_eda.services.activation import capacity
+
+if tp.TYPE_CHECKING:
+    from aap_eda.core.models import Activation
+    from aap_eda.tasks.orchestrator import QueueStatus
+
+LOGGER = logging.getLogger(__name__)
+
+# Score of a node having the image, relative to its whole headroom
+IMAGE_LOCALITY_WEIGHT = 0.25
+# Headroom assumed for the nodes not publishing their capacity
+UNKNOWN_HEADROOM = 0.5
+
+
+def normalize_image(image_url: str) -> str:
+    """Return the image url as tagged by podman."""
+    name = image_url.rsplit("/", 1)[-1]
+    if "@" in name or ":" in name:
+        return image_url
+    return f"{image_url}:latest"
+
+
+@dataclass
+class PlacementRequest:
+    """Resources needed by a new rulebook process."""
+
+    image_url: tp.Optional[str] = None
+    memory: tp.Optional[int] = None
+
+
+class PlacementStrategy(ABC):
+    """Chooses the queue of a new rulebook process."""
+
+    name: str = ""
+
+    def request_for(
+        self, process_parent: tp.Optional[Activation]
+    ) -> PlacementRequest:
+        """Return the resources needed by the process of the parent."""
+        return PlacementRequest(memory=capacity.process_memory())
+
+    @abstractmethod
+    def select(
+        self, queues: list[QueueStatus], request: PlacementRequest
+    ) -> str:
+        """Return the name of one of the given healthy queues."""
+
+
+def least_busy(running_processes: dict[str, int]) -> str:
+    """Return the queue with the fewest running processes.
+
+    Ties are broken randomly.
+    """
+    min_count = min(running_processes.values())
+    least_common = [
+        queue
+        for queue, count in running_processes.items()
+        if count == min_count
+    ]
+    if len(least_common) == 1:
+        return least_common[0]
+    return random.choice(least_common)
+
+
+class LeastBusyStrategy(PlacementStrategy):
+    name = "least-busy"
+
+    def select(
+        self, queues: list[QueueStatus], request: PlacementRequest
+    ) -> str:
+        return least_busy(
+            {queue.name: queue.running_processes for queue in queues}
+        )
+
+
+def fits(queue: QueueStatus, request: PlacementRequest) -> bool:
+    """Return whether the node of the queue has memory for the process."""
+    if (
+        queue.capacity is None
+        or queue.capacity.free_memory is None
+        or request.memory is None
+    ):
+        return True
+    return queue.capacity.free_memory >= request.memory
+
+
+def headroom(queue: QueueStatus, request: PlacementRequest) -> float:
+    """Return the fraction of the node left free after the placement.
+
+    The lower of the memory and CPU fractions is used.
+    """
+    node = queue.capacity
+    if node is None or not node.total_memory or node.free_memory is None:
+        return UNKNOWN_HEADROOM
+    result = (node.free_memory - (request.memory or 0)) / node.total_memory
+    if node.cpus and node.load is not None:
+        result = min(result, 1 - node.load / node.cpus)
+    return result
+
+
+def has_image(queue: QueueStatus, request: PlacementRequest) -> bool:
+    return bool(
+        request.image_url
+        and queue.capacity is not None
+        and request.image_url in queue.capacity.images
+    )
+
+
+class _WeightedStrategy(PlacementStrategy):
+    def request_for(
+        self, process_parent: tp.Optional[Activation]
+    ) -> PlacementRequest:
+        request = super().request_for(process_parent)
+        if process_parent is not None and process_parent.decision_environment:
+            request.image_url = normalize_image(
+                process_parent.decision_environment.image_url
+            )
+        return request
+
+    @abstractmethod
+    def score(self, queue: QueueStatus, request: PlacementRequest) -> float:
+        """Return the preference for the queue, the highest is chosen."""
+
+    def select(
+        self, queues: list[QueueStatus], request: PlacementRequest
+    ) -> str:
+        candidates = [queue for queue in queues if fits(queue, request)]
+        if candidates:
+            scores = {
+                queue.name: self.score(queue, request) for queue in candidates
+            }
+        else:
+            LOGGER.warning(
+                "No node has the memory for the new rulebook process, "
+                "placing it on the node with the most headroom"
+            )
+            candidates = queues
+            scores = {
+                queue.name: headroom(queue, request) for queue in candidates
+            }
+
+        best = max(scores.values())
+        return least_busy(
+            {
+                queue.name: queue.running_processes
+                for queue in candidates
+                if scores[queue.name] == best
+            }
+        )
+
+
+class SpreadStrategy(_WeightedStrategy):
+    name = "spread"
+
+    def score(self, queue: QueueStatus, request: PlacementRequest) -> float:
+        return (
+            headroom(queue, request)
+            + has_image(queue, request) * IMAGE_LOCALITY_WEIGHT
+        )
+
+
+class BinPackStrategy(_WeightedStrategy):
+    name = "bin-pack"
+
+    def score(self, queue: QueueStatus, request: PlacementRequest) -> float:
+        return (
+            -headroom(queue, request)
+            + has_image(queue, request) * IMAGE_LOCALITY_WEIGHT
+        )
+
+
+STRATEGIES: dict[str, type[PlacementStrategy]] = {
+    strategy.name: strategy
+    for strategy in (LeastBusyStrategy, SpreadStrategy, BinPackStrategy)
+}
+
+
+def get_strategy(name: tp.Optional[str] = None) -> PlacementStrategy:
+    """Return the strategy of the RULEBOOK_PLACEMENT_STRATEGY setting."""
+    name = name or settings.RULEBOOK_PLACEMENT_STRATEGY
+    if name in STRATEGIES:
+        return STRATEGIES[name]()
+    try:
+        strategy = import_string(name)
+    except ImportError as e:
+        raise ImproperlyConfigured(
+            f"Unknown rulebook placement strategy {name}"
+        ) from e
+    if not (
+        isinstance(strategy, type)
+        and issubclass(strategy, PlacementStrategy)
+        and not inspect.isabstract(strategy)
+    ):
+        raise ImproperlyConfigured(
+            f"{name} is not a rulebook placement strategy"
+        )
+    return strategy()
@@ -1,8 +1,12 @@
+import asyncio
 import base64
-import json
+import collections
 import logging
+import time
 import typing as tp
-from datetime import datetime
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
 from enum import Enum
 from urllib.parse import urlparse, urlunparse
 
@@ -11,12 +15,16 @@ from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import DatabaseError
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Model, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from pydantic import BaseModel
+from redis.exceptions import RedisError
 
 from aap_eda.api.vault import encrypt_string
 from aap_eda.core import models
-from aap_eda.core.enums import DefaultCredentialType
+from aap_eda.core.enums import DefaultCredentialType, ProcessParentType
 from aap_eda.core.exceptions import (
     DuplicateEnvKeyError,
     DuplicateFileTemplateKeyError,
@@ -29,8 +37,10 @@ from aap_eda.core.utils.credentials import (
 )
 from aap_eda.core.utils.strings import extract_variables, substitute_variables
 from aap_eda.middleware.request_log_middleware import assign_log_tracking_id
+from aap_eda.services import heartbeats, log_stream
 from aap_eda.tasks import orchestrator
 
+from . import protocols
 from .messages import (
     ActionMessage,
     AnsibleEventMessage,
@@ -97,10 +107,150 @@ host_status_map = {
 
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
 
+# Maximum number of job instances and audit rules kept on a connection
+CONNECTION_CACHE_SIZE = 1024
+
+# Range of the integer columns
+MIN_INTEGER = -(2**31)
+MAX_INTEGER = 2**31 - 1
+
+
+def _checked_text(row: tuple) -> tuple:
+    """Return a row, raising ValueError if a text value has a NUL."""
+    for value in row:
+        if isinstance(value, str) and "\x00" in value:
+            raise ValueError("text contains NUL characters")
+    return row
+
+
+class BoundedCache(collections.OrderedDict):
+    """A dict which drops its oldest entries past a maximum size."""
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+class WriteBuffer:
+    """Messages written in batches.
+
+    A batch is written when it reaches its maximum size, or after a delay
+    once its first message is added. Both are read from settings, so that
+    they can be changed without restarting the connection.
+    """
+
+    def __init__(
+        self,
+        write: tp.Callable[[list], tp.Awaitable[None]],
+        size_setting: str,
+        delay_setting: str,
+    ):
+        self.write = write
+        self.size_setting = size_setting
+        self.delay_setting = delay_setting
+        self.messages: list = []
+        self.flush_task: tp.Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    async def add(self, message) -> None:
+        self.messages.append(message)
+        if len(self.messages) >= getattr(settings, self.size_setting):
+            await self.flush()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(getattr(settings, self.delay_setting) / 1000)
+        self.flush_task = None
+        # Nothing awaits this task, an error would go unnoticed
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception(
+                f"Failed to write a batch with {self.write.__name__}"
+            )
+
+    async def flush(self) -> None:
+        """Write the pending messages."""
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        messages, self.messages = self.messages, []
+        if messages:
+            await self.write(messages)
+
+
+@dataclass(frozen=True)
+class ActivationContext:
+    """What the messages of a rulebook process need of its activation."""
+
+    rulebook_process_id: int
+    activation_id: int
+    organization_id: int
+    log_tracking_id: str
+    aap_inputs: dict
+    loaded_at: float
+
 
 class AnsibleRulebookConsumer(AsyncWebsocketConsumer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Messages waiting to be written in a batch
+        self.pending_jobs = WriteBuffer(
+            self.write_jobs,
+            "WEBSOCKET_JOB_BATCH_SIZE",
+            "WEBSOCKET_JOB_BATCH_DELAY_MS",
+        )
+        self.pending_events = WriteBuffer(
+            self.write_events,
+            "WEBSOCKET_EVENT_BATCH_SIZE",
+            "WEBSOCKET_EVENT_BATCH_DELAY_MS",
+        )
+        self.pending_actions = WriteBuffer(
+            self.write_actions,
+            "WEBSOCKET_ACTION_BATCH_SIZE",
+            "WEBSOCKET_ACTION_BATCH_DELAY_MS",
+        )
+        # Objects resolved once and kept for the life of the connection
+        self.activation_contexts: dict[str, ActivationContext] = {}
+        self.job_instance_ids = BoundedCache(CONNECTION_CACHE_SIZE)
+        self.audit_rules = BoundedCache(CONNECTION_CACHE_SIZE)
+        # Rulebook processes whose heartbeats are debounced
+        self.heartbeat_processes: set[str] = set()
+        self.protocol = protocols.JSON_PROTOCOL
+
+    async def connect(self):
+        self.protocol = protocols.negotiate(self.scope.get("subprotocols", []))
+        await self.accept(subprotocol=self.protocol.subprotocol)
+
+    async def disconnect(self, code):
+        await self.flush()
+        # The rulebook processes may have exited, monitor them now
+        await self.schedule_monitors(
+            {
+                context.activation_id
+                for context in self.activation_contexts.values()
+            }
+        )
+
+    async def send_message(self, message: BaseModel) -> None:
+        """Send a message in the format negotiated with the client."""
+        await self.send(**self.protocol.encode(message))
+
     async def receive(self, text_data=None, bytes_data=None):
-        data = json.loads(text_data)
+        try:
+            data = self.protocol.decode(text_data, bytes_data)
+        except protocols.ProtocolError as err:
+            logger.error(f"Failed to decode message: {err}")
+            return
 
         await self._set_log_tracking_id(data)
 
@@ -119,6 +269,7 @@ class AnsibleRulebookConsumer(AsyncWebsocketConsumer):
             elif msg_type == MessageType.ACTION:
                 await self.handle_actions(ActionMessage.parse_obj(data))
             elif msg_type == MessageType.SHUTDOWN:
+                await self.flush()
                 logger.info("Websocket connection is closed.")
             elif msg_type == MessageType.SESSION_STATS:
                 await self.handle_heartbeat(HeartbeatMessage.parse_obj(data))
@@ -134,6 +285,9 @@ class AnsibleRulebookConsumer(AsyncWebsocketConsumer):
             "Start to handle workers: activation_instance_id: "
             f"{message.activation_id}"
         )
+        # A new session of the rulebook process starts
+        self.invalidate_activation_context(message.activation_id)
+        self.heartbeat_processes.discard(str(message.activation_id))
         activation = await self.get_activation(message.activation_id)
         rulesets = activation.rulebook_rulesets
         extra_var = activation.extra_var
@@ -145,251 +299,596 @@ class AnsibleRulebookConsumer(AsyncWebsocketConsumer):
             extra_var_message = ExtraVars(
                 data=base64.b64encode(extra_var.encode()).decode()
             )
-            await self.send(text_data=extra_var_message.json())
+            await self.send_message(extra_var_message)
 
-        await self.send(text_data=rulebook_message.json())
+        await self.send_message(rulebook_message)
 
         controller_info = await self.get_controller_info(activation)
         if controller_info:
-            await self.send(text_data=controller_info.json())
+            await self.send_message(controller_info)
 
         eda_vault_data = await self.get_eda_system_vault_passwords(activation)
         if eda_vault_data:
             vault_collection = VaultCollection(data=eda_vault_data)
-            await self.send(text_data=vault_collection.json())
+            await self.send_message(vault_collection)
 
         file_contents = await self.get_file_contents_from_credentials(
             activation
         )
         for file_content in file_contents:
-            await self.send(text_data=file_content.json())
+            await self.send_message(file_content)
 
         env_var = await self.get_env_vars_from_credentials(activation)
         if env_var:
             env_var_message = EnvVars(
                 data=base64.b64encode(env_var.encode()).decode()
             )
-            await self.send(text_data=env_var_message.json())
+            await self.send_message(env_var_message)
 
-        await self.send(text_data=EndOfResponse().json())
+        await self.send_message(EndOfResponse())
         # TODO: add broadcasting later by channel groups
 
     async def handle_jobs(self, message: JobMessage):
         logger.info(f"Start to handle jobs: {message}")
-        await self.insert_job_related_data(message)
+        await self.pending_jobs.add(message)
 
     async def handle_events(self, message: AnsibleEventMessage):
         logger.info(f"Start to handle events: {message}")
-        await self.insert_event_related_data(message)
+        await self.pending_events.add(message)
 
     async def handle_actions(self, message: ActionMessage):
         logger.info(f"Start to handle actions: {message}")
-        await self.insert_audit_rule_data(message)
+        await self.pending_actions.add(message)
+
+    async def flush(self):
+        """Write all the pending messages."""
+        await self.pending_jobs.flush()
+        await self.pending_events.flush()
+        await self.pending_actions.flush()
+
+    async def write_jobs(self, messages: list[JobMessage]):
+        try:
+            await self.insert_job_related_data(messages)
+        except DatabaseError as err:
+            logger.error(
+                f"Failed to write {len(messages)} jobs due to DB error: {err}"
+            )
+
+    async def write_events(self, messages: list[AnsibleEventMessage]):
+        try:
+            await self.insert_event_related_data(messages)
+        except DatabaseError as err:
+            logger.error(
+                f"Failed to write {len(messages)} events due to DB error: "
+                f"{err}"
+            )
+
+    async def write_actions(self, messages: list[ActionMessage]):
+        # Actions refer to the job instances of the pending Job messages
+        await self.pending_jobs.flush()
+        # A malformed message would fail the whole batch
+        messages = [
+            message for message in messages if self._valid_action(message)
+        ]
+        try:
+            contexts = {}
+            for activation_id in {
+                message.activation_id for message in messages
+            }:
+                try:
+                    contexts[
+                        activation_id
+                    ] = await self.get_activation_context(activation_id)
+                except ObjectDoesNotExist:
+                    continue
+            messages = [
+                message
+                for message in messages
+                if message.activation_id in contexts
+            ]
+            if messages:
+                await self.insert_audit_rule_data(messages, contexts)
+        except (DatabaseError, ObjectDoesNotExist) as err:
+            # The cached audit rules may not have been committed
+            self.audit_rules.clear()
+            logger.error(
+                f"Failed to write {len(messages)} actions due to DB error: "
+                f"{err}"
+            )
+
+    @staticmethod
+    def _valid_action(message: ActionMessage) -> bool:
+        try:
+            uuid.UUID(message.action_uuid)
+            uuid.UUID(message.rule_uuid)
+            if message.job_id:
+                uuid.UUID(message.job_id)
+            for value in (message.run_at, message.rule_run_at):
+                if parse_datetime(value or "") is None:
+                    raise ValueError(f"invalid datetime {value!r}")
+        except ValueError as err:
+            logger.error(f"Skipping action {message.action_uuid}: {err}")
+            return False
+        return True
+
+    async def get_activation_context(
+        self, rulebook_process_id: tp.Union[int, str]
+    ) -> ActivationContext:
+        """Return the activation context of a rulebook process.
+
+        It is loaded once and reloaded after it is invalidated or older
+        than WEBSOCKET_ACTIVATION_CONTEXT_TTL_SECONDS.
+        """
+        key = str(rulebook_process_id)
+        context = self.activation_contexts.get(key)
+        if (
+            context is None
+            or time.monotonic() - context.loaded_at
+            >= settings.WEBSOCKET_ACTIVATION_CONTEXT_TTL_SECONDS
+        ):
+            context = await self._load_activation_context(rulebook_process_id)
+            self.activation_contexts[key] = context
+        return context
+
+    def invalidate_activation_context(
+        self, rulebook_process_id: tp.Union[int, str, None] = None
+    ) -> None:
+        """Drop the activation context of a process, or all of them."""
+        if rulebook_process_id is None:
+            self.activation_contexts.clear()
+        else:
+            self.activation_contexts.pop(str(rulebook_process_id), None)
+
+    @database_sync_to_async
+    def _load_activation_context(
+        self, rulebook_process_id: tp.Union[int, str]
+    ) -> ActivationContext:
+        try:
+            process = models.RulebookProcess.objects.select_related(
+                "activation"
+            ).get(id=rulebook_process_id)
+        except ObjectDoesNotExist:
+            logger.error(f"RulebookProcess {rulebook_process_id} not found")
+            raise
+        activation = process.get_parent()
+
+        aap_inputs = {}
+        aap_credential = activation.eda_credentials.filter(
+            credential_type__name=DefaultCredentialType.AAP
+        ).first()
+        if aap_credential is not None:
+            aap_inputs = yaml.safe_load(
+                aap_credential.inputs.get_secret_value()
+            )
+
+        return ActivationContext(
+            rulebook_process_id=process.id,
+            activation_id=activation.id,
+            organization_id=process.organization_id,
+            log_tracking_id=activation.log_tracking_id,
+            aap_inputs=aap_inputs,
+            loaded_at=time.monotonic(),
+        )
 
     async def _set_log_tracking_id(self, data: dict):
         activation_instance_id = data.get("activation_id")
         if activation_instance_id:
-            activation = await self.get_activation(activation_instance_id)
-            assign_log_tracking_id(activation.log_tracking_id)
+            context = await self.get_activation_context(activation_instance_id)
+            assign_log_tracking_id(context.log_tracking_id)
 
-    @database_sync_to_async
-    def handle_heartbeat(self, message: HeartbeatMessage) -> None:
+    async def handle_heartbeat(self, message: HeartbeatMessage) -> None:
         logger.info(f"Start to handle heartbeat: {message}")
 
-        instance = models.RulebookProcess.objects.filter(
-            id=message.activation_id
-        ).first()
+        key = str(message.activation_id)
+        if key not in self.heartbeat_processes:
+            # The first heartbeat is written through, it moves the
+            # activation out of the starting state
+            if await self.write_first_heartbeat(message):
+                self.heartbeat_processes.add(key)
+            return
+
+        context = await self.get_activation_context(message.activation_id)
+        await database_sync_to_async(heartbeats.record_heartbeat)(
+            context.rulebook_process_id,
+            context.activation_id,
+            self._heartbeat_reported_at(message),
+            message.stats,
+        )
 
-        if instance:
-            instance.updated_at = message.reported_at or timezone.now()
-            instance.save(update_fields=["updated_at"])
+    @staticmethod
+    def _heartbeat_reported_at(message: HeartbeatMessage) -> datetime:
+        reported_at = None
+        if message.reported_at:
+            reported_at = parse_datetime(message.reported_at)
+        return reported_at or timezone.now()
 
-            activation = instance.get_parent()
-            activation.ruleset_stats[
-                message.stats["ruleSetName"]
-            ] = message.stats
-            activation.save(update_fields=["ruleset_stats"])
+    @database_sync_to_async
+    def write_first_heartbeat(self, message: HeartbeatMessage) -> bool:
+        instance = (
+            models.RulebookProcess.objects.filter(id=message.activation_id)
+            .select_related("activation")
+            .first()
+        )
 
-            if activation.status == ActivationStatus.STARTING:
-                orchestrator.monitor_rulebook_processes.delay()
-        else:
+        if not instance:
             logger.warning(
                 f"Activation instance {message.activation_id} is not present."
             )
+            return False
+
+        activation = instance.get_parent()
+        heartbeats.write_heartbeat(
+            instance.id,
+            activation.id,
+            self._heartbeat_reported_at(message),
+            message.stats,
+        )
 
-    @database_sync_to_async
-    def insert_event_related_data(self, message: AnsibleEventMessage) -> None:
-        event_data = message.event or {}
-        if event_data.get("stdout"):
-            job_instance = models.JobInstance.objects.get(
-                uuid=event_data.get("job_id")
+        if activation.status == ActivationStatus.STARTING:
+            orchestrator.schedule_monitor(
+                ProcessParentType.ACTIVATION, activation.id
             )
+            orchestrator.monitor_rulebook_processes.delay()
+        return True
 
-            # TODO: broadcasting
-            logger.info(f"Job instance {job_instance.id} is broadcasting.")
-
-        created = event_data.get("created")
-        if created:
-            created = datetime.strptime(created, "%Y-%m-%dT%H:%M:%S.%f")
+    @database_sync_to_async
+    def schedule_monitors(self, activation_ids: set[int]) -> None:
+        try:
+            for activation_id in activation_ids:
+                orchestrator.schedule_monitor(
+                    ProcessParentType.ACTIVATION, activation_id
+                )
+        except RedisError as err:
+            logger.error(f"Failed to schedule monitoring: {err}")
 
-        job_instance_event = models.JobInstanceEvent.objects.create(
-            job_uuid=event_data.get("job_id"),
-            counter=event_data.get("counter"),
-            stdout=event_data.get("stdout"),
-            type=event_data.get("event"),
-            created_at=created,
-        )
-        logger.info(f"Job instance event {job_instance_event.id} is created.")
-
-        event = event_data.get("event")
-        if event and event in [item.value for item in host_status_map]:
-            data = event_data.get("event_data", {})
-
-            playbook = data.get("playbook")
-            play = data.get("play")
-            task = data.get("task")
-            status = host_status_map[Event(event)]
-
-            if event == "runner_on_ok" and data.get("res", {}).get("changed"):
-                status = "changed"
-
-            job_instance_host = models.JobInstanceHost.objects.create(
-                job_uuid=event_data.get("job_id"),
-                playbook=playbook,
-                play=play,
-                task=task,
-                status=status,
+    @database_sync_to_async
+    def insert_event_related_data(
+        self, messages: list[AnsibleEventMessage]
+    ) -> None:
+        created_at = timezone.now()
+        events = []
+        hosts = []
+        for message in messages:
+            event_data = message.event or {}
+            if (
+                not event_data.get("job_id")
+                or event_data.get("counter") is None
+            ):
+                logger.warning(f"Ansible event {event_data} is incomplete.")
+                continue
+
+            # A malformed event would fail the COPY of the whole batch
+            try:
+                event, host = self._event_rows(event_data, created_at)
+            except (TypeError, ValueError) as err:
+                logger.error(f"Skipping Ansible event {event_data}: {err}")
+                continue
+            events.append(event)
+            if host is not None:
+                hosts.append(host)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._copy_rows(
+                cursor,
+                models.JobInstanceEvent,
+                ("job_uuid", "counter", "stdout", "type", "created_at"),
+                events,
             )
-            logger.info(
-                f"Job instance host {job_instance_host.id} is created."
+            self._copy_rows(
+                cursor,
+                models.JobInstanceHost,
+                ("job_uuid", "playbook", "play", "task", "status"),
+                hosts,
             )
+        logger.info(
+            f"{len(events)} job instance events and {len(hosts)} job "
+            "instance hosts are created."
+        )
 
-    @database_sync_to_async
-    def insert_audit_rule_data(self, message: ActionMessage) -> None:
-        job_instance_id = None
-        if message.job_id:
-            job_instance = models.JobInstance.objects.filter(
-                uuid=message.job_id
-            ).first()
-            job_instance_id = job_instance.id if job_instance else None
-
-        audit_rule = models.AuditRule.objects.filter(
-            rule_uuid=message.rule_uuid, fired_at=message.rule_run_at
-        ).first()
-
-        try:
-            activation_instance = models.RulebookProcess.objects.get(
-                id=message.activation_id
+    @staticmethod
+    def _event_rows(
+        event_data: dict, created_at: datetime
+    ) -> tuple[tuple, tp.Optional[tuple]]:
+        """Return the event row and host row, if any, of an Ansible event.
+
+        Raises ValueError or TypeError for a value the database rejects.
+        """
+        job_uuid = str(uuid.UUID(str(event_data["job_id"])))
+        counter = int(event_data["counter"])
+        if not MIN_INTEGER <= counter <= MAX_INTEGER:
+            raise ValueError(f"counter {counter} out of range")
+        event = event_data.get("event") or ""
+        event_row = _checked_text(
+            (
+                job_uuid,
+                counter,
+                event_data.get("stdout") or "",
+                event,
+                created_at,
             )
-        except ObjectDoesNotExist:
-            logger.error(f"RulebookProcess {message.activation_id} not found")
-            raise
+        )
 
-        if audit_rule is None:
-            activation_org = models.Organization.objects.filter(
-                id=activation_instance.organization.id
-            ).first()
-            audit_rule = models.AuditRule.objects.create(
-                activation_instance_id=message.activation_id,
-                name=message.rule,
-                rule_uuid=message.rule_uuid,
-                ruleset_uuid=message.ruleset_uuid,
-                ruleset_name=message.ruleset,
-                fired_at=message.rule_run_at,
-                job_instance_id=job_instance_id,
-                status=message.status,
-                organization=activation_org,
+        if event not in [item.value for item in host_status_map]:
+            return event_row, None
+        data = event_data.get("event_data") or {}
+        status = host_status_map[Event(event)]
+        if event == "runner_on_ok" and data.get("res", {}).get("changed"):
+            status = "changed"
+        host_row = _checked_text(
+            (
+                job_uuid,
+                data.get("playbook") or "",
+                data.get("play") or "",
+                data.get("task") or "",
+                status,
             )
+        )
+        return event_row, host_row
 
-            logger.info(f"Audit rule [{audit_rule.name}] is created.")
-        else:
+    @staticmethod
+    def _copy_rows(
+        cursor, model: type[Model], columns: tuple, rows: list
+    ) -> None:
+        if not rows:
+            return
+        with cursor.copy(
+            f"COPY {model._meta.db_table} ({', '.join(columns)}) " "FROM STDIN"
+        ) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+    @database_sync_to_async
+    def insert_audit_rule_data(
+        self,
+        messages: list[ActionMessage],
+        contexts: dict[int, ActivationContext],
+    ) -> None:
+        """Write the audit rules, actions and events of a batch of actions.
+
+        The job instances and audit rules referenced by the actions are
+        kept on the connection, so only those not seen before are looked
+        up, once for the whole batch. The audit rows are written with bulk
+        inserts.
+        """
+        self._lookup_job_instances(messages)
+        with transaction.atomic():
+            audit_rules = self._write_audit_rules(messages, contexts)
+            self._write_audit_actions(messages, contexts, audit_rules)
+            self._write_audit_events(messages)
+
+    def _lookup_job_instances(self, messages: list[ActionMessage]) -> None:
+        job_uuids = {
+            str(uuid.UUID(message.job_id))
+            for message in messages
+            if message.job_id
+        }
+        missing = job_uuids - self.job_instance_ids.keys()
+        if missing:
+            for job_uuid, job_instance_id in models.JobInstance.objects.filter(
+                uuid__in=missing
+            ).values_list("uuid", "id"):
+                self.job_instance_ids[str(job_uuid)] = job_instance_id
+
+    @staticmethod
+    def _fired_at(value: tp.Union[str, datetime]) -> datetime:
+        """Return a fire time as stored: aware, in UTC, to the microsecond.
+
+        A naive time is taken in the default time zone, as it is saved.
+        """
+        if isinstance(value, str):
+            # Digits past the microsecond are dropped by parse_datetime
+            value = parse_datetime(value)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value.astimezone(dt_timezone.utc)
+
+    @classmethod
+    def _audit_rule_key(cls, message: ActionMessage) -> tuple:
+        return (
+            str(uuid.UUID(message.rule_uuid)),
+            cls._fired_at(message.rule_run_at),
+        )
+
+    def _write_audit_rules(
+        self,
+        messages: list[ActionMessage],
+        contexts: dict[int, ActivationContext],
+    ) -> dict[tuple, models.AuditRule]:
+        audit_rules = {}
+        lookup = Q()
+        for message in messages:
+            key = self._audit_rule_key(message)
+            if key in self.audit_rules:
+                audit_rules[key] = self.audit_rules[key]
+            else:
+                lookup |= Q(rule_uuid=key[0], fired_at=key[1])
+        if lookup:
+            for audit_rule in models.AuditRule.objects.filter(lookup):
+                key = (
+                    str(audit_rule.rule_uuid),
+                    self._fired_at(audit_rule.fired_at),
+                )
+                audit_rules[key] = audit_rule
+
+        new_rules = []
+        updated_rules = []
+        for message in messages:
+            key = self._audit_rule_key(message)
+            audit_rule = audit_rules.get(key)
+            if audit_rule is None:
+                job_instance_id = None
+                if message.job_id:
+                    job_instance_id = self.job_instance_ids.get(
+                        str(uuid.UUID(message.job_id))
+                    )
+                audit_rule = models.AuditRule(
+                    activation_instance_id=message.activation_id,
+                    name=message.rule,
+                    rule_uuid=message.rule_uuid,
+                    ruleset_uuid=message.ruleset_uuid,
+                    ruleset_name=message.ruleset,
+                    fired_at=key[1],
+                    job_instance_id=job_instance_id,
+                    status=message.status,
+                    organization_id=contexts[
+                        message.activation_id
+                    ].organization_id,
+                )
+                audit_rules[key] = audit_rule
+                new_rules.append(audit_rule)
             # if rule has multiple actions and one of its action's status is
             # 'failed', keep rule's status as 'failed'
-            if (
+            elif (
                 audit_rule.status != message.status
                 and audit_rule.status != "failed"
             ):
                 audit_rule.status = message.status
-                audit_rule.save()
-
-        audit_action = models.AuditAction.objects.filter(
-            id=message.action_uuid
-        ).first()
-
-        if audit_action is None:
-            inputs = {}
-            aap_credential_type = models.CredentialType.objects.filter(
-                name=DefaultCredentialType.AAP
-            )
-            if aap_credential_type:
-                credentials = (
-                    activation_instance.get_parent().eda_credentials.filter(
-                        credential_type_id=aap_credential_type[0].id
-                    )
-                )
-                if credentials:
-                    inputs = yaml.safe_load(
-                        credentials[0].inputs.get_secret_value()
-                    )
+                if audit_rule.pk is not None:
+                    updated_rules.append(audit_rule)
 
-            url = self._get_url(message, inputs)
-            audit_action = models.AuditAction.objects.create(
+        models.AuditRule.objects.bulk_create(new_rules)
+        models.AuditRule.objects.bulk_update(updated_rules, ["status"])
+        for audit_rule in new_rules:
+            logger.info(f"Audit rule [{audit_rule.name}] is created.")
+        self.audit_rules.update(audit_rules)
+        return audit_rules
+
+    def _write_audit_actions(
+        self,
+        messages: list[ActionMessage],
+        contexts: dict[int, ActivationContext],
+        audit_rules: dict[tuple, models.AuditRule],
+    ) -> None:
+        new_actions = {}
+        for message in messages:
+            if message.action_uuid in new_actions:
+                continue
+            new_actions[message.action_uuid] = models.AuditAction(
                 id=message.action_uuid,
                 fired_at=message.run_at,
                 name=message.action,
-                url=url,
+                url=self._get_url(
+                    message, contexts[message.activation_id].aap_inputs
+                ),
                 status=message.status,
                 rule_fired_at=message.rule_run_at,
-                audit_rule_id=audit_rule.id,
+                audit_rule_id=audit_rules[self._audit_rule_key(message)].id,
                 status_message=message.message,
             )
 
+        # Actions which were already recorded are left as they are
+        models.AuditAction.objects.bulk_create(
+            new_actions.values(), ignore_conflicts=True
+        )
+        for audit_action in new_actions.values():
             logger.info(f"Audit action [{audit_action.name}] is created.")
 
-        matching_events = message.matching_events
-        for event_meta in matching_events.values():
-            meta = event_meta.pop("meta")
-            if meta:
-                audit_event = models.AuditEvent.objects.filter(
-                    id=meta.get("uuid")
-                ).first()
-
-                if audit_event is None:
-                    audit_event = models.AuditEvent.objects.create(
-                        id=meta.get("uuid"),
+    @staticmethod
+    def _write_audit_events(messages: list[ActionMessage]) -> None:
+        new_events = {}
+        links = set()
+        for message in messages:
+            for event_meta in message.matching_events.values():
+                meta = event_meta.pop("meta", None)
+                if not meta:
+                    continue
+                event_id = meta.get("uuid")
+                if event_id not in new_events:
+                    new_events[event_id] = models.AuditEvent(
+                        id=event_id,
                         source_name=meta.get("source", {}).get("name"),
                         source_type=meta.get("source", {}).get("type"),
                         payload=event_meta,
                         received_at=meta.get("received_at"),
                         rule_fired_at=message.rule_run_at,
                     )
-                    logger.info(f"Audit event [{audit_event.id}] is created.")
+                links.add((event_id, message.action_uuid))
+
+        models.AuditEvent.objects.bulk_create(
+            new_events.values(), ignore_conflicts=True
+        )
+        through = models.AuditEvent.audit_actions.through
+        through.objects.bulk_create(
+            [
+                through(auditevent_id=event_id, auditaction_id=action_id)
+                for event_id, action_id in links
+            ],
+            ignore_conflicts=True,
+        )
 
-                audit_event.audit_actions.add(audit_action)
-                audit_event.save()
+    @staticmethod
+    def _valid_job(message: JobMessage) -> bool:
+        try:
+            uuid.UUID(message.job_id)
+            _checked_text(
+                (
+                    message.name,
+                    message.action,
+                    message.ruleset,
+                    message.rule,
+                    message.hosts,
+                )
+            )
+        except ValueError as err:
+            logger.error(f"Skipping job {message.job_id}: {err}")
+            return False
+        return True
 
     @database_sync_to_async
     def insert_job_related_data(
-        self, message: JobMessage
-    ) -> models.JobInstance:
-        job_instance = models.JobInstance.objects.create(
-            uuid=message.job_id,
-            name=message.name,
-            action=message.action,
-            ruleset=message.ruleset,
-            hosts=message.hosts,
-            rule=message.rule,
-        )
-        logger.info(f"Job instance {job_instance.id} is created.")
-
-        activation_instance_id = message.ansible_rulebook_id
-        instance = models.ActivationInstanceJobInstance.objects.create(
-            job_instance_id=job_instance.id,
-            activation_instance_id=activation_instance_id,
-        )
-        logger.info(f"ActivationInstanceJobInstance {instance.id} is created.")
+        self, messages: list[JobMessage]
+    ) -> list[models.JobInstance]:
+        # A malformed message would fail the insert of the whole batch
+        messages = [
+            message for message in messages if self._valid_job(message)
+        ]
+        with transaction.atomic():
+            job_instances = models.JobInstance.objects.bulk_create(
+                [
+                    models.JobInstance(
+                        uuid=message.job_id,
+                        name=message.name,
+                        action=message.action,
+                        ruleset=message.ruleset,
+                        hosts=message.hosts,
+                        rule=message.rule,
+                    )
+                    for message in messages
+                ]
+            )
+            logger.info(f"{len(job_instances)} job instances are created.")
+
+            rulebook_process_ids = set(
+                models.RulebookProcess.objects.filter(
+                    id__in={
+                        message.ansible_rulebook_id for message in messages
+                    }
+                ).values_list("id", flat=True)
+            )
+            instances = []
+            for message, job_instance in zip(messages, job_instances):
+                if message.ansible_rulebook_id not in rulebook_process_ids:
+                    logger.warning(
+                        f"RulebookProcess {message.ansible_rulebook_id} of "
+                        f"job instance {job_instance.id} is not present."
+                    )
+                    continue
+                instances.append(
+                    models.ActivationInstanceJobInstance(
+                        job_instance_id=job_instance.id,
+                        activation_instance_id=message.ansible_rulebook_id,
+                    )
+                )
+            models.ActivationInstanceJobInstance.objects.bulk_create(
+                instances, ignore_conflicts=True
+            )
+            logger.info(
+                f"{len(instances)} ActivationInstanceJobInstance are created."
+            )
 
-        return job_instance
+        for job_instance in job_instances:
+            self.job_instance_ids[str(job_instance.uuid)] = job_instance.id
+        return job_instances
 
     @database_sync_to_async
     def get_activation(self, rulebook_process_id: str) -> models.Activation:
@@ -659,3 +1158,51 @@ class AnsibleRulebookConsumer(AsyncWebsocketConsumer):
             data=base64.b64encode(contents.encode()).decode(),
             eof=True,
         )
+
+
+class ActivationInstanceLogConsumer(AsyncWebsocketConsumer):
+    """Push the logs of a rulebook process as they are written.
+
+    Only the logs written after the connection are sent, the earlier ones
+    are read from the logs endpoint.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.activation_instance_id: tp.Optional[int] = None
+        self.queue: tp.Optional[asyncio.Queue] = None
+        self.sender: tp.Optional[asyncio.Task] = None
+
+    async def connect(self):
+        activation_instance_id = self.scope["url_route"]["kwargs"]["id"]
+        user = self.scope.get("user")
+        if not (
+            user
+            and user.is_authenticated
+            and await self.can_view(user, activation_instance_id)
+        ):
+            await self.close()
+            return
+
+        self.activation_instance_id = activation_instance_id
+        self.queue = log_stream.hub.subscribe(activation_instance_id)
+        await self.accept()
+        self.sender = asyncio.create_task(self.send_logs())
+
+    async def disconnect(self, code):
+        if self.queue is None:
+            return
+        log_stream.hub.unsubscribe(self.activation_instance_id, self.queue)
+        self.sender.cancel()
+
+    async def send_logs(self) -> None:
+        while True:
+            await self.send(text_data=await self.queue.get())
+
+    @database_sync_to_async
+    def can_view(self, user, activation_instance_id: int) -> bool:
+        return (
+            models.RulebookProcess.access_qs(user)
+            .filter(pk=activation_instance_id)
+            .exists()
+        )
@@ -0,0 +1,90 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Wire formats of the ansible-rulebook websocket.
+
+JSON text frames are the default. A client may request the MessagePack
+subprotocol instead; its messages are MessagePack maps in binary frames,
+with the payloads that JSON carries base64 encoded sent as raw bytes.
+"""
+import base64
+import json
+import typing as tp
+
+import msgpack
+from pydantic import BaseModel
+
+MSGPACK_SUBPROTOCOL = "eda.msgpack.v1"
+
+# Messages whose data field is base64 encoded in JSON
+BASE64_MESSAGE_TYPES = {"Rulebook", "ExtraVars", "EnvVars", "FileContents"}
+
+
+class ProtocolError(ValueError):
+    """Raised when a frame can not be decoded."""
+
+
+class JSONProtocol:
+    subprotocol: tp.Optional[str] = None
+
+    def decode(
+        self, text_data: tp.Optional[str], bytes_data: tp.Optional[bytes]
+    ) -> dict:
+        try:
+            return json.loads(text_data if text_data else bytes_data)
+        except (TypeError, ValueError) as e:
+            raise ProtocolError(str(e)) from e
+
+    def encode(self, message: BaseModel) -> dict:
+        """Return the keyword arguments of send for the message."""
+        return {"text_data": message.json()}
+
+
+class MessagePackProtocol:
+    subprotocol: tp.Optional[str] = MSGPACK_SUBPROTOCOL
+
+    def decode(
+        self, text_data: tp.Optional[str], bytes_data: tp.Optional[bytes]
+    ) -> dict:
+        if bytes_data is None:
+            # Tolerate clients sending JSON text frames
+            return JSONProtocol().decode(text_data, None)
+        try:
+            data = msgpack.unpackb(bytes_data, raw=False)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ProtocolError(str(e)) from e
+        if not isinstance(data, dict):
+            raise ProtocolError("Expected a map")
+        return data
+
+    def encode(self, message: BaseModel) -> dict:
+        """Return the keyword arguments of send for the message."""
+        data = message.dict()
+        if data.get("type") in BASE64_MESSAGE_TYPES:
+            data["data"] = base64.b64decode(data["data"])
+            if "encoding" in data:
+                data["encoding"] = None
+        return {"bytes_data": msgpack.packb(data)}
+
+
+JSON_PROTOCOL = JSONProtocol()
+MSGPACK_PROTOCOL = MessagePackProtocol()
+
+
+def negotiate(
+    subprotocols: tp.Iterable[str],
+) -> tp.Union[JSONProtocol, MessagePackProtocol]:
+    """Return the protocol for the subprotocols requested by a client."""
+    if MSGPACK_SUBPROTOCOL in subprotocols:
+        return MSGPACK_PROTOCOL
+    return JSON_PROTOCOL
@@ -6,7 +6,13 @@ from django.urls import path
 from . import consumers
 
 wsapi_router = URLRouter(
-    [path("ansible-rulebook", consumers.AnsibleRulebookConsumer.as_asgi())]
+    [
+        path("ansible-rulebook", consumers.AnsibleRulebookConsumer.as_asgi()),
+        path(
+            "activation-instances/<int:id>/logs",
+            consumers.ActivationInstanceLogConsumer.as_asgi(),
+        ),
+    ]
 )
 
 wsapi_router = URLRouter(
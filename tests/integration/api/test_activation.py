@@ -19,7 +19,9 @@ from unittest.mock import patch
 import pytest
 import redis
 import yaml
+from ansible_base.rbac.models import RoleDefinition
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -28,12 +30,19 @@ from aap_eda.api.serializers.activation import (
     is_activation_valid,
 )
 from aap_eda.api.serializers.project import ENCRYPTED_STRING
+from aap_eda.api.views import activation as activation_views
 from aap_eda.core import enums, models
 from tests.integration.constants import api_url_v1
+from tests.integration.utils import list_page_queries
 
 PROJECT_GIT_HASH = "684f62df18ce5f8d5c428e53203b9b975426eed0"
 
 
+@pytest.fixture
+def eda_caplog(caplog_factory):
+    return caplog_factory(activation_views.logger)
+
+
 def converted_extra_var(var: str) -> str:
     return yaml.safe_dump(yaml.safe_load(var))
 
@@ -804,6 +813,257 @@ def test_disable_activation_redis_unavailable(
         }
 
 
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.monitor_rulebook_processes")
+def test_bulk_disable_activations(
+    monitor: mock.Mock,
+    default_activation: models.Activation,
+    new_activation: models.Activation,
+    admin_client: APIClient,
+    preseed_credential_types,
+    django_capture_on_commit_callbacks,
+):
+    new_activation.is_enabled = False
+    new_activation.save(update_fields=["is_enabled"])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = admin_client.post(
+            f"{api_url_v1}/activations/bulk/",
+            data={
+                "action": "disable",
+                "ids": [default_activation.id, new_activation.id, 4242],
+            },
+        )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    data = response.data
+    assert data["accepted"] == [default_activation.id]
+    assert [skipped["id"] for skipped in data["skipped"]] == [
+        4242,
+        new_activation.id,
+    ]
+    default_activation.refresh_from_db()
+    assert default_activation.is_enabled is False
+    assert default_activation.status == enums.ActivationStatus.STOPPING
+    assert (
+        default_activation.status_message
+        == enums.ACTIVATION_STATUS_MESSAGE_MAP[enums.ActivationStatus.STOPPING]
+    )
+    monitor.delay.assert_called_once()
+
+    response = admin_client.get(f"{api_url_v1}/activations/bulk/{data['id']}/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"id": data["id"], "pending": 1}
+
+
+@pytest.mark.django_db
+@mock.patch.object(settings, "RULEBOOK_WORKER_QUEUES", [])
+@mock.patch("aap_eda.tasks.orchestrator.monitor_rulebook_processes")
+def test_bulk_enable_activations_by_filter(
+    monitor: mock.Mock,
+    default_activation: models.Activation,
+    new_activation: models.Activation,
+    admin_client: APIClient,
+    preseed_credential_types,
+    django_capture_on_commit_callbacks,
+):
+    for activation in (default_activation, new_activation):
+        activation.is_enabled = False
+        activation.status = enums.ActivationStatus.STOPPED
+        activation.save(update_fields=["is_enabled", "status"])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = admin_client.post(
+            f"{api_url_v1}/activations/bulk/",
+            data={"action": "enable", "filter": {"name": "new"}},
+            format="json",
+        )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["accepted"] == [new_activation.id]
+    assert response.data["skipped"] == []
+    new_activation.refresh_from_db()
+    assert new_activation.is_enabled is True
+    assert new_activation.status == enums.ActivationStatus.PENDING
+    assert (
+        models.ActivationRequestQueue.objects.filter(
+            request_id=response.data["id"],
+            request=enums.ActivationRequest.START,
+        ).count()
+        == 1
+    )
+    default_activation.refresh_from_db()
+    assert default_activation.is_enabled is False
+    monitor.delay.assert_called_once()
+
+
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.monitor_rulebook_processes")
+def test_bulk_restart_activations(
+    monitor: mock.Mock,
+    default_activation: models.Activation,
+    new_activation: models.Activation,
+    admin_client: APIClient,
+    preseed_credential_types,
+    django_capture_on_commit_callbacks,
+):
+    new_activation.status = enums.ActivationStatus.DELETING
+    new_activation.save(update_fields=["status"])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = admin_client.post(
+            f"{api_url_v1}/activations/bulk/",
+            data={
+                "action": "restart",
+                "ids": [default_activation.id, new_activation.id],
+            },
+        )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["accepted"] == [default_activation.id]
+    assert response.data["skipped"] == [
+        {"id": new_activation.id, "reason": "Object is being deleted"}
+    ]
+    assert list(
+        models.ActivationRequestQueue.objects.values_list(
+            "process_parent_id", "request"
+        )
+    ) == [(default_activation.id, enums.ActivationRequest.RESTART)]
+    monitor.delay.assert_called_once()
+
+
+@pytest.mark.django_db
+@mock.patch(
+    "aap_eda.api.views.activation.is_activation_valid",
+    return_value=(False, "Invalid rulebook."),
+)
+@mock.patch("aap_eda.tasks.orchestrator.monitor_rulebook_processes")
+def test_bulk_restart_invalid_activation(
+    monitor: mock.Mock,
+    is_activation_valid: mock.Mock,
+    default_activation: models.Activation,
+    admin_client: APIClient,
+    preseed_credential_types,
+    eda_caplog,
+):
+    response = admin_client.post(
+        f"{api_url_v1}/activations/bulk/",
+        data={"action": "restart", "ids": [default_activation.id]},
+    )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["skipped"] == [
+        {"id": default_activation.id, "reason": "Invalid rulebook."}
+    ]
+    assert (
+        f"Failed to restart {default_activation.name}: Invalid rulebook."
+        in eda_caplog.text
+    )
+
+
+def activation_role(name: str, *permissions: str) -> RoleDefinition:
+    return RoleDefinition.objects.create_from_permissions(
+        name=name,
+        content_type=ContentType.objects.get_for_model(models.Activation),
+        permissions=["view_activation", *permissions],
+    )
+
+
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.monitor_rulebook_processes")
+def test_bulk_disable_activations_without_permission(
+    monitor: mock.Mock,
+    default_activation: models.Activation,
+    new_activation: models.Activation,
+    default_user: models.User,
+    user_client: APIClient,
+    preseed_credential_types,
+    django_capture_on_commit_callbacks,
+):
+    activation_role("bulk-view").give_permission(default_user, new_activation)
+    activation_role("bulk-disable", "disable_activation").give_permission(
+        default_user, default_activation
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post(
+            f"{api_url_v1}/activations/bulk/",
+            data={
+                "action": "disable",
+                "ids": [default_activation.id, new_activation.id, 4242],
+            },
+        )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["accepted"] == [default_activation.id]
+    assert response.data["skipped"] == [
+        {"id": 4242, "reason": "Activation not found."},
+        {
+            "id": new_activation.id,
+            "reason": "You do not have permission to disable the activation.",
+        },
+    ]
+    new_activation.refresh_from_db()
+    assert new_activation.is_enabled is True
+    monitor.delay.assert_called_once()
+
+
+@pytest.mark.parametrize("action", ["enable", "disable", "restart"])
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.monitor_rulebook_processes")
+def test_bulk_activations_view_only(
+    monitor: mock.Mock,
+    default_activation: models.Activation,
+    new_activation: models.Activation,
+    default_user: models.User,
+    user_client: APIClient,
+    preseed_credential_types,
+    action: str,
+):
+    activation_role("bulk-view").give_permission(
+        default_user, default_activation
+    )
+
+    response = user_client.post(
+        f"{api_url_v1}/activations/bulk/",
+        data={"action": action, "filter": {}},
+        format="json",
+    )
+
+    # The activations the user can not see are not listed
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["accepted"] == []
+    assert response.data["skipped"] == [
+        {
+            "id": default_activation.id,
+            "reason": f"You do not have permission to {action} the "
+            "activation.",
+        }
+    ]
+    assert not models.ActivationRequestQueue.objects.exists()
+    monitor.delay.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"action": "enable"},
+        {"action": "enable", "ids": [1], "filter": {"name": "a"}},
+        {"action": "delete", "ids": [1]},
+    ],
+)
+@pytest.mark.django_db
+def test_bulk_activations_invalid(
+    admin_client: APIClient,
+    data: dict,
+):
+    response = admin_client.post(
+        f"{api_url_v1}/activations/bulk/", data=data, format="json"
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.django_db
 def test_list_activation_instances(
     default_activation: models.Activation,
@@ -1253,3 +1513,37 @@ def test_copy_activation_invalid_body(
         f"{api_url_v1}/activations/{a_id}/copy/", data={"name": name}
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_activations_queries(
+    default_activation: models.Activation,
+    default_event_stream: models.EventStream,
+    default_vault_credential: models.EdaCredential,
+    default_scm_credential: models.EdaCredential,
+    default_user: models.User,
+    admin_client: APIClient,
+):
+    for i in range(10):
+        activation = models.Activation.objects.create(
+            name=f"activation-{i}",
+            decision_environment=default_activation.decision_environment,
+            project=default_activation.project,
+            rulebook=default_activation.rulebook,
+            rulebook_rulesets=default_activation.rulebook_rulesets,
+            organization=default_activation.organization,
+            user=default_user,
+            created_by=default_user,
+            modified_by=default_user,
+            edited_by=default_user,
+        )
+        activation.eda_credentials.add(
+            default_vault_credential, default_scm_credential
+        )
+        activation.event_streams.add(default_event_stream)
+
+    # The cost of a page does not depend on its size
+    url = f"{api_url_v1}/activations/"
+    assert list_page_queries(admin_client, url, 2) == list_page_queries(
+        admin_client, url, 10
+    )
@@ -15,6 +15,7 @@
 from typing import Any, Dict, List
 
 import pytest
+from django.db import connection
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -154,6 +155,106 @@ def test_list_activation_instance_logs_filter_non_existent(
     assert data == []
 
 
+@pytest.mark.django_db
+def test_search_logs(
+    default_activation_instances: List[models.RulebookProcess],
+    default_activation_instance_logs: List[models.RulebookProcessLog],
+    admin_client: APIClient,
+):
+    other_log = models.RulebookProcessLog.objects.create(
+        log="ACTIVATION-INSTANCE-LOG-3",
+        activation_instance=default_activation_instances[1],
+        log_timestamp=1000,
+    )
+
+    response = admin_client.get(
+        f"{api_url_v1}/activation-instances/logs/?log=instance-log"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [log["id"] for log in response.data["results"]] == [
+        other_log.id,
+        default_activation_instance_logs[1].id,
+        default_activation_instance_logs[0].id,
+    ]
+
+    response = admin_client.get(
+        f"{api_url_v1}/activation-instances/logs/?log=instance-log"
+        f"&activation_instance_id={default_activation_instances[1].id}"
+    )
+    assert [log["id"] for log in response.data["results"]] == [other_log.id]
+
+    response = admin_client.get(
+        f"{api_url_v1}/activation-instances/logs/?log=instance-log"
+        "&log_timestamp_before=1001"
+    )
+    assert [log["id"] for log in response.data["results"]] == [other_log.id]
+
+
+@pytest.mark.django_db
+def test_search_logs_pages_by_cursor(
+    default_activation_instance_logs: List[models.RulebookProcessLog],
+    admin_client: APIClient,
+):
+    response = admin_client.get(
+        f"{api_url_v1}/activation-instances/logs/?log=instance-log"
+        "&page_size=1"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["count"] is None
+    assert response.data["page"] is None
+    assert [log["id"] for log in response.data["results"]] == [
+        default_activation_instance_logs[1].id
+    ]
+    assert "cursor=" in response.data["next"]
+
+    response = admin_client.get(response.data["next"])
+    assert [log["id"] for log in response.data["results"]] == [
+        default_activation_instance_logs[0].id
+    ]
+    assert response.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_search_logs_short_pattern(admin_client: APIClient):
+    response = admin_client.get(f"{api_url_v1}/activation-instances/logs/")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = admin_client.get(
+        f"{api_url_v1}/activation-instances/logs/?log=ab"
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_search_logs_without_access(
+    default_activation_instance_logs: List[models.RulebookProcessLog],
+    user_client: APIClient,
+):
+    response = user_client.get(
+        f"{api_url_v1}/activation-instances/logs/?log=instance-log"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_search_logs_uses_trigram_index(
+    default_activation_instance_logs: List[models.RulebookProcessLog],
+):
+    queryset = models.RulebookProcessLog.objects.filter(
+        log__icontains="instance-log"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+
+    # The logs without timestamp are in the default partition
+    assert "Bitmap Index Scan on core_rulebook_process_log_default_trgm" in (
+        plan
+    )
+
+
 def assert_activation_instance_data(
     data: Dict[str, Any], instance: models.RulebookProcess
 ):
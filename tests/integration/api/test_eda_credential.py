@@ -17,6 +17,7 @@ from aap_eda.core.utils.credentials import (
 )
 from tests.integration.conftest import DUMMY_GPG_KEY
 from tests.integration.constants import api_url_v1
+from tests.integration.utils import list_page_queries
 
 DATA_DIR = Path(__file__).parent.parent.parent / "unit/data"
 
@@ -1350,3 +1351,36 @@ def test_update_eda_credential_for_analytics(
         )
         assert response.status_code == status.HTTP_200_OK
         mock_reschedule.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_list_eda_credentials_queries(
+    admin_client: APIClient,
+    default_organization: models.Organization,
+    default_user: models.User,
+    preseed_credential_types,
+):
+    credential_type = models.CredentialType.objects.get(
+        name=enums.DefaultCredentialType.VAULT
+    )
+    models.EdaCredential.objects.bulk_create(
+        [
+            models.EdaCredential(
+                name=f"vault-credential-{i}",
+                credential_type=credential_type,
+                inputs=inputs_to_store(
+                    {"username": "dummy-user", "password": "dummy-password"}
+                ),
+                organization=default_organization,
+                created_by=default_user,
+                modified_by=default_user,
+            )
+            for i in range(10)
+        ]
+    )
+
+    # The cost of a page does not depend on its size
+    url = f"{api_url_v1}/eda-credentials/"
+    assert list_page_queries(admin_client, url, 2) == list_page_queries(
+        admin_client, url, 10
+    )
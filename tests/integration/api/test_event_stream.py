@@ -13,6 +13,7 @@
 #  limitations under the License.
 import hmac
 import secrets
+import uuid
 from typing import List
 
 import pytest
@@ -24,6 +25,7 @@ from rest_framework.test import APIClient
 
 from aap_eda.core import enums, models
 from tests.integration.constants import api_url_v1
+from tests.integration.utils import list_page_queries
 
 
 @pytest.mark.django_db
@@ -403,3 +405,33 @@ def get_default_test_org() -> models.Organization:
         name=settings.DEFAULT_ORGANIZATION_NAME,
         description="The default organization",
     )[0]
+
+
+@pytest.mark.django_db
+def test_list_event_streams_queries(
+    admin_client: APIClient,
+    default_organization: models.Organization,
+    default_user: models.User,
+    default_hmac_credential: models.EdaCredential,
+):
+    models.EventStream.objects.bulk_create(
+        [
+            models.EventStream(
+                uuid=uuid.uuid4(),
+                name=f"test-es-{i}",
+                event_stream_type=default_hmac_credential.credential_type.kind,
+                owner=default_user,
+                organization=default_organization,
+                eda_credential=default_hmac_credential,
+                created_by=default_user,
+                modified_by=default_user,
+            )
+            for i in range(10)
+        ]
+    )
+
+    # The cost of a page does not depend on its size
+    url = f"{api_url_v1}/event-streams/"
+    assert list_page_queries(admin_client, url, 2) == list_page_queries(
+        admin_client, url, 10
+    )
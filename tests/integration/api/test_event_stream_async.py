@@ -0,0 +1,232 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import json
+import secrets
+from unittest import mock
+
+import psycopg
+import pytest
+import requests_mock
+import yaml
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import AsyncClient
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from aap_eda.core import enums, models
+from aap_eda.core.exceptions import PGNotifyError
+from aap_eda.services.event_stream_stats import flush_stats
+from aap_eda.services.pg_notify import close_async_connection_pools
+from tests.integration.api.test_event_stream import (
+    create_event_stream,
+    create_event_stream_credential,
+    get_default_test_org,
+)
+from tests.integration.constants import api_url_v1
+
+TOKEN_HEADER = "My-Secret-Header"
+
+
+def async_post_url(event_stream_uuid) -> str:
+    return (
+        f"{api_url_v1}/external_event_stream/{event_stream_uuid}/post/async/"
+    )
+
+
+async def _async_post(event_stream_uuid, data: dict, headers: dict):
+    try:
+        return await AsyncClient().post(
+            async_post_url(event_stream_uuid),
+            data=json.dumps(data),
+            content_type="application/json",
+            headers=headers,
+        )
+    finally:
+        await close_async_connection_pools()
+
+
+def async_post(event_stream_uuid, data: dict, headers: dict):
+    return async_to_sync(_async_post)(event_stream_uuid, data, headers)
+
+
+def create_token_event_stream(
+    client: APIClient, token: str, test_mode: bool
+) -> models.EventStream:
+    obj = create_event_stream_credential(
+        client,
+        enums.EventStreamCredentialType.TOKEN.value,
+        {
+            "auth_type": "token",
+            "token": token,
+            "http_header_key": TOKEN_HEADER,
+        },
+    )
+    return create_event_stream(
+        client,
+        {
+            "name": "test-es-async",
+            "eda_credential_id": obj["id"],
+            "event_stream_type": obj["credential_type"]["kind"],
+            "organization_id": get_default_test_org().id,
+            "test_mode": test_mode,
+        },
+    )
+
+
+@pytest.mark.django_db
+def test_async_post_event_stream_test_mode(
+    admin_client: APIClient, preseed_credential_types
+):
+    token = secrets.token_hex(32)
+    event_stream = create_token_event_stream(admin_client, token, True)
+    data = {"a": 1, "b": 2}
+
+    response = async_post(event_stream.uuid, data, {TOKEN_HEADER: token})
+
+    assert response.status_code == status.HTTP_200_OK
+    flush_stats()
+    event_stream.refresh_from_db()
+    assert event_stream.events_received == 1
+    assert event_stream.last_event_received_at is not None
+    assert yaml.safe_load(event_stream.test_content) == data
+    assert event_stream.test_content_type == "application/json"
+
+
+@pytest.mark.django_db
+def test_async_post_event_stream_publishes(
+    admin_client: APIClient, preseed_credential_types
+):
+    token = secrets.token_hex(32)
+    event_stream = create_token_event_stream(admin_client, token, False)
+    data = {"a": 1, "b": 2}
+
+    with psycopg.connect(
+        conninfo=settings.PG_NOTIFY_DSN_SERVER, autocommit=True
+    ) as conn:
+        conn.execute(f"LISTEN {event_stream.channel_name}")
+        response = async_post(event_stream.uuid, data, {TOKEN_HEADER: token})
+        notifies = list(conn.notifies(timeout=5, stop_after=1))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(notifies) == 1
+    event = json.loads(notifies[0].payload)
+    assert event["payload"] == data
+    assert event["meta"]["eda_event_stream_name"] == event_stream.name
+    assert event["meta"]["endpoint"] == async_post_url(event_stream.uuid)
+    assert TOKEN_HEADER not in event["meta"]["headers"]
+
+
+@pytest.mark.django_db
+def test_async_post_event_stream_notify_failure(
+    admin_client: APIClient, preseed_credential_types
+):
+    token = secrets.token_hex(32)
+    event_stream = create_token_event_stream(admin_client, token, False)
+
+    with mock.patch(
+        "aap_eda.api.views.external_event_stream.AsyncPGNotify.__call__",
+        side_effect=PGNotifyError(),
+    ):
+        response = async_post(event_stream.uuid, {}, {TOKEN_HEADER: token})
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+@pytest.mark.django_db
+def test_async_post_event_stream_bad_token(
+    admin_client: APIClient, preseed_credential_types
+):
+    event_stream = create_token_event_stream(
+        admin_client, secrets.token_hex(32), True
+    )
+
+    response = async_post(event_stream.uuid, {}, {TOKEN_HEADER: "bogus"})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json() == {"detail": "Token mismatch, check your token"}
+    flush_stats()
+    event_stream.refresh_from_db()
+    assert event_stream.events_received == 1
+    assert event_stream.test_error_message == (
+        "Token mismatch, check your token"
+    )
+
+
+@pytest.mark.django_db
+def test_async_post_event_stream_missing_header(
+    admin_client: APIClient, preseed_credential_types
+):
+    event_stream = create_token_event_stream(
+        admin_client, secrets.token_hex(32), True
+    )
+
+    response = async_post(event_stream.uuid, {}, {})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": f"{TOKEN_HEADER} header is missing"}
+    event_stream.refresh_from_db()
+    assert event_stream.events_received == 0
+
+
+@pytest.mark.parametrize("bad_uuid", ["gobble", secrets.token_hex(16)])
+@pytest.mark.django_db
+def test_async_post_event_stream_bad_uuid(bad_uuid):
+    response = async_post(bad_uuid, {}, {})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": "bad uuid specified"}
+
+
+@pytest.mark.parametrize(
+    ("payload", "post_status"),
+    [
+        ({"active": True}, status.HTTP_200_OK),
+        ({"active": False}, status.HTTP_403_FORBIDDEN),
+    ],
+)
+@pytest.mark.django_db
+def test_async_post_event_stream_with_oauth2(
+    admin_client: APIClient, preseed_credential_types, payload, post_status
+):
+    introspection_url = "https://fake.com/introspect"
+    obj = create_event_stream_credential(
+        admin_client,
+        enums.EventStreamCredentialType.OAUTH2.value,
+        {
+            "auth_type": "oauth2",
+            "client_id": "test",
+            "client_secret": secrets.token_hex(32),
+            "introspection_url": introspection_url,
+            "http_header_key": "Authorization",
+        },
+    )
+    event_stream = create_event_stream(
+        admin_client,
+        {
+            "name": "test-es-async-oauth2",
+            "eda_credential_id": obj["id"],
+            "event_stream_type": obj["credential_type"]["kind"],
+            "organization_id": get_default_test_org().id,
+            "test_mode": True,
+        },
+    )
+
+    with requests_mock.Mocker() as m:
+        m.post(introspection_url, json=payload)
+        response = async_post(
+            event_stream.uuid, {"a": 1}, {"Authorization": "Bearer dummy"}
+        )
+
+    assert response.status_code == post_status
@@ -0,0 +1,74 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from unittest import mock
+
+import pytest
+from rest_framework.exceptions import ParseError
+
+from aap_eda.api.views import external_event_stream
+from aap_eda.api.views.external_event_stream import ExternalEventStreamMixin
+
+
+@pytest.mark.parametrize(
+    "content_type",
+    [
+        "application/json",
+        "application/json; charset=utf-8",
+        "Application/JSON",
+        "text/json",
+        "application/vnd.api+json",
+    ],
+)
+def test_parse_json_body(content_type):
+    body = b'{"a": 1, "b": [true, null], "c": "\\u00e9"}'
+
+    with mock.patch.object(external_event_stream.yaml, "safe_load") as load:
+        data = ExternalEventStreamMixin()._parse_body(content_type, body)
+
+    assert data == {"a": 1, "b": [True, None], "c": "é"}
+    load.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("content_type", "body", "expected"),
+    [
+        ("application/json", b"{a: 1, 'b': yes}", {"a": 1, "b": True}),
+        ("text/plain", b'{"a": 1}', {"a": 1}),
+        ("application/yaml", b"a: 1\nb:\n  - c\n", {"a": 1, "b": ["c"]}),
+        ("", b"just a string", "just a string"),
+        (
+            "application/x-www-form-urlencoded; charset=UTF-8",
+            b"a=1&b=2",
+            {"a": ["1"], "b": ["2"]},
+        ),
+    ],
+)
+def test_parse_other_body(content_type, body, expected):
+    assert ExternalEventStreamMixin()._parse_body(content_type, body) == (
+        expected
+    )
+
+
+@pytest.mark.parametrize(
+    ("content_type", "body"),
+    [
+        ("application/json", b'{"a": 1,'),
+        ("application/json", b"\xff\xfe"),
+        ("text/plain", b"a: [1"),
+        ("application/x-www-form-urlencoded", b"a"),
+    ],
+)
+def test_parse_invalid_body(content_type, body):
+    with pytest.raises(ParseError):
+        ExternalEventStreamMixin()._parse_body(content_type, body)
@@ -20,6 +20,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from aap_eda.core import enums
+from aap_eda.services.event_stream_stats import flush_stats
 from tests.integration.api.test_event_stream import (
     create_event_stream,
     create_event_stream_credential,
@@ -125,6 +126,7 @@ def test_post_event_stream_with_test_mode_extra_headers(
     )
     assert response.status_code == status.HTTP_200_OK
 
+    flush_stats()
     event_stream.refresh_from_db()
     test_data = yaml.safe_load(event_stream.test_content)
     assert test_data["a"] == 1
@@ -13,6 +13,9 @@
 #  limitations under the License.
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
 from rest_framework.test import APIClient
 
 from aap_eda.core import models
@@ -68,3 +71,135 @@ def test_return_page_size(
 ):
     response = admin_client.get(f"{api_url_v1}/projects/?page=2&page_size=1")
     assert response.data["page_size"] == 1
+
+
+@pytest.mark.django_db
+def test_keyset_pagination(
+    default_activation_instance: models.RulebookProcess,
+    admin_client: APIClient,
+):
+    logs = models.RulebookProcessLog.objects.bulk_create(
+        [
+            models.RulebookProcessLog(
+                log=f"log-{i}",
+                activation_instance=default_activation_instance,
+                log_timestamp=0,
+            )
+            for i in range(5)
+        ]
+    )
+    url = (
+        f"{api_url_v1}/activation-instances/"
+        f"{default_activation_instance.id}/logs/"
+    )
+
+    response = admin_client.get(f"{url}?cursor=&page_size=2")
+    assert response.data["count"] is None
+    assert response.data["page"] is None
+    assert response.data["previous"] is None
+    assert [log["log"] for log in response.data["results"]] == [
+        "log-0",
+        "log-1",
+    ]
+
+    response = admin_client.get(response.data["next"])
+    assert [log["log"] for log in response.data["results"]] == [
+        "log-2",
+        "log-3",
+    ]
+
+    response = admin_client.get(response.data["next"])
+    assert [log["log"] for log in response.data["results"]] == ["log-4"]
+    assert response.data["next"] is None
+
+    response = admin_client.get(response.data["previous"])
+    assert [log["id"] for log in response.data["results"]] == [
+        logs[2].id,
+        logs[3].id,
+    ]
+    assert response.data["next"] is not None
+    assert response.data["previous"] is not None
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_uses_index(
+    default_activation_instance: models.RulebookProcess,
+    admin_client: APIClient,
+):
+    models.RulebookProcessLog.objects.bulk_create(
+        [
+            models.RulebookProcessLog(
+                log=f"log-{i}",
+                activation_instance=default_activation_instance,
+                log_timestamp=0,
+            )
+            for i in range(5)
+        ]
+    )
+    url = (
+        f"{api_url_v1}/activation-instances/"
+        f"{default_activation_instance.id}/logs/"
+    )
+    response = admin_client.get(f"{url}?cursor=&page_size=2")
+
+    with CaptureQueriesContext(connection) as queries:
+        admin_client.get(response.data["next"])
+    (sql,) = [
+        query["sql"]
+        for query in queries.captured_queries
+        if 'FROM "core_rulebook_process_log"' in query["sql"]
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute(f"EXPLAIN {sql}")
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+
+    # The page is read in id order from the index, the rows of the
+    # instance before the cursor are neither read nor sorted
+    assert "Index Scan using" in plan
+    assert "Sort  (" not in plan
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_ties(
+    default_activation_instance: models.RulebookProcess,
+    default_organization: models.Organization,
+    admin_client: APIClient,
+):
+    audit_rules = models.AuditRule.objects.bulk_create(
+        [
+            models.AuditRule(
+                name=f"rule-{i}",
+                fired_at="2023-12-14T15:19:02.313122Z",
+                activation_instance=default_activation_instance,
+                organization=default_organization,
+            )
+            for i in range(3)
+        ]
+    )
+
+    response = admin_client.get(
+        f"{api_url_v1}/audit-rules/?cursor=&page_size=2&count=estimated"
+    )
+    assert isinstance(response.data["count"], int)
+    names = [rule["name"] for rule in response.data["results"]]
+
+    response = admin_client.get(response.data["next"])
+    names += [rule["name"] for rule in response.data["results"]]
+    assert response.data["next"] is None
+
+    # Ordered by id when fired at the same time
+    assert names == [rule.name for rule in reversed(audit_rules)]
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_invalid_cursor(
+    default_activation_instance: models.RulebookProcess,
+    admin_client: APIClient,
+):
+    response = admin_client.get(
+        f"{api_url_v1}/activation-instances/"
+        f"{default_activation_instance.id}/logs/?cursor=invalid"
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
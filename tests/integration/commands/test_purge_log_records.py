@@ -20,6 +20,7 @@ from django.core.management.base import CommandError
 from django.utils import timezone
 
 from aap_eda.core import enums, models
+from aap_eda.services import log_partitions
 
 
 @pytest.fixture
@@ -250,3 +251,25 @@ def test_purge_log_records(
             )
 
     assert f"Log records older than {date_str} are purged." in captured.out
+
+
+@pytest.mark.django_db
+def test_purge_log_records_drops_partitions(prepare_log_records, capsys):
+    day = (timezone.now() - timedelta(days=40)).date()
+    (partition,) = log_partitions.create_partitions(day, 1)
+    instance = models.RulebookProcess.objects.filter(
+        activation=prepare_log_records[0]
+    ).first()
+    models.RulebookProcessLog.objects.create(
+        log="activation-instance-40-days-ago-log",
+        activation_instance=instance,
+        log_timestamp=int((timezone.now() - timedelta(days=40)).timestamp()),
+    )
+
+    date_str = (timezone.now() - timedelta(days=5)).strftime("%Y-%m-%d")
+    call_command("purge_log_records", "--date", date_str)
+
+    captured = capsys.readouterr()
+    assert f"Log records older than {date_str} are purged." in captured.out
+    assert partition not in {p.name for p in log_partitions.list_partitions()}
+    assert models.RulebookProcessLog.objects.count() == 4
@@ -60,6 +60,11 @@ from aap_eda.core.utils.rulebook_process_logs import (
             None,
             "Ruleset: Long Running Range",
         ),
+        (
+            "2025-13-17 18:39:49,191 Starting Container",
+            None,
+            "2025-13-17 18:39:49,191 Starting Container",
+        ),
     ],
 )
 def test_extract_datetimes(
@@ -13,13 +13,19 @@
 #  limitations under the License.
 
 
-from unittest.mock import patch
+import os
+import signal
+import uuid
+from unittest.mock import Mock, patch
 
 import pytest
 import redis
 from django.conf import settings
+from rq.job import JobStatus
+from rq.registry import FailedJobRegistry
 
 from aap_eda.core.tasking import (
+    ActivationWorker,
     DefaultWorker,
     Queue,
     _create_url_from_parameters,
@@ -28,6 +34,7 @@ from aap_eda.core.tasking import (
     logger,
     unique_enqueue,
 )
+from aap_eda.services.activation import capacity
 from aap_eda.settings import redis as redis_settings
 
 
@@ -40,6 +47,10 @@ def fake_task(number: int):
     pass
 
 
+def crash_task():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
 def test_unique_enqueue_existing_job(default_queue, eda_caplog):
     default_queue.enqueue(fake_task, job_id="fake_task", number=1)
     job = unique_enqueue(default_queue.name, "fake_task", fake_task, number=2)
@@ -171,3 +182,96 @@ def test_worker_dab_client(default_queue: Queue):
         connection=default_queue.connection,
     )
     assert worker.connection is default_queue.connection
+
+
+def test_activation_worker_publishes_capacity(default_queue: Queue):
+    worker = ActivationWorker(
+        [default_queue], connection=default_queue.connection
+    )
+    published = capacity.WorkerCapacity(
+        total_memory=1024, free_memory=512, cpus=2, load=0.5
+    )
+    with patch.object(capacity, "measure", return_value=published):
+        worker.heartbeat()
+
+    data = default_queue.connection.hget(worker.key, capacity.CAPACITY_FIELD)
+    assert capacity.WorkerCapacity.from_json(data) == published
+
+
+def test_activation_worker_caches_capacity(default_queue: Queue):
+    worker = ActivationWorker(
+        [default_queue], connection=default_queue.connection
+    )
+    with patch.object(
+        capacity, "measure", return_value=capacity.WorkerCapacity()
+    ) as measure:
+        worker.heartbeat()
+        worker.heartbeat()
+        assert measure.call_count == 1
+
+        with patch.object(settings, "RULEBOOK_WORKER_CAPACITY_SECONDS", 0):
+            worker.heartbeat()
+        assert measure.call_count == 2
+
+    # The capacity does not shift the results of the heartbeat pipeline
+    with patch.object(
+        settings, "RULEBOOK_WORKER_CAPACITY_SECONDS", 0
+    ), default_queue.connection.pipeline() as pipeline:
+        worker.heartbeat(pipeline=pipeline)
+        assert len(pipeline.execute()) == 2
+
+
+def test_activation_worker_runs_jobs_concurrently(default_queue: Queue):
+    with patch.object(settings, "RULEBOOK_WORKER_CONCURRENCY", 3):
+        worker = ActivationWorker(
+            [default_queue], connection=default_queue.connection
+        )
+    pids = iter([101, 102])
+
+    def fork_work_horse(job, queue):
+        worker._horse_pid = next(pids)
+
+    jobs = [Mock(id="job-1", timeout=None), Mock(id="job-2", timeout=None)]
+    with patch.object(
+        worker, "fork_work_horse", side_effect=fork_work_horse
+    ) as fork, patch("os.wait4", return_value=(0, 0, None)):
+        for job in jobs:
+            worker.execute_job(job, default_queue)
+            worker._tend_horses()
+    assert fork.call_count == 2
+    assert list(worker._horses) == [101, 102]
+    assert worker.get_current_job_id() == "job-2"
+
+    # The second horse dies before finishing its job
+    jobs[1].get_status.return_value = JobStatus.STARTED
+    with patch(
+        "os.wait4",
+        side_effect=lambda pid, options: (pid, 0 if pid == 101 else 9, None),
+    ), patch.object(worker, "handle_job_failure") as handle_job_failure:
+        worker._tend_horses()
+    assert worker._horses == {}
+    handle_job_failure.assert_called_once()
+    assert handle_job_failure.call_args.args[0] is jobs[1]
+    assert worker.get_current_job_id() is None
+
+
+def test_activation_worker_runs_horses_concurrently(default_queue: Queue):
+    with patch.object(
+        settings, "RULEBOOK_WORKER_CONCURRENCY", 2
+    ), patch.object(settings, "RULEBOOK_QUEUE_NAME", default_queue.name):
+        worker = ActivationWorker(
+            [default_queue],
+            name=f"activation-{uuid.uuid4()}",
+            connection=default_queue.connection,
+        )
+    worker.horse_poll_interval = 0.1
+    job = default_queue.enqueue(fake_task, number=1)
+    crashed_job = default_queue.enqueue(crash_task)
+
+    assert worker.work(burst=True)
+
+    assert job.get_status() == JobStatus.FINISHED
+    assert crashed_job.get_status() == JobStatus.FAILED
+    assert crashed_job.id in FailedJobRegistry(queue=default_queue)
+    assert "(signal 9)" in crashed_job.latest_result().exc_string
+    assert worker.get_current_job_id() is None
@@ -708,11 +708,11 @@ def test_update_logs(init_kubernetes_data, kubernetes_engine):
         engine, "_get_job_pod", mock.Mock(return_value=pod_mock)
     ):
         pod_mock.status.container_statuses = get_pod_statuses("running")
-        log_mock = mock.Mock()
+        log_mock = mock.MagicMock()
         message = "INFO Result is kept for 500 seconds"
         with mock.patch.object(engine.client, "core_api") as core_api_mock:
             core_api_mock.read_namespaced_pod_log.return_value = log_mock
-            log_mock.splitlines.return_value = [
+            lines = [
                 (
                     "2023-10-30T19:18:48.362883381Z 2023-10-30 19:18:48,362"
                     " INFO Task started: Monitor project tasks"
@@ -727,9 +727,15 @@ def test_update_logs(init_kubernetes_data, kubernetes_engine):
                 ),
                 f"2023-10-30T19:28:48.376034150Z {message}",
             ]
+            log_mock.__iter__.return_value = [
+                f"{line}\n".encode("utf-8") for line in lines
+            ]
             engine.update_logs(job_name, log_handler)
 
             assert models.RulebookProcessLog.objects.last().log == f"{message}"
+            # the line at the cursor was already persisted
+            assert models.RulebookProcessLog.objects.count() == 3
+            log_mock.release_conn.assert_called_once()
             init_kubernetes_data.activation_instance.refresh_from_db()
             assert (
                 init_kubernetes_data.activation_instance.log_read_at
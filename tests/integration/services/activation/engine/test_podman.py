@@ -17,6 +17,7 @@ from pathlib import Path
 from unittest import mock
 
 import pytest
+from dateutil import parser
 from podman import PodmanClient
 from podman.errors import ContainerError, ImageNotFound
 from podman.errors.exceptions import APIError, NotFound, Response
@@ -687,6 +688,39 @@ def test_engine_update_logs(init_podman_data, podman_engine):
     assert init_podman_data.activation_instance.log_read_at > init_log_read_at
 
 
+@pytest.mark.django_db
+def test_engine_update_logs_incrementally(init_podman_data, podman_engine):
+    engine = podman_engine
+    log_handler = DBLogger(init_podman_data.activation_instance.id)
+
+    container_mock = mock.Mock()
+    engine.client.containers.get.return_value = container_mock
+    container_mock.status = "running"
+    lines = [
+        b"2023-10-31T15:28:00.100000001Z load source\n",
+        b"2023-10-31T15:28:01.200000002Z load source filters\n",
+    ]
+    container_mock.logs.return_value = lines
+    engine.update_logs("100", log_handler)
+
+    # the second read starts from the second of the cursor
+    lines = [
+        b"2023-10-31T15:28:01.200000002Z load source filters\n",
+        b"2023-10-31T15:28:01.300000003Z started\n",
+    ]
+    container_mock.logs.return_value = lines
+    engine.update_logs("100", log_handler)
+
+    assert container_mock.logs.call_args.kwargs["since"] == int(
+        parser.isoparse("2023-10-31T15:28:01Z").timestamp()
+    )
+    assert list(
+        models.RulebookProcessLog.objects.order_by("id").values_list(
+            "log", flat=True
+        )
+    ) == ["load source", "load source filters", "started"]
+
+
 @pytest.mark.django_db
 def test_engine_update_logs_with_container_not_found(
     init_podman_data, podman_engine
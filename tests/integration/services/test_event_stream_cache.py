@@ -0,0 +1,241 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import json
+import uuid
+from unittest import mock
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.test import override_settings
+from rest_framework import status
+
+from aap_eda.core import models
+from aap_eda.core.utils.credentials import inputs_to_store
+from aap_eda.services import event_stream_cache
+from aap_eda.services.event_stream_cache import (
+    CachedEventStream,
+    EventStreamCache,
+    InvalidationListener,
+    get_event_stream,
+    lookup_event_stream,
+)
+from aap_eda.services.event_stream_stats import flush_stats
+from tests.integration.constants import api_url_v1
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Use a fresh cache without an invalidation listener."""
+    monkeypatch.setattr(event_stream_cache, "_cache", None)
+    with mock.patch.object(InvalidationListener, "start"):
+        cache = event_stream_cache.get_cache()
+    return cache
+
+
+def make_entry(name: str, eda_credential_id: int = 1) -> CachedEventStream:
+    return CachedEventStream(
+        id=1,
+        uuid=str(uuid.uuid4()),
+        name=name,
+        channel_name=name,
+        test_mode=False,
+        additional_data_headers="",
+        eda_credential_id=eda_credential_id,
+        inputs={},
+    )
+
+
+@pytest.mark.django_db
+def test_get_event_stream_is_cached(
+    cache, default_event_stream, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        entry = get_event_stream(default_event_stream.uuid)
+    assert entry.id == default_event_stream.id
+    assert entry.channel_name == default_event_stream.channel_name
+    assert entry.inputs["secret"] == "secret"
+
+    with django_assert_num_queries(0), mock.patch(
+        "aap_eda.core.utils.crypto.fields.decrypt_string"
+    ) as decrypt:
+        assert get_event_stream(str(default_event_stream.uuid)) is entry
+        assert (
+            get_event_stream(str(default_event_stream.uuid).upper()) is entry
+        )
+    decrypt.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_get_event_stream_bad_uuid(cache):
+    with pytest.raises(models.EventStream.DoesNotExist):
+        get_event_stream(uuid.uuid4())
+    with pytest.raises(ValidationError):
+        get_event_stream("gobble")
+
+
+@pytest.mark.django_db
+def test_event_stream_save_evicts(cache, default_event_stream):
+    get_event_stream(default_event_stream.uuid)
+
+    default_event_stream.test_mode = True
+    default_event_stream.save(update_fields=["test_mode"])
+
+    assert lookup_event_stream(default_event_stream.uuid) is None
+    assert get_event_stream(default_event_stream.uuid).test_mode is True
+
+
+@pytest.mark.django_db
+def test_event_stream_delete_evicts(cache, default_event_stream):
+    get_event_stream(default_event_stream.uuid)
+
+    default_event_stream.delete()
+
+    assert lookup_event_stream(default_event_stream.uuid) is None
+
+
+@pytest.mark.django_db
+def test_eda_credential_save_evicts(
+    cache, default_event_stream, default_hmac_credential
+):
+    get_event_stream(default_event_stream.uuid)
+
+    default_hmac_credential.inputs = inputs_to_store(
+        {"auth_type": "hmac", "secret": "changed"}
+    )
+    default_hmac_credential.save()
+
+    assert lookup_event_stream(default_event_stream.uuid) is None
+    assert get_event_stream(default_event_stream.uuid).inputs == {
+        "auth_type": "hmac",
+        "secret": "changed",
+    }
+
+
+@pytest.mark.django_db
+def test_invalidation_is_broadcast(
+    cache, default_event_stream, django_capture_on_commit_callbacks
+):
+    with mock.patch.object(
+        event_stream_cache.tasking, "get_redis_client"
+    ) as get_client, django_capture_on_commit_callbacks(execute=True):
+        default_event_stream.save()
+
+    get_client.return_value.publish.assert_called_once_with(
+        event_stream_cache.invalidation_channel(),
+        json.dumps(
+            {"uuid": str(default_event_stream.uuid), "eda_credential_id": None}
+        ),
+    )
+
+
+@override_settings(EVENT_STREAM_CACHE_TTL_SECONDS=0)
+@pytest.mark.django_db
+def test_cache_disabled(default_event_stream, django_assert_num_queries):
+    assert event_stream_cache.get_cache() is None
+    for _ in range(2):
+        with django_assert_num_queries(1):
+            get_event_stream(default_event_stream.uuid)
+
+
+def test_cache_ttl():
+    cache = EventStreamCache(max_size=10, ttl=60)
+    entry = make_entry("a")
+    with mock.patch.object(event_stream_cache.time, "monotonic") as now:
+        now.return_value = 100
+        cache.put(entry, cache.generation)
+        now.return_value = 159
+        assert cache.get(entry.uuid) is entry
+        now.return_value = 160
+        assert cache.get(entry.uuid) is None
+    assert len(cache) == 0
+
+
+def test_cache_lru():
+    cache = EventStreamCache(max_size=2, ttl=60)
+    a, b, c = make_entry("a"), make_entry("b"), make_entry("c")
+    cache.put(a, cache.generation)
+    cache.put(b, cache.generation)
+    assert cache.get(a.uuid) is a
+
+    cache.put(c, cache.generation)
+
+    assert cache.get(b.uuid) is None
+    assert cache.get(a.uuid) is a
+    assert cache.get(c.uuid) is c
+
+
+def test_cache_skips_entries_loaded_before_eviction():
+    cache = EventStreamCache(max_size=2, ttl=60)
+    entry = make_entry("a")
+    generation = cache.generation
+
+    cache.evict(event_stream_uuid=entry.uuid)
+    cache.put(entry, generation)
+
+    assert cache.get(entry.uuid) is None
+
+
+def test_listener_handles_messages():
+    cache = EventStreamCache(max_size=10, ttl=60)
+    a, b, c = make_entry("a", 1), make_entry("b", 2), make_entry("c", 2)
+    for entry in (a, b, c):
+        cache.put(entry, cache.generation)
+    listener = InvalidationListener(cache)
+
+    listener.handle(json.dumps({"uuid": a.uuid, "eda_credential_id": None}))
+    assert cache.get(a.uuid) is None
+    assert cache.get(b.uuid) is b
+
+    listener.handle(json.dumps({"uuid": None, "eda_credential_id": 2}))
+    assert len(cache) == 0
+
+    listener.handle(b"garbage")
+
+
+@pytest.mark.django_db
+def test_post_event_stream_steady_state(
+    cache,
+    base_client,
+    default_event_stream,
+    default_hmac_credential,
+    django_assert_num_queries,
+):
+    default_hmac_credential.inputs = inputs_to_store(
+        {"auth_type": "token", "token": "secret", "http_header_key": "Token"}
+    )
+    default_hmac_credential.save()
+    url = (
+        f"{api_url_v1}/external_event_stream/"
+        f"{default_event_stream.uuid}/post/"
+    )
+
+    with mock.patch(
+        "aap_eda.api.views.external_event_stream.PGNotify"
+    ) as pg_notify:
+        for _ in range(2):
+            response = base_client.post(
+                url, data={"a": 1}, format="json", headers={"Token": "secret"}
+            )
+            assert response.status_code == status.HTTP_200_OK
+        # No queries once the event stream is cached
+        with django_assert_num_queries(0):
+            response = base_client.post(
+                url, data={"a": 1}, format="json", headers={"Token": "secret"}
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+    assert pg_notify.call_count == 3
+    flush_stats()
+    default_event_stream.refresh_from_db()
+    assert default_event_stream.events_received == 3
@@ -0,0 +1,154 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import datetime
+from unittest import mock
+
+import pytest
+import redis
+from rest_framework.test import APIClient
+
+from aap_eda.core import models
+from aap_eda.services import event_stream_stats
+from aap_eda.services.event_stream_stats import (
+    flush_stats,
+    pending_event_stream_ids,
+    record_event,
+)
+from tests.integration.constants import api_url_v1
+
+
+@pytest.fixture(autouse=True)
+def clear_stats(redis_external):
+    event_stream_stats.STATS.clear(redis_external)
+    yield
+    event_stream_stats.STATS.clear(redis_external)
+
+
+@pytest.mark.django_db
+def test_record_and_flush(
+    default_event_streams: list[models.EventStream],
+    django_assert_num_queries,
+):
+    first, second = default_event_streams
+    with django_assert_num_queries(0):
+        for _ in range(3):
+            record_event(first.id)
+        record_event(second.id)
+
+    assert pending_event_stream_ids() == {first.id, second.id}
+    first.refresh_from_db()
+    assert first.events_received == 0
+    assert first.last_event_received_at is None
+
+    with django_assert_num_queries(1):
+        assert flush_stats() == 2
+
+    assert pending_event_stream_ids() == set()
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.events_received == 3
+    assert second.events_received == 1
+    assert first.last_event_received_at is not None
+    assert flush_stats() == 0
+
+
+@pytest.mark.django_db
+def test_flush_keeps_latest_event_time(default_event_stream):
+    latest = datetime.datetime.now(tz=datetime.timezone.utc)
+    default_event_stream.events_received = 5
+    default_event_stream.last_event_received_at = latest
+    default_event_stream.save()
+
+    with mock.patch.object(event_stream_stats.time, "time") as now:
+        now.return_value = latest.timestamp() - 60
+        record_event(default_event_stream.id)
+    flush_stats()
+
+    default_event_stream.refresh_from_db()
+    assert default_event_stream.events_received == 6
+    assert default_event_stream.last_event_received_at == latest
+
+
+@pytest.mark.django_db
+def test_record_keeps_latest_event_time(default_event_stream):
+    latest = datetime.datetime.now(tz=datetime.timezone.utc)
+
+    # An event recorded late does not move the received time back
+    with mock.patch.object(event_stream_stats.time, "time") as now:
+        now.return_value = latest.timestamp()
+        record_event(default_event_stream.id)
+        now.return_value = latest.timestamp() - 60
+        record_event(default_event_stream.id)
+    flush_stats()
+
+    default_event_stream.refresh_from_db()
+    assert default_event_stream.events_received == 2
+    assert default_event_stream.last_event_received_at == latest
+
+
+@pytest.mark.django_db
+def test_flush_retries_interrupted_flush(default_event_stream):
+    record_event(default_event_stream.id)
+    with mock.patch.object(
+        event_stream_stats, "_write_stats", side_effect=RuntimeError
+    ):
+        with pytest.raises(RuntimeError):
+            flush_stats()
+    record_event(default_event_stream.id)
+    assert pending_event_stream_ids() == {default_event_stream.id}
+
+    # The interrupted flush is completed first
+    flush_stats()
+    default_event_stream.refresh_from_db()
+    assert default_event_stream.events_received == 1
+
+    flush_stats()
+    default_event_stream.refresh_from_db()
+    assert default_event_stream.events_received == 2
+
+
+@pytest.mark.django_db
+def test_record_falls_back_to_database(default_event_stream):
+    with mock.patch.object(
+        event_stream_stats, "get_redis_client"
+    ) as get_client:
+        get_client.return_value.eval.side_effect = (
+            redis.exceptions.ConnectionError()
+        )
+        record_event(default_event_stream.id)
+
+    default_event_stream.refresh_from_db()
+    assert default_event_stream.events_received == 1
+    assert default_event_stream.last_event_received_at is not None
+
+
+@pytest.mark.django_db
+def test_event_stream_stats_pending(
+    admin_client: APIClient,
+    default_event_streams: list[models.EventStream],
+    default_vault_credential,
+):
+    first, second = default_event_streams
+    record_event(first.id)
+
+    response = admin_client.get(f"{api_url_v1}/event-streams/")
+    pending = {
+        item["id"]: item["stats_pending"] for item in response.data["results"]
+    }
+    assert pending == {first.id: True, second.id: False}
+
+    flush_stats()
+    response = admin_client.get(f"{api_url_v1}/event-streams/{first.id}/")
+    assert response.data["stats_pending"] is False
+    assert response.data["events_received"] == 1
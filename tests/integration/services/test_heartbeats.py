@@ -0,0 +1,127 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import datetime
+from unittest import mock
+
+import pytest
+import redis
+from django.utils import timezone
+
+from aap_eda.core import models
+from aap_eda.services import heartbeats
+from aap_eda.services.heartbeats import (
+    flush_heartbeats,
+    get_updated_at,
+    record_heartbeat,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_heartbeats(redis_external):
+    heartbeats.HEARTBEATS.clear(redis_external)
+    yield
+    heartbeats.HEARTBEATS.clear(redis_external)
+
+
+def make_stats(ruleset_name: str, events_processed: int = 1) -> dict:
+    return {"ruleSetName": ruleset_name, "eventsProcessed": events_processed}
+
+
+@pytest.mark.django_db
+def test_record_and_flush(
+    default_activation: models.Activation,
+    default_activation_instances: list[models.RulebookProcess],
+    django_assert_num_queries,
+):
+    first, second = default_activation_instances
+    default_activation.ruleset_stats = {"ruleset0": make_stats("ruleset0")}
+    default_activation.save(update_fields=["ruleset_stats"])
+    reported_at = timezone.now() + datetime.timedelta(seconds=10)
+
+    with django_assert_num_queries(0):
+        for events in range(1, 4):
+            record_heartbeat(
+                first.id,
+                default_activation.id,
+                reported_at + datetime.timedelta(seconds=events),
+                make_stats("ruleset1", events),
+            )
+        record_heartbeat(
+            second.id,
+            default_activation.id,
+            reported_at,
+            make_stats("ruleset2"),
+        )
+
+    first.refresh_from_db()
+    assert first.updated_at is None
+    assert get_updated_at(first) == reported_at + datetime.timedelta(seconds=3)
+
+    with django_assert_num_queries(2):
+        assert flush_heartbeats() == 2
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    default_activation.refresh_from_db()
+    assert first.updated_at == reported_at + datetime.timedelta(seconds=3)
+    assert second.updated_at == reported_at
+    assert default_activation.ruleset_stats == {
+        "ruleset0": make_stats("ruleset0"),
+        "ruleset1": make_stats("ruleset1", 3),
+        "ruleset2": make_stats("ruleset2"),
+    }
+    assert flush_heartbeats() == 0
+
+
+@pytest.mark.django_db
+def test_get_updated_at_prefers_latest(default_activation_instance):
+    latest = timezone.now()
+    default_activation_instance.updated_at = latest
+    default_activation_instance.save(update_fields=["updated_at"])
+    record_heartbeat(
+        default_activation_instance.id,
+        default_activation_instance.activation_id,
+        latest - datetime.timedelta(seconds=60),
+        make_stats("ruleset1"),
+    )
+    assert get_updated_at(default_activation_instance) == latest
+
+    flush_heartbeats()
+    default_activation_instance.refresh_from_db()
+    assert default_activation_instance.updated_at == latest
+
+
+@pytest.mark.django_db
+def test_record_falls_back_to_database(default_activation_instance):
+    reported_at = timezone.now() + datetime.timedelta(seconds=10)
+    with mock.patch.object(heartbeats, "get_redis_client") as get_client:
+        get_client.return_value.pipeline.return_value.execute.side_effect = (
+            redis.exceptions.ConnectionError()
+        )
+        get_client.return_value.hget.side_effect = (
+            redis.exceptions.ConnectionError()
+        )
+        record_heartbeat(
+            default_activation_instance.id,
+            default_activation_instance.activation_id,
+            reported_at,
+            make_stats("ruleset1"),
+        )
+        default_activation_instance.refresh_from_db()
+        assert get_updated_at(default_activation_instance) == reported_at
+
+    assert default_activation_instance.updated_at == reported_at
+    assert default_activation_instance.activation.ruleset_stats == {
+        "ruleset1": make_stats("ruleset1")
+    }
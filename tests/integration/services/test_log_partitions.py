@@ -0,0 +1,154 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import datetime
+
+import pytest
+from django.db import connection
+
+from aap_eda.core import models
+from aap_eda.services import log_partitions
+
+DAY = datetime.date(2000, 1, 1)
+DAY_START = int(
+    datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc).timestamp()
+)
+
+
+def partition_names() -> set[str]:
+    return {p.name for p in log_partitions.list_partitions()}
+
+
+def create_logs(
+    instance: models.RulebookProcess, log_timestamps: list[int]
+) -> None:
+    models.RulebookProcessLog.objects.bulk_create(
+        [
+            models.RulebookProcessLog(
+                log=f"log-{log_timestamp}",
+                activation_instance=instance,
+                log_timestamp=log_timestamp,
+            )
+            for log_timestamp in log_timestamps
+        ]
+    )
+
+
+@pytest.mark.django_db
+def test_partitions_created_by_migration():
+    partitions = log_partitions.list_partitions()
+    today = datetime.datetime.now(tz=datetime.timezone.utc).date()
+
+    assert partitions[-1].is_default
+    assert (
+        f"{log_partitions.PARTITION_PREFIX}{today.strftime('%Y%m%d')}"
+        in partition_names()
+    )
+
+
+@pytest.mark.django_db
+def test_created_partitions_are_indexed_by_id():
+    created = log_partitions.create_partitions(DAY, 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s",
+            [created[0]],
+        )
+        definitions = [row[0] for row in cursor.fetchall()]
+
+    assert any(
+        definition.endswith("(activation_instance_id, id)")
+        for definition in definitions
+    )
+    assert any(definition.endswith("(id)") for definition in definitions)
+
+
+@pytest.mark.django_db
+def test_create_partitions():
+    created = log_partitions.create_partitions(DAY, 2)
+
+    assert created == [
+        f"{log_partitions.PARTITION_PREFIX}20000101",
+        f"{log_partitions.PARTITION_PREFIX}20000102",
+    ]
+    partition = next(
+        p for p in log_partitions.list_partitions() if p.name == created[0]
+    )
+    assert partition.lower == DAY_START
+    assert partition.upper == DAY_START + log_partitions.DAY_SECONDS
+
+    # The days covered already are skipped
+    assert log_partitions.create_partitions(DAY, 3) == [
+        f"{log_partitions.PARTITION_PREFIX}20000103",
+    ]
+
+
+@pytest.mark.django_db
+def test_create_partition_with_logs_in_default(
+    default_activation_instance: models.RulebookProcess,
+):
+    create_logs(default_activation_instance, [DAY_START])
+
+    assert log_partitions.create_partitions(DAY, 1) == []
+    assert models.RulebookProcessLog.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_drop_partitions(
+    default_activation_instance: models.RulebookProcess,
+):
+    log_partitions.create_partitions(DAY, 2)
+    create_logs(
+        default_activation_instance,
+        [DAY_START, DAY_START + log_partitions.DAY_SECONDS],
+    )
+
+    dropped = log_partitions.drop_partitions(
+        DAY_START + log_partitions.DAY_SECONDS + 1
+    )
+
+    assert dropped == [f"{log_partitions.PARTITION_PREFIX}20000101"]
+    assert dropped[0] not in partition_names()
+    assert list(
+        models.RulebookProcessLog.objects.values_list(
+            "log_timestamp", flat=True
+        )
+    ) == [DAY_START + log_partitions.DAY_SECONDS]
+
+
+@pytest.mark.django_db
+def test_delete_logs(
+    default_activation_instances: list[models.RulebookProcess],
+):
+    first, second = default_activation_instances
+    # Out of any daily partition, in the default one
+    create_logs(first, [DAY_START + i for i in range(5)])
+    create_logs(second, [DAY_START + i for i in range(5)])
+
+    deleted = log_partitions.delete_logs(
+        DAY_START + 3, [first.id], chunk_size=2
+    )
+
+    assert deleted == 3
+    assert (
+        models.RulebookProcessLog.objects.filter(
+            activation_instance=first
+        ).count()
+        == 2
+    )
+
+    deleted = log_partitions.delete_logs(DAY_START + 3, chunk_size=2)
+
+    assert deleted == 3
+    assert models.RulebookProcessLog.objects.count() == 4
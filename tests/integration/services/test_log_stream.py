@@ -0,0 +1,103 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import asyncio
+import json
+import time
+from unittest import mock
+
+import pytest
+from redis.exceptions import RedisError
+
+from aap_eda.core import models
+from aap_eda.services import log_stream
+from aap_eda.services.activation.db_log_handler import DBLogger
+
+TIMEOUT = 5
+
+
+def wait_for_subscriber(client, channel: str) -> None:
+    """Wait for the subscription of the hub, made by its reader thread."""
+    deadline = time.monotonic() + TIMEOUT
+    while not sum(count for _, count in client.pubsub_numsub(channel)):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def get_message(pubsub) -> dict:
+    message = pubsub.get_message(timeout=TIMEOUT)
+    assert message is not None
+    return json.loads(message["data"])
+
+
+@pytest.mark.django_db
+def test_flush_publishes_logs(
+    default_activation_instance: models.RulebookProcess,
+    redis_external,
+    django_capture_on_commit_callbacks,
+):
+    pubsub = redis_external.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(log_stream.channel_name(default_activation_instance.id))
+    db_logger = DBLogger(default_activation_instance.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        db_logger.write(
+            ["2023-10-30 19:18:48,375 INFO Result: {}", "no timestamp"],
+            flush=True,
+            log_timestamp=1000,
+        )
+
+    data = get_message(pubsub)
+    assert data["type"] == "Logs"
+    assert data["activation_instance_id"] == default_activation_instance.id
+    assert [
+        (log["log"], log["log_timestamp"], log["log_created_at"] is None)
+        for log in data["logs"]
+    ] == [("INFO Result: {}", 1000, False), ("no timestamp", 1000, True)]
+    pubsub.close()
+
+
+def test_publish_logs_redis_error(caplog_factory):
+    eda_caplog = caplog_factory(log_stream.logger)
+    client = mock.Mock()
+    client.publish.side_effect = RedisError("down")
+
+    with mock.patch.object(
+        log_stream, "get_redis_client", return_value=client
+    ):
+        log_stream.publish_logs(1, [("log", 1000, None)])
+
+    assert "Failed to publish the logs of activation instance 1" in (
+        eda_caplog.text
+    )
+
+
+async def test_hub_dispatches_to_subscribers(redis_external):
+    hub = log_stream.LogStreamHub()
+    first = hub.subscribe(1)
+    second = hub.subscribe(1)
+    other = hub.subscribe(2)
+    await asyncio.to_thread(
+        wait_for_subscriber, redis_external, log_stream.channel_name(1)
+    )
+
+    await asyncio.to_thread(log_stream.publish_logs, 1, [("log", 1, None)])
+
+    for queue in (first, second):
+        data = json.loads(await asyncio.wait_for(queue.get(), TIMEOUT))
+        assert data["logs"][0]["log"] == "log"
+    assert other.empty()
+
+    hub.unsubscribe(1, first)
+    hub.unsubscribe(1, second)
+    assert log_stream.channel_name(1) not in hub.groups
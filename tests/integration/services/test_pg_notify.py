@@ -0,0 +1,267 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import json
+from unittest import mock
+
+import psycopg
+import pytest
+from django.conf import settings
+
+from aap_eda.core.exceptions import PGNotifyError
+from aap_eda.services import pg_notify
+from aap_eda.services.pg_notify import (
+    AsyncPGNotify,
+    PGNotify,
+    PGNotifyConnectionPool,
+    close_async_connection_pools,
+    close_connection_pools,
+    encode_messages,
+    get_async_connection_pool,
+    get_connection_pool,
+)
+
+CHANNEL = "test_pg_notify_channel"
+
+
+@pytest.fixture(autouse=True)
+def reset_pools():
+    close_connection_pools()
+    yield
+    close_connection_pools()
+
+
+@pytest.fixture
+def listener():
+    with psycopg.connect(
+        conninfo=settings.PG_NOTIFY_DSN_SERVER, autocommit=True
+    ) as conn:
+        conn.execute(f"LISTEN {CHANNEL}")
+        yield conn
+
+
+def received(conn: psycopg.Connection, count: int) -> list[dict]:
+    return [
+        json.loads(notify.payload)
+        for notify in conn.notifies(timeout=5, stop_after=count)
+    ]
+
+
+def make_pool(**kwargs) -> PGNotifyConnectionPool:
+    params = {
+        "max_size": 2,
+        "timeout": 1,
+        "health_check_seconds": 30,
+        "connect_retries": 3,
+    }
+    params.update(kwargs)
+    return PGNotifyConnectionPool(settings.PG_NOTIFY_DSN_SERVER, **params)
+
+
+def test_pg_notify_publishes_payload(listener):
+    data = {"payload": {"a": 1, "quote": "it's $$ quoted"}}
+
+    PGNotify(settings.PG_NOTIFY_DSN_SERVER, CHANNEL, data)()
+
+    assert received(listener, 1) == [data]
+
+
+def test_pg_notify_chunks_large_payload(listener):
+    data = {"payload": {"blob": "x" * (pg_notify.MAX_MESSAGE_LENGTH * 3)}}
+
+    PGNotify(settings.PG_NOTIFY_DSN_SERVER, CHANNEL, data)()
+
+    chunks = received(listener, 4)
+    assert [chunk[pg_notify.MESSAGE_CHUNK_SEQUENCE] for chunk in chunks] == [
+        1,
+        2,
+        3,
+        4,
+    ]
+    assert chunks[0][pg_notify.MESSAGE_CHUNK_COUNT] == 4
+    payload = "".join(chunk[pg_notify.MESSAGE_CHUNK] for chunk in chunks)
+    assert json.loads(payload) == data
+
+
+def test_pg_notify_chunks_without_pipeline_support(listener):
+    data = {"payload": {"blob": "y" * (pg_notify.MAX_MESSAGE_LENGTH * 2)}}
+
+    with mock.patch.object(
+        pg_notify.psycopg.Pipeline, "is_supported", return_value=False
+    ):
+        PGNotify(settings.PG_NOTIFY_DSN_SERVER, CHANNEL, data)()
+
+    chunks = received(listener, 3)
+    payload = "".join(chunk[pg_notify.MESSAGE_CHUNK] for chunk in chunks)
+    assert json.loads(payload) == data
+
+
+def test_encode_messages_small_payload():
+    assert encode_messages({"a": 1}) == ['{"a": 1}']
+
+
+@pytest.mark.parametrize(
+    ("max_length", "count"),
+    [(29, 1), (15, 2), (10, 3), (1, 29)],
+)
+def test_encode_messages_chunks(max_length, count):
+    data = {"k": '"' * 10}
+    payload = json.dumps(data)
+    assert len(payload) == 29
+
+    with mock.patch.object(pg_notify, "MAX_MESSAGE_LENGTH", max_length):
+        messages = [json.loads(m) for m in encode_messages(data)]
+
+    assert len(messages) == count
+    assert [m[pg_notify.MESSAGE_CHUNK_SEQUENCE] for m in messages] == list(
+        range(1, count + 1)
+    )
+    for message in messages:
+        assert message[pg_notify.MESSAGE_CHUNK_COUNT] == count
+        assert message[pg_notify.MESSAGE_LENGTH] == len(payload)
+        assert message[pg_notify.MESSAGE_CHUNKED_UUID] == (
+            messages[0][pg_notify.MESSAGE_CHUNKED_UUID]
+        )
+    assert "".join(m[pg_notify.MESSAGE_CHUNK] for m in messages) == payload
+
+
+def test_pg_notify_reuses_pooled_connection(listener):
+    for i in range(5):
+        PGNotify(settings.PG_NOTIFY_DSN_SERVER, CHANNEL, {"i": i})()
+
+    assert received(listener, 5) == [{"i": i} for i in range(5)]
+    pool = get_connection_pool(settings.PG_NOTIFY_DSN_SERVER)
+    assert pool.size == 1
+    assert pool.idle == 1
+
+
+def test_pg_notify_retries_on_dropped_connection(listener):
+    pool = get_connection_pool(settings.PG_NOTIFY_DSN_SERVER)
+    PGNotify(settings.PG_NOTIFY_DSN_SERVER, CHANNEL, {"i": 1})()
+    assert received(listener, 1) == [{"i": 1}]
+    with pool.connection() as conn:
+        backend_pid = conn.info.backend_pid
+    listener.execute("SELECT pg_terminate_backend(%s)", (backend_pid,))
+
+    PGNotify(settings.PG_NOTIFY_DSN_SERVER, CHANNEL, {"i": 2})()
+
+    assert received(listener, 1) == [{"i": 2}]
+    assert pool.size == 1
+
+
+def test_pg_notify_connection_failure():
+    with mock.patch.object(
+        pg_notify.psycopg,
+        "connect",
+        side_effect=psycopg.OperationalError("refused"),
+    ), mock.patch.object(pg_notify.time, "sleep") as sleep:
+        with pytest.raises(PGNotifyError):
+            PGNotify(settings.PG_NOTIFY_DSN_SERVER, CHANNEL, {"a": 1})()
+
+    assert get_connection_pool(settings.PG_NOTIFY_DSN_SERVER).size == 0
+    # Two publish attempts, each backing off between three connects
+    assert sleep.call_args_list == [mock.call(0.1), mock.call(0.2)] * 2
+
+
+def test_pool_reconnects_with_backoff():
+    pool = make_pool()
+    connect = psycopg.connect
+    with mock.patch.object(
+        pg_notify.psycopg,
+        "connect",
+        side_effect=[
+            psycopg.OperationalError("refused"),
+            psycopg.OperationalError("refused"),
+            connect(conninfo=settings.PG_NOTIFY_DSN_SERVER, autocommit=True),
+        ],
+    ), mock.patch.object(pg_notify.time, "sleep") as sleep:
+        with pool.connection() as conn:
+            assert conn.execute("SELECT 1").fetchone() == (1,)
+
+    assert sleep.call_args_list == [mock.call(0.1), mock.call(0.2)]
+    pool.close()
+
+
+def test_pool_is_bounded():
+    pool = make_pool(max_size=1, timeout=0.1)
+    with pool.connection():
+        with pytest.raises(PGNotifyError):
+            with pool.connection():
+                pass
+    with pool.connection():
+        assert pool.size == 1
+    pool.close()
+
+
+def test_pool_health_checks_idle_connections():
+    pool = make_pool(health_check_seconds=0)
+    with pool.connection() as conn:
+        first = conn
+    first.close()
+
+    with pool.connection() as conn:
+        assert conn is not first
+        assert not conn.closed
+    assert pool.size == 1
+    pool.close()
+
+
+def test_pool_close_discards_checked_out_connections():
+    pool = make_pool(max_size=1)
+    with pool.connection() as conn:
+        pool.close()
+        assert pool.size == 1
+    assert conn.closed
+    assert pool.size == 0
+    assert pool.idle == 0
+
+    with pytest.raises(PGNotifyError):
+        with pool.connection():
+            pass
+
+
+async def test_async_pg_notify_publishes(listener):
+    dsn = settings.PG_NOTIFY_DSN_SERVER
+    large = {"payload": {"blob": "z" * (pg_notify.MAX_MESSAGE_LENGTH * 2)}}
+    try:
+        await AsyncPGNotify(dsn, CHANNEL, {"a": 1})()
+        await AsyncPGNotify(dsn, CHANNEL, large)()
+        pool = get_async_connection_pool(dsn)
+        assert pool.size == 1
+        assert pool.idle == 1
+    finally:
+        await close_async_connection_pools()
+
+    messages = received(listener, 4)
+    assert messages[0] == {"a": 1}
+    payload = "".join(chunk[pg_notify.MESSAGE_CHUNK] for chunk in messages[1:])
+    assert json.loads(payload) == large
+
+
+async def test_async_pg_notify_connection_failure():
+    with mock.patch.object(
+        pg_notify.psycopg.AsyncConnection,
+        "connect",
+        side_effect=psycopg.OperationalError("refused"),
+    ), mock.patch.object(pg_notify.asyncio, "sleep") as sleep:
+        try:
+            with pytest.raises(PGNotifyError):
+                await AsyncPGNotify(
+                    settings.PG_NOTIFY_DSN_SERVER, CHANNEL, {"a": 1}
+                )()
+            pool = get_async_connection_pool(settings.PG_NOTIFY_DSN_SERVER)
+            assert pool.size == 0
+        finally:
+            await close_async_connection_pools()
+
+    assert sleep.call_count == 4
@@ -0,0 +1,145 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import datetime
+import uuid
+
+import pytest
+from django.utils import timezone
+
+from aap_eda.core import models
+from aap_eda.services import retention
+
+POLICIES = {policy.name: policy for policy in retention.POLICIES}
+
+
+@pytest.fixture(autouse=True)
+def retention_settings(settings, redis_external):
+    settings.AUDIT_RULE_RETENTION_DAYS = 30
+    settings.AUDIT_ACTION_RETENTION_DAYS = 30
+    settings.AUDIT_EVENT_RETENTION_DAYS = 30
+    settings.JOB_INSTANCE_EVENT_RETENTION_DAYS = 30
+    settings.RETENTION_BATCH_DELAY_MS = 0
+    redis_external.delete(retention.CURSORS_KEY)
+    yield settings
+    redis_external.delete(retention.CURSORS_KEY)
+
+
+@pytest.fixture
+def new_audit_rule(
+    default_activation_instance: models.RulebookProcess,
+    default_organization: models.Organization,
+) -> models.AuditRule:
+    audit_rule = models.AuditRule.objects.create(
+        name="new audit rule",
+        fired_at=timezone.now(),
+        activation_instance=default_activation_instance,
+        organization=default_organization,
+    )
+    audit_action = models.AuditAction.objects.create(
+        id=str(uuid.uuid4()),
+        name="debug",
+        audit_rule=audit_rule,
+        status="successful",
+        fired_at=timezone.now(),
+    )
+    audit_event = models.AuditEvent.objects.create(
+        id=str(uuid.uuid4()),
+        source_name="my test source",
+        source_type="ansible.eda.range",
+        received_at=timezone.now(),
+    )
+    audit_event.audit_actions.add(audit_action)
+    return audit_rule
+
+
+@pytest.mark.django_db
+def test_apply_policies_audit(
+    audit_event_1: models.AuditEvent,
+    audit_event_2: models.AuditEvent,
+    new_audit_rule: models.AuditRule,
+):
+    results = retention.apply_policies()
+
+    assert results["audit_rule"] == 2
+    assert results["audit_event"] == 2
+    assert list(models.AuditRule.objects.all()) == [new_audit_rule]
+    assert models.AuditAction.objects.get().audit_rule == new_audit_rule
+    assert models.AuditEvent.objects.get().audit_actions.count() == 1
+
+
+@pytest.mark.django_db
+def test_apply_policies_job_instance_events():
+    old_job_uuid = uuid.uuid4()
+    new_job_uuid = uuid.uuid4()
+    for job_uuid in (old_job_uuid, new_job_uuid):
+        models.JobInstanceEvent.objects.create(
+            job_uuid=job_uuid, counter=1, stdout="", type="runner_on_ok"
+        )
+        models.JobInstanceHost.objects.create(
+            job_uuid=job_uuid,
+            playbook="playbook.yml",
+            play="play",
+            task="task",
+            status="ok",
+        )
+    # created_at is set on creation
+    models.JobInstanceEvent.objects.filter(job_uuid=old_job_uuid).update(
+        created_at=timezone.now() - datetime.timedelta(days=31)
+    )
+
+    retention.apply_policies()
+
+    assert list(
+        models.JobInstanceEvent.objects.values_list("job_uuid", flat=True)
+    ) == [new_job_uuid]
+    assert list(
+        models.JobInstanceHost.objects.values_list("job_uuid", flat=True)
+    ) == [new_job_uuid]
+
+
+@pytest.mark.django_db
+def test_apply_policy_resumes(audit_rule_1: models.AuditRule, redis_external):
+    policy = POLICIES["audit_rule"]
+    cutoff = timezone.now()
+
+    # A run past its deadline keeps the cursor for the next one
+    redis_external.hset(retention.CURSORS_KEY, policy.name, 0)
+    deadline = retention.Deadline(0)
+    assert retention.apply_policy(policy, cutoff, deadline) == 0
+    assert models.AuditRule.objects.exists()
+
+    # The pages before the cursor are left to the next walk of the table
+    redis_external.hset(
+        retention.CURSORS_KEY,
+        policy.name,
+        retention._table_pages(policy.table),
+    )
+    deadline = retention.Deadline(60)
+    assert retention.apply_policy(policy, cutoff, deadline) == 0
+    assert models.AuditRule.objects.exists()
+    assert redis_external.hget(retention.CURSORS_KEY, policy.name) is None
+
+    assert retention.apply_policy(policy, cutoff, deadline) == 1
+    assert not models.AuditRule.objects.exists()
+
+
+@pytest.mark.django_db
+def test_apply_policies_disabled(settings, audit_event_1: models.AuditEvent):
+    settings.AUDIT_RULE_RETENTION_DAYS = 0
+    settings.AUDIT_ACTION_RETENTION_DAYS = 0
+    settings.AUDIT_EVENT_RETENTION_DAYS = 0
+    settings.JOB_INSTANCE_EVENT_RETENTION_DAYS = 0
+
+    assert retention.apply_policies() == {}
+    assert models.AuditEvent.objects.exists()
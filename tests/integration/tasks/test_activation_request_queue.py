@@ -162,3 +162,34 @@ def test_arbitrate(activations, requests):
     assert models.ActivationRequestQueue.objects.count() == len(
         requests["dequeued"]
     )
+
+
+@pytest.mark.django_db
+def test_list_requests_arbitrates_all_parents(activations):
+    for request in [
+        ActivationRequest.AUTO_START,
+        ActivationRequest.START,
+        ActivationRequest.STOP,
+        ActivationRequest.RESTART,
+    ]:
+        queue.push(ProcessParentType.ACTIVATION, activations[0].id, request)
+    for request in [
+        ActivationRequest.AUTO_START,
+        ActivationRequest.AUTO_START,
+    ]:
+        queue.push(ProcessParentType.ACTIVATION, activations[1].id, request)
+
+    requests = queue.list_requests()
+    assert [
+        (entry.process_parent_id, entry.request) for entry in requests
+    ] == [
+        (activations[0].id, ActivationRequest.STOP),
+        (activations[1].id, ActivationRequest.AUTO_START),
+    ]
+    assert models.ActivationRequestQueue.objects.count() == 3
+    assert [
+        entry.request
+        for entry in queue.peek_all(
+            ProcessParentType.ACTIVATION, activations[0].id
+        )
+    ] == [ActivationRequest.STOP, ActivationRequest.RESTART]
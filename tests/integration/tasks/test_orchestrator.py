@@ -12,10 +12,17 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import copy
+import time
+from datetime import datetime, timedelta
 from unittest import mock
 
 import pytest
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rq.utils import utcformat
+from rq.worker_registration import WORKERS_BY_QUEUE_KEY
 
 import aap_eda.tasks.activation_request_queue as queue
 from aap_eda.core import models
@@ -24,7 +31,12 @@ from aap_eda.core.enums import (
     ActivationStatus,
     ProcessParentType,
 )
-from aap_eda.tasks import orchestrator
+from aap_eda.services.activation.capacity import (
+    CAPACITY_FIELD,
+    WorkerCapacity,
+    parse_memory,
+)
+from aap_eda.tasks import orchestrator, placement
 
 
 def fake_task(number: int):
@@ -343,3 +355,361 @@ def test_dispatch_existing_rq_jobs(
     )
     activation.refresh_from_db()
     assert activation.status == ActivationStatus.STOPPED
+
+
+@pytest.fixture
+def monitor_schedule(redis_external):
+    redis_external.delete(
+        orchestrator._monitor_schedule_key(), orchestrator._monitor_sweep_key()
+    )
+    yield redis_external
+    redis_external.delete(
+        orchestrator._monitor_schedule_key(), orchestrator._monitor_sweep_key()
+    )
+
+
+def scheduled_monitors(client) -> dict[str, float]:
+    return {
+        member.decode(): score
+        for member, score in client.zrange(
+            orchestrator._monitor_schedule_key(), 0, -1, withscores=True
+        )
+    }
+
+
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.dispatch")
+def test_monitor_dispatches_due_activations(
+    dispatch_mock, monitor_schedule, activation, max_running_processes
+):
+    due = max_running_processes[0].activation
+    orchestrator._start_sweep()
+    orchestrator.schedule_monitor(ProcessParentType.ACTIVATION, due.id)
+    orchestrator.schedule_monitor(
+        ProcessParentType.ACTIVATION, activation.id, 60
+    )
+
+    orchestrator.monitor_rulebook_processes_no_lock()
+
+    dispatch_mock.assert_called_once_with(
+        ProcessParentType.ACTIVATION, due.id, None, mock.ANY, mock.ANY
+    )
+    # Monitored again unless its manager reschedules it
+    scheduled = scheduled_monitors(monitor_schedule)
+    assert set(scheduled) == {
+        f"activation:{due.id}",
+        f"activation:{activation.id}",
+    }
+    assert scheduled[f"activation:{due.id}"] == pytest.approx(
+        time.time() + settings.RULEBOOK_MONITOR_INTERVAL_SECONDS, abs=5
+    )
+
+
+@pytest.mark.django_db
+def test_monitor_unschedules_deleted_activation(monitor_schedule, activation):
+    orchestrator._start_sweep()
+    orchestrator.schedule_monitor(ProcessParentType.ACTIVATION, activation.id)
+    activation.delete()
+
+    orchestrator.monitor_rulebook_processes_no_lock()
+
+    assert scheduled_monitors(monitor_schedule) == {}
+
+
+@pytest.mark.django_db
+def test_dispatch_unschedules_deleted_activation(monitor_schedule, activation):
+    orchestrator.schedule_monitor(
+        ProcessParentType.ACTIVATION, activation.id, 60
+    )
+    activation_id = activation.id
+    activation.delete()
+
+    orchestrator.dispatch(ProcessParentType.ACTIVATION, activation_id, None)
+
+    assert scheduled_monitors(monitor_schedule) == {}
+
+
+@pytest.mark.django_db
+def test_manage_unschedules_deleted_activation(monitor_schedule, activation):
+    orchestrator.schedule_monitor(
+        ProcessParentType.ACTIVATION, activation.id, 60
+    )
+    activation_id = activation.id
+    activation.delete()
+
+    orchestrator._manage(ProcessParentType.ACTIVATION, activation_id)
+
+    assert scheduled_monitors(monitor_schedule) == {}
+
+
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.dispatch")
+def test_monitor_sweeps_active_processes(
+    dispatch_mock, monitor_schedule, activation, max_running_processes
+):
+    orchestrator.monitor_rulebook_processes_no_lock()
+
+    assert {call.args[1] for call in dispatch_mock.call_args_list} == {
+        process.activation_id for process in max_running_processes
+    }
+
+    # The next sweep is not due yet
+    dispatch_mock.reset_mock()
+    orchestrator.monitor_rulebook_processes_no_lock()
+    dispatch_mock.assert_not_called()
+
+
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.dispatch")
+def test_monitor_limits_start_requests(
+    dispatch_mock,
+    monitor_schedule,
+    activation,
+    max_running_processes,
+    eda_caplog,
+):
+    orchestrator._start_sweep()
+    starts = [process.activation_id for process in max_running_processes]
+    orchestrator.request_rulebook_processes(
+        ProcessParentType.ACTIVATION, starts, ActivationRequest.START
+    )
+    queue.push(
+        ProcessParentType.ACTIVATION, activation.id, ActivationRequest.STOP
+    )
+
+    with mock.patch.object(settings, "RULEBOOK_START_REQUESTS_PER_TICK", 2):
+        orchestrator.monitor_rulebook_processes_no_lock()
+
+    dispatched = [call.args[1:3] for call in dispatch_mock.call_args_list]
+    assert dispatched == [
+        (activation.id, ActivationRequest.STOP),
+        (starts[0], ActivationRequest.START),
+        (starts[1], ActivationRequest.START),
+    ]
+    assert (
+        f"Deferring {len(starts) - 2} start requests to the next run"
+        in eda_caplog.text
+    )
+
+
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.monitor_rulebook_processes")
+def test_request_rulebook_processes(
+    monitor_mock, max_running_processes, django_capture_on_commit_callbacks
+):
+    ids = [process.activation_id for process in max_running_processes]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        count = orchestrator.request_rulebook_processes(
+            ProcessParentType.ACTIVATION,
+            ids + [4242],
+            ActivationRequest.RESTART,
+            "bulk-id",
+        )
+        # The monitor is enqueued once the requests are committed
+        monitor_mock.delay.assert_not_called()
+
+    assert count == len(ids)
+    assert sorted(
+        models.ActivationRequestQueue.objects.filter(
+            request_id="bulk-id"
+        ).values_list("process_parent_id", flat=True)
+    ) == sorted(ids)
+    monitor_mock.delay.assert_called_once()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("status", "delay"),
+    [
+        (ActivationStatus.STARTING, settings.SCHEDULER_JOB_INTERVAL),
+        (ActivationStatus.RUNNING, settings.RULEBOOK_MONITOR_INTERVAL_SECONDS),
+        (ActivationStatus.STOPPED, None),
+    ],
+)
+@mock.patch("aap_eda.tasks.orchestrator.ActivationManager")
+def test_manage_reschedules_monitor(
+    manager_mock, monitor_schedule, activation, status, delay
+):
+    orchestrator.schedule_monitor(ProcessParentType.ACTIVATION, activation.id)
+    activation.status = status
+    activation.save(update_fields=["status"])
+
+    orchestrator._manage(ProcessParentType.ACTIVATION, activation.id)
+
+    scheduled = scheduled_monitors(monitor_schedule)
+    if delay is None:
+        assert scheduled == {}
+    else:
+        assert scheduled[f"activation:{activation.id}"] == pytest.approx(
+            time.time() + delay, abs=5
+        )
+
+
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.ActivationManager")
+def test_manage_reschedules_monitor_on_failure(
+    manager_mock, monitor_schedule, activation
+):
+    activation.status = ActivationStatus.RUNNING
+    activation.save(update_fields=["status"])
+    manager_mock.return_value.monitor.side_effect = RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        orchestrator._manage(ProcessParentType.ACTIVATION, activation.id)
+
+    assert scheduled_monitors(monitor_schedule)[
+        f"activation:{activation.id}"
+    ] == pytest.approx(
+        time.time() + settings.RULEBOOK_MONITOR_INTERVAL_SECONDS, abs=5
+    )
+
+
+@pytest.fixture
+def rulebook_workers(redis_external, monkeypatch):
+    """Register a worker for each of three queues, the one of "offline"
+    failing its liveness checks."""
+    monkeypatch.setattr(
+        settings, "RULEBOOK_WORKER_QUEUES", ["activation", "offline", "spare"]
+    )
+    for queue_name in ["offline", "spare"]:
+        monkeypatch.setitem(
+            settings.RQ_QUEUES,
+            queue_name,
+            copy.deepcopy(settings.RQ_QUEUES["activation"]),
+        )
+    workers = {
+        "activation": datetime.now(),
+        "offline": datetime.now()
+        - timedelta(seconds=2 * settings.DEFAULT_WORKER_HEARTBEAT_TIMEOUT),
+        "spare": datetime.now(),
+    }
+    for queue_name, last_heartbeat in workers.items():
+        key = f"rq:worker:test-{queue_name}"
+        redis_external.hset(key, "last_heartbeat", utcformat(last_heartbeat))
+        redis_external.sadd(WORKERS_BY_QUEUE_KEY % queue_name, key)
+    return workers
+
+
+@pytest.mark.django_db
+def test_queue_snapshot(
+    rulebook_workers, max_running_processes, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        snapshot = orchestrator.QueueSnapshot.take()
+
+    assert snapshot.queues["activation"].live_workers == 1
+    assert snapshot.queues["activation"].running_processes == len(
+        max_running_processes
+    )
+    assert snapshot.queues["offline"].live_workers == 0
+    assert snapshot.queues["offline"].heartbeat_age > timedelta(
+        seconds=settings.DEFAULT_WORKER_HEARTBEAT_TIMEOUT
+    )
+    assert snapshot.is_healthy("activation")
+    assert not snapshot.is_healthy("offline")
+    assert not snapshot.is_healthy("unknown")
+    assert snapshot.select_queue_name() == "spare"
+
+    for _ in range(len(max_running_processes)):
+        snapshot.add_process("spare")
+    snapshot.add_process("spare")
+    assert snapshot.select_queue_name() == "activation"
+
+
+@pytest.mark.django_db
+def test_queue_snapshot_capacity(rulebook_workers, redis_external, activation):
+    published = WorkerCapacity(
+        total_memory=8 * 1024**3,
+        free_memory=6 * 1024**3,
+        cpus=4,
+        load=1.0,
+    )
+    redis_external.hset(
+        "rq:worker:test-spare", CAPACITY_FIELD, published.to_json()
+    )
+
+    snapshot = orchestrator.QueueSnapshot.take()
+    assert snapshot.queues["spare"].capacity == published
+    assert snapshot.queues["activation"].capacity is None
+
+    snapshot.strategy = placement.get_strategy("spread")
+    assert snapshot.select_queue_name(activation) == "spare"
+    snapshot.add_process("spare", activation)
+    capacity = snapshot.queues["spare"].capacity
+    assert capacity.free_memory == published.free_memory - parse_memory(
+        settings.PODMAN_MEM_LIMIT
+    )
+    assert capacity.images == {"localhost:14000/test-image-url:latest"}
+
+
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.tasking.unique_enqueue")
+def test_monitor_keeps_workers_offline_scheduled(
+    enqueue_mock, rulebook_workers, monitor_schedule, activation
+):
+    activation.status = ActivationStatus.WORKERS_OFFLINE
+    activation.save(update_fields=["status"])
+    process = models.RulebookProcess.objects.create(
+        name="offline",
+        activation=activation,
+        status=ActivationStatus.WORKERS_OFFLINE,
+        organization=activation.organization,
+    )
+    models.RulebookProcessQueue.objects.create(
+        process=process, queue_name="offline"
+    )
+    activation.latest_instance = process
+    activation.save(update_fields=["latest_instance"])
+    orchestrator._start_sweep()
+    orchestrator.schedule_monitor(ProcessParentType.ACTIVATION, activation.id)
+
+    orchestrator.monitor_rulebook_processes_no_lock()
+
+    # Not dispatched while its workers are offline, but retried later
+    enqueue_mock.assert_not_called()
+    assert scheduled_monitors(monitor_schedule)[
+        f"activation:{activation.id}"
+    ] == pytest.approx(
+        time.time() + settings.RULEBOOK_MONITOR_INTERVAL_SECONDS, abs=5
+    )
+
+
+@pytest.mark.django_db
+@mock.patch("aap_eda.tasks.orchestrator.tasking.unique_enqueue")
+def test_monitor_reads_queues_once(
+    enqueue_mock,
+    rulebook_workers,
+    monitor_schedule,
+    max_running_processes,
+    default_organization,
+):
+    user = max_running_processes[0].activation.user
+    activations = [
+        models.Activation.objects.create(
+            name=f"test_snapshot{i}",
+            user=user,
+            organization=default_organization,
+        )
+        for i in range(9)
+    ]
+    for activation in activations:
+        queue.push(
+            ProcessParentType.ACTIVATION,
+            activation.id,
+            ActivationRequest.START,
+        )
+
+    # Only the requests are dispatched
+    orchestrator._start_sweep()
+    with CaptureQueriesContext(connection) as queries:
+        orchestrator.monitor_rulebook_processes_no_lock()
+
+    assert enqueue_mock.call_count == len(activations)
+    # The new processes are balanced between the healthy queues
+    queue_names = [call.args[0] for call in enqueue_mock.call_args_list]
+    assert queue_names.count("activation") == 2
+    assert queue_names.count("spare") == 7
+    assert (
+        len([q for q in queries.captured_queries if "COUNT(" in q["sql"]]) == 1
+    )
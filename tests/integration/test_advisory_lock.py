@@ -41,6 +41,30 @@ from tests.integration.utils import ThreadSafeList
             "fn_call": "monitor_project_tasks",
             "fn_args": [],
         },
+        {
+            "module_path": "aap_eda.tasks.event_stream",
+            "fn_mock": "flush_stats",
+            "fn_call": "flush_event_stream_stats",
+            "fn_args": [],
+        },
+        {
+            "module_path": "aap_eda.tasks.heartbeat",
+            "fn_mock": "flush_heartbeats",
+            "fn_call": "flush_rulebook_process_heartbeats",
+            "fn_args": [],
+        },
+        {
+            "module_path": "aap_eda.tasks.rulebook_process_log",
+            "fn_mock": "maintain_partitions",
+            "fn_call": "create_rulebook_process_log_partitions",
+            "fn_args": [],
+        },
+        {
+            "module_path": "aap_eda.tasks.retention",
+            "fn_mock": "apply_policies",
+            "fn_call": "apply_retention_policies",
+            "fn_args": [],
+        },
     ],
     ids=[
         "gather_analytics",
@@ -48,6 +72,10 @@ from tests.integration.utils import ThreadSafeList
         "import_project",
         "sync_project",
         "monitor_project_tasks",
+        "flush_event_stream_stats",
+        "flush_rulebook_process_heartbeats",
+        "create_rulebook_process_log_partitions",
+        "apply_retention_policies",
     ],
 )
 @pytest.mark.django_db
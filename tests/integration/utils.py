@@ -11,6 +11,10 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
 
 
 class ThreadSafeList:
@@ -21,3 +25,12 @@ class ThreadSafeList:
     def append(self, item):
         with self.lock:
             self.base_list.append(item)
+
+
+def list_page_queries(client: APIClient, url: str, page_size: int) -> int:
+    """Return the number of queries listing a full page of url."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {"page_size": page_size})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == page_size
+    return len(queries)
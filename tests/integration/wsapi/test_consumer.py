@@ -1,21 +1,40 @@
+import asyncio
 import base64
 import logging
+import time
 import uuid
 from datetime import datetime
 from typing import Generator
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
+import msgpack
 import pytest
 import pytest_asyncio
 from channels.db import database_sync_to_async
 from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from pydantic.error_wrappers import ValidationError
 
 from aap_eda.core import enums, models
 from aap_eda.core.models.activation import ActivationStatus
-from aap_eda.wsapi.consumers import AnsibleRulebookConsumer, logger
+from aap_eda.services import heartbeats, log_stream
+from aap_eda.wsapi import protocols
+from aap_eda.wsapi.consumers import (
+    ActivationInstanceLogConsumer,
+    AnsibleRulebookConsumer,
+    WriteBuffer,
+    logger,
+)
+from aap_eda.wsapi.messages import (
+    ActionMessage,
+    AnsibleEventMessage,
+    JobMessage,
+)
 
 # TODO(doston): this test module needs a whole refactor to use already
 # existing fixtures over from API conftest.py instead of creating new objects
@@ -262,6 +281,191 @@ async def test_handle_events(ws_communicator: WebsocketCommunicator):
     assert (await get_job_instance_event_count()) == 1
 
 
+@pytest.mark.parametrize(
+    ("batch_size", "batches"),
+    [(100, [3]), (2, [2, 1])],
+)
+@pytest.mark.django_db(transaction=True)
+async def test_handle_jobs_in_batches(
+    ws_communicator: WebsocketCommunicator,
+    batch_size,
+    batches,
+):
+    payloads = [
+        {
+            "type": "Job",
+            "job_id": str(uuid.uuid4()),
+            "ansible_rulebook_id": 1,
+            "name": "ansible.eda.hello",
+            "ruleset": "ruleset",
+            "rule": "rule",
+            "hosts": "hosts",
+            "action": "run_playbook",
+        }
+        for _ in range(3)
+    ]
+
+    with override_settings(WEBSOCKET_JOB_BATCH_SIZE=batch_size), patch(
+        "aap_eda.wsapi.consumers.AnsibleRulebookConsumer."
+        "insert_job_related_data",
+        new_callable=AsyncMock,
+    ) as insert:
+        for payload in payloads:
+            await ws_communicator.send_json_to(payload)
+        await ws_communicator.wait()
+
+    assert [len(call.args[0]) for call in insert.call_args_list] == batches
+
+
+@pytest.mark.django_db(transaction=True)
+async def test_handle_jobs_before_actions(
+    ws_communicator: WebsocketCommunicator,
+    default_organization: models.Organization,
+):
+    rulebook_process_id = await _prepare_db_data(default_organization)
+    job_uuid = str(uuid.uuid4())
+    job = {
+        "type": "Job",
+        "job_id": job_uuid,
+        "ansible_rulebook_id": rulebook_process_id,
+        "name": "ansible.eda.hello",
+        "ruleset": "ruleset",
+        "rule": "rule",
+        "hosts": "hosts",
+        "action": "run_playbook",
+    }
+    action = create_action_payload(
+        str(uuid.uuid4()),
+        rulebook_process_id,
+        job_uuid,
+        str(uuid.uuid4()),
+        "2023-03-29T15:00:17.260803Z",
+        _matching_events(),
+    )
+
+    # The job is still pending when the action is written
+    with override_settings(WEBSOCKET_ACTION_BATCH_SIZE=1):
+        await ws_communicator.send_json_to(job)
+        await ws_communicator.send_json_to(action)
+        await ws_communicator.wait()
+
+    assert (await get_activation_instance_job_instance_count()) == 1
+    rule = await get_first_audit_rule()
+    assert rule.job_instance_id is not None
+
+
+@pytest.mark.django_db
+def test_insert_event_related_data_copies_rows(
+    django_assert_max_num_queries,
+):
+    job_uuid = str(uuid.uuid4())
+    messages = [
+        AnsibleEventMessage(
+            type="AnsibleEvent",
+            event={
+                "event": "runner_on_ok" if counter % 2 else "verbose",
+                "job_id": job_uuid,
+                "counter": counter,
+                "stdout": f"line {counter}",
+                "event_data": {
+                    "playbook": "site.yml",
+                    "play": "all",
+                    "task": f"task {counter}",
+                    "res": {"changed": counter % 4 == 1},
+                },
+            },
+        )
+        for counter in range(10000)
+    ]
+    messages.append(
+        AnsibleEventMessage(type="AnsibleEvent", event={"event": "verbose"})
+    )
+    insert_event_related_data = (
+        AnsibleRulebookConsumer.insert_event_related_data.__wrapped__
+    )
+
+    # One COPY per table, within a savepoint
+    with django_assert_max_num_queries(4):
+        insert_event_related_data(AnsibleRulebookConsumer(), messages)
+
+    events = models.JobInstanceEvent.objects.filter(job_uuid=job_uuid)
+    assert events.count() == 10000
+    assert events.get(counter=7).stdout == "line 7"
+    hosts = models.JobInstanceHost.objects.filter(job_uuid=job_uuid)
+    assert hosts.count() == 5000
+    assert hosts.filter(status="changed").count() == 2500
+    assert hosts.filter(task="task 3", status="ok").exists()
+
+
+@pytest.mark.django_db
+def test_insert_event_related_data_skips_malformed_events(eda_caplog):
+    job_uuid = str(uuid.uuid4())
+    good = {"event": "runner_on_ok", "job_id": job_uuid, "stdout": "ok"}
+    events = [
+        {**good, "counter": 1},
+        {**good, "job_id": "not-a-uuid", "counter": 2},
+        {**good, "counter": 2**40},
+        {**good, "counter": 3, "stdout": "nul \x00"},
+        {**good, "counter": "four"},
+        {**good, "counter": 5},
+    ]
+    messages = [
+        AnsibleEventMessage(type="AnsibleEvent", event=event)
+        for event in events
+    ]
+    insert_event_related_data = (
+        AnsibleRulebookConsumer.insert_event_related_data.__wrapped__
+    )
+
+    insert_event_related_data(AnsibleRulebookConsumer(), messages)
+
+    assert sorted(
+        models.JobInstanceEvent.objects.values_list("counter", flat=True)
+    ) == [1, 5]
+    assert models.JobInstanceHost.objects.count() == 2
+    assert eda_caplog.text.count("Skipping Ansible event") == 4
+
+
+@pytest.mark.django_db
+def test_insert_job_related_data_skips_malformed_jobs(
+    default_activation_instance: models.RulebookProcess,
+    eda_caplog,
+):
+    def job_message(job_id: str, name: str = "ansible.eda.hello"):
+        return JobMessage(
+            type="Job",
+            job_id=job_id,
+            ansible_rulebook_id=default_activation_instance.id,
+            name=name,
+            ruleset="ruleset",
+            rule="rule",
+            hosts="hosts",
+            action="run_playbook",
+        )
+
+    good_uuids = [str(uuid.uuid4()), str(uuid.uuid4())]
+    messages = [
+        job_message(good_uuids[0]),
+        job_message("not-a-uuid"),
+        job_message(str(uuid.uuid4()), name="nul \x00"),
+        job_message(good_uuids[1]),
+    ]
+    insert_job_related_data = (
+        AnsibleRulebookConsumer.insert_job_related_data.__wrapped__
+    )
+
+    insert_job_related_data(AnsibleRulebookConsumer(), messages)
+
+    assert sorted(
+        str(job_uuid)
+        for job_uuid in models.JobInstance.objects.values_list(
+            "uuid", flat=True
+        )
+    ) == sorted(good_uuids)
+    assert models.ActivationInstanceJobInstance.objects.count() == 2
+    assert eda_caplog.text.count("Skipping job") == 2
+
+
 @pytest.mark.django_db(transaction=True)
 async def test_handle_actions_multiple_firing(
     ws_communicator: WebsocketCommunicator,
@@ -400,6 +604,67 @@ async def test_rule_status_with_multiple_failed_actions(
     assert rule.status == "failed"
 
 
+@pytest.mark.django_db(transaction=True)
+async def test_handle_workers_msgpack(
+    preseed_credential_types,
+    default_organization: models.Organization,
+):
+    rulebook_process_id = await _prepare_db_data(default_organization)
+    communicator = WebsocketCommunicator(
+        AnsibleRulebookConsumer.as_asgi(),
+        "ws/",
+        subprotocols=["other", protocols.MSGPACK_SUBPROTOCOL],
+    )
+    connected, subprotocol = await communicator.connect()
+    assert connected
+    assert subprotocol == protocols.MSGPACK_SUBPROTOCOL
+
+    await communicator.send_to(
+        bytes_data=msgpack.packb(
+            {"type": "Worker", "activation_id": rulebook_process_id}
+        )
+    )
+    responses = []
+    while not responses or responses[-1]["type"] != "EndOfResponse":
+        frame = await communicator.receive_from(timeout=TIMEOUT)
+        responses.append(msgpack.unpackb(frame))
+    await communicator.disconnect()
+
+    assert [response["type"] for response in responses] == [
+        "ExtraVars",
+        "Rulebook",
+        "ControllerInfo",
+        "EndOfResponse",
+    ]
+    assert responses[0]["data"] == TEST_EXTRA_VAR.encode()
+    assert isinstance(responses[1]["data"], bytes)
+
+
+@pytest.mark.django_db(transaction=True)
+async def test_unknown_subprotocol_uses_json(
+    preseed_credential_types,
+    default_organization: models.Organization,
+    eda_caplog,
+):
+    rulebook_process_id = await _prepare_db_data(default_organization)
+    communicator = WebsocketCommunicator(
+        AnsibleRulebookConsumer.as_asgi(), "ws/", subprotocols=["other"]
+    )
+    connected, subprotocol = await communicator.connect()
+    assert connected
+    assert subprotocol is None
+
+    await communicator.send_to(text_data="{not json")
+    await communicator.send_json_to(
+        {"type": "Worker", "activation_id": rulebook_process_id}
+    )
+    response = await communicator.receive_json_from(timeout=TIMEOUT)
+    assert response["type"] == "ExtraVars"
+    await communicator.disconnect()
+
+    assert "Failed to decode message" in eda_caplog.text
+
+
 @pytest.mark.django_db(transaction=True)
 async def test_handle_heartbeat(
     ws_communicator: WebsocketCommunicator,
@@ -458,6 +723,11 @@ async def test_handle_heartbeat(
 
     await ws_communicator.wait()
 
+    # The first heartbeat is written through, the next ones are debounced
+    activation = await get_activation_by_rulebook_process(rulebook_process_id)
+    assert list(activation.ruleset_stats.keys()) == ["ruleset1"]
+    await database_sync_to_async(heartbeats.flush_heartbeats)()
+
     updated_rulebook_process = await get_rulebook_process(rulebook_process_id)
     assert (
         updated_rulebook_process.updated_at.strftime(DATETIME_FORMAT)
@@ -520,6 +790,34 @@ async def test_handle_heartbeat_running_status(
         mock_orchestrator.delay.assert_called_once()
 
 
+@pytest.mark.django_db(transaction=True)
+async def test_disconnect_schedules_monitor(
+    ws_communicator: WebsocketCommunicator,
+    default_organization: models.Organization,
+):
+    rulebook_process_id = await _prepare_db_data(default_organization)
+    activation = await get_activation_by_rulebook_process(rulebook_process_id)
+    payload = {
+        "type": "SessionStats",
+        "activation_id": rulebook_process_id,
+        "stats": {"ruleSetName": "ruleset1"},
+        "reported_at": timezone.now().strftime(DATETIME_FORMAT),
+    }
+
+    with patch(
+        "aap_eda.tasks.orchestrator.schedule_monitor"
+    ) as schedule_monitor:
+        await ws_communicator.send_json_to(payload)
+        assert await ws_communicator.receive_nothing(timeout=1)
+        schedule_monitor.assert_not_called()
+
+        await ws_communicator.disconnect()
+
+    schedule_monitor.assert_called_once_with(
+        enums.ProcessParentType.ACTIVATION, activation.id
+    )
+
+
 @pytest.mark.django_db(transaction=True)
 async def test_multiple_rules_for_one_event(
     ws_communicator: WebsocketCommunicator,
@@ -559,6 +857,218 @@ async def test_multiple_rules_for_one_event(
         assert await get_audit_event_action_count(event) == 2
 
 
+@pytest.mark.parametrize(
+    ("batch_size", "batches"),
+    [(100, [3]), (2, [2, 1])],
+)
+@pytest.mark.django_db(transaction=True)
+async def test_handle_actions_in_batches(
+    ws_communicator: WebsocketCommunicator,
+    default_organization: models.Organization,
+    batch_size,
+    batches,
+):
+    rulebook_process_id = await _prepare_db_data(default_organization)
+    payloads = [
+        create_action_payload(
+            str(uuid.uuid4()),
+            rulebook_process_id,
+            "",
+            str(uuid.uuid4()),
+            "2023-03-29T15:00:17.260803Z",
+            _matching_events(),
+        )
+        for _ in range(3)
+    ]
+
+    with override_settings(WEBSOCKET_ACTION_BATCH_SIZE=batch_size), patch(
+        "aap_eda.wsapi.consumers.AnsibleRulebookConsumer."
+        "insert_audit_rule_data",
+        new_callable=AsyncMock,
+    ) as insert:
+        for payload in payloads:
+            await ws_communicator.send_json_to(payload)
+        await ws_communicator.wait()
+
+    assert [len(call.args[0]) for call in insert.call_args_list] == batches
+    messages = [m for call in insert.call_args_list for m in call.args[0]]
+    assert [m.action_uuid for m in messages] == [
+        p["action_uuid"] for p in payloads
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+async def test_handle_actions_skips_malformed_message(
+    ws_communicator: WebsocketCommunicator,
+    default_organization: models.Organization,
+    eda_caplog,
+):
+    rulebook_process_id = await _prepare_db_data(default_organization)
+    payloads = [
+        create_action_payload(
+            str(uuid.uuid4()),
+            rulebook_process_id,
+            "",
+            rule_uuid,
+            "2023-03-29T15:00:17.260803Z",
+            _matching_events(),
+        )
+        for rule_uuid in (str(uuid.uuid4()), "not-a-uuid", str(uuid.uuid4()))
+    ]
+
+    with override_settings(WEBSOCKET_ACTION_BATCH_SIZE=3):
+        for payload in payloads:
+            await ws_communicator.send_json_to(payload)
+        await ws_communicator.wait()
+
+    assert await get_audit_rule_count() == 2
+    assert await get_audit_action_count() == 2
+    assert f"Skipping action {payloads[1]['action_uuid']}" in eda_caplog.text
+
+
+async def test_write_buffer_logs_failed_timed_flush(eda_caplog):
+    async def write_actions(messages):
+        raise RuntimeError("boom")
+
+    buffer = WriteBuffer(
+        write_actions,
+        "WEBSOCKET_ACTION_BATCH_SIZE",
+        "WEBSOCKET_ACTION_BATCH_DELAY_MS",
+    )
+    with override_settings(WEBSOCKET_ACTION_BATCH_DELAY_MS=0):
+        await buffer.add("message")
+        await buffer.flush_task
+
+    assert "Failed to write a batch with write_actions" in eda_caplog.text
+    assert len(buffer) == 0
+
+
+@pytest.mark.django_db
+def test_insert_audit_rule_data_queries_per_batch(
+    default_organization: models.Organization,
+):
+    rulebook_process_id = _prepare_db_data.func(default_organization)
+    job_instance = _prepare_job_instance.func()
+    consumer = AnsibleRulebookConsumer()
+    # The synchronous functions wrapped by database_sync_to_async
+    insert_audit_rule_data = (
+        AnsibleRulebookConsumer.insert_audit_rule_data.__wrapped__
+    )
+    context = AnsibleRulebookConsumer._load_activation_context.__wrapped__(
+        consumer, rulebook_process_id
+    )
+
+    def insert(count: int) -> list[str]:
+        rule_uuid = str(uuid.uuid4())
+        messages = [
+            ActionMessage.parse_obj(
+                create_action_payload(
+                    str(uuid.uuid4()),
+                    rulebook_process_id,
+                    str(job_instance.uuid),
+                    rule_uuid if i % 2 else str(uuid.uuid4()),
+                    "2023-03-29T15:00:17.260803Z",
+                    _matching_events(),
+                    "failed" if i == 3 else "successful",
+                )
+            )
+            for i in range(count)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            insert_audit_rule_data(
+                consumer, messages, {rulebook_process_id: context}
+            )
+        return [query["sql"] for query in queries]
+
+    first = insert(1)
+    steady = insert(20)
+    assert len(steady) == len(first) - 1
+    # Only new audit rules are looked up once the job instance is known
+    selects = [sql for sql in steady if sql.startswith("SELECT")]
+    assert len(selects) == 1
+    assert 'FROM "core_audit_rule"' in selects[0]
+
+    assert models.AuditAction.objects.count() == 21
+    assert models.AuditEvent.objects.count() == 42
+    # Odd actions share a rule, one of whose actions failed
+    assert models.AuditRule.objects.count() == 1 + 10 + 1
+    assert models.AuditRule.objects.filter(status="failed").count() == 1
+    assert not models.AuditRule.objects.filter(job_instance=None).exists()
+
+
+@pytest.mark.django_db
+def test_insert_audit_rule_data_matches_stored_rule(
+    default_organization: models.Organization,
+):
+    rulebook_process_id = _prepare_db_data.func(default_organization)
+    insert_audit_rule_data = (
+        AnsibleRulebookConsumer.insert_audit_rule_data.__wrapped__
+    )
+    rule_uuid = str(uuid.uuid4())
+
+    # The same fire time, sent by different connections
+    for rule_run_at in (
+        "2023-03-29T15:00:17.260803Z",
+        "2023-03-29T15:00:17.260803",
+        "2023-03-29T17:00:17.260803+02:00",
+        "2023-03-29T15:00:17.260803999Z",
+    ):
+        consumer = AnsibleRulebookConsumer()
+        context = AnsibleRulebookConsumer._load_activation_context.__wrapped__(
+            consumer, rulebook_process_id
+        )
+        message = ActionMessage.parse_obj(
+            create_action_payload(
+                str(uuid.uuid4()),
+                rulebook_process_id,
+                "",
+                rule_uuid,
+                rule_run_at,
+                _matching_events(),
+            )
+        )
+        insert_audit_rule_data(
+            consumer, [message], {rulebook_process_id: context}
+        )
+
+    assert models.AuditRule.objects.count() == 1
+    assert models.AuditAction.objects.count() == 4
+
+
+@pytest.mark.django_db(transaction=True)
+async def test_activation_context_is_cached(
+    default_organization: models.Organization,
+):
+    rulebook_process_id = await _prepare_db_data(default_organization)
+    activation = await get_activation_by_rulebook_process(rulebook_process_id)
+    consumer = AnsibleRulebookConsumer()
+
+    context = await consumer.get_activation_context(rulebook_process_id)
+    assert context.activation_id == activation.id
+    assert context.organization_id == default_organization.id
+    assert context.log_tracking_id == activation.log_tracking_id
+    assert context.aap_inputs == {}
+
+    with patch.object(
+        AnsibleRulebookConsumer, "_load_activation_context"
+    ) as load:
+        assert (
+            await consumer.get_activation_context(str(rulebook_process_id))
+            is context
+        )
+        load.assert_not_called()
+
+    consumer.invalidate_activation_context(rulebook_process_id)
+    reloaded = await consumer.get_activation_context(rulebook_process_id)
+    assert reloaded is not context
+
+    with override_settings(WEBSOCKET_ACTIVATION_CONTEXT_TTL_SECONDS=0):
+        assert (
+            await consumer.get_activation_context(rulebook_process_id)
+            is not reloaded
+        )
+
+
 job_url_test_data = [
     (
         "run_job_template",
@@ -1381,6 +1891,68 @@ async def test_get_controller_info_from_aap_cred(
     assert '"AAP" credential type not found' in eda_caplog.text
 
 
+def _wait_for_subscriber(client, channel: str) -> None:
+    deadline = time.monotonic() + TIMEOUT
+    while not sum(count for _, count in client.pubsub_numsub(channel)):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def _log_communicator(user, activation_instance_id: int):
+    communicator = WebsocketCommunicator(
+        ActivationInstanceLogConsumer.as_asgi(),
+        f"ws/activation-instances/{activation_instance_id}/logs",
+    )
+    communicator.scope["user"] = user
+    communicator.scope["url_route"] = {
+        "kwargs": {"id": activation_instance_id}
+    }
+    return communicator
+
+
+@pytest.mark.django_db(transaction=True)
+async def test_log_consumer_streams_logs(
+    admin_user: models.User,
+    default_activation_instance: models.RulebookProcess,
+    redis_external,
+):
+    instance_id = default_activation_instance.id
+    communicator = _log_communicator(admin_user, instance_id)
+    connected, _ = await communicator.connect(timeout=TIMEOUT)
+    assert connected
+
+    # The hub subscribes from its reader thread
+    channel = log_stream.channel_name(instance_id)
+    await asyncio.to_thread(_wait_for_subscriber, redis_external, channel)
+
+    await asyncio.to_thread(
+        log_stream.publish_logs, instance_id, [("hello", 1000, None)]
+    )
+
+    response = await communicator.receive_json_from(timeout=TIMEOUT)
+    assert response["type"] == "Logs"
+    assert response["logs"] == [
+        {"log": "hello", "log_timestamp": 1000, "log_created_at": None}
+    ]
+    await communicator.disconnect()
+    assert channel not in log_stream.hub.groups
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("authenticated", [True, False])
+async def test_log_consumer_rejects_user(
+    default_user: models.User,
+    default_activation_instance: models.RulebookProcess,
+    authenticated: bool,
+):
+    user = default_user if authenticated else AnonymousUser()
+    communicator = _log_communicator(user, default_activation_instance.id)
+
+    connected, _ = await communicator.connect(timeout=TIMEOUT)
+
+    assert not connected
+
+
 @database_sync_to_async
 def _prepare_credential(
     credential_type_inputs: dict,
@@ -0,0 +1,145 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from aap_eda.services.activation.capacity import WorkerCapacity, parse_memory
+from aap_eda.tasks import placement
+from aap_eda.tasks.orchestrator import QueueStatus
+
+GIB = 1024**3
+IMAGE = "quay.io/ansible/ansible-rulebook:main"
+
+
+def _queue(name, free_gib, running=0, images=(), total_gib=16):
+    return QueueStatus(
+        name=name,
+        live_workers=1,
+        running_processes=running,
+        capacity=WorkerCapacity(
+            total_memory=total_gib * GIB,
+            free_memory=free_gib * GIB,
+            cpus=4,
+            load=0.5,
+            images=frozenset(images),
+        ),
+    )
+
+
+REQUEST = placement.PlacementRequest(image_url=IMAGE, memory=GIB)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("200m", 200 * 1024**2),
+        ("1G", GIB),
+        ("512", 512),
+        ("64kb", 64 * 1024),
+        (None, None),
+        ("lots", None),
+    ],
+)
+def test_parse_memory(value, expected):
+    assert parse_memory(value) == expected
+
+
+def test_capacity_round_trip():
+    capacity = WorkerCapacity(
+        total_memory=GIB,
+        free_memory=GIB // 2,
+        cpus=2,
+        load=0.1,
+        images={IMAGE},
+    )
+    assert WorkerCapacity.from_json(capacity.to_json()) == capacity
+    with pytest.raises(ValueError):
+        WorkerCapacity.from_json("[]")
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("quay.io/ansible/de", "quay.io/ansible/de:latest"),
+        ("quay.io/ansible/de:1.0", "quay.io/ansible/de:1.0"),
+        ("localhost:5000/de", "localhost:5000/de:latest"),
+        ("quay.io/de@sha256:abc", "quay.io/de@sha256:abc"),
+    ],
+)
+def test_normalize_image(url, expected):
+    assert placement.normalize_image(url) == expected
+
+
+def test_least_busy_ignores_capacity():
+    queues = [_queue("small", 1, running=1), _queue("large", 12, running=2)]
+    strategy = placement.get_strategy("least-busy")
+    assert strategy.select(queues, REQUEST) == "small"
+
+
+def test_spread_picks_most_headroom():
+    queues = [_queue("small", 2), _queue("large", 12, running=3)]
+    strategy = placement.get_strategy("spread")
+    assert strategy.select(queues, REQUEST) == "large"
+
+
+def test_bin_pack_picks_fullest_fitting_node():
+    queues = [
+        _queue("full", 0.5),
+        _queue("tight", 2),
+        _queue("large", 12),
+    ]
+    strategy = placement.get_strategy("bin-pack")
+    assert strategy.select(queues, REQUEST) == "tight"
+
+
+@pytest.mark.parametrize("name", ["spread", "bin-pack"])
+def test_image_locality_preferred(name):
+    queues = [_queue("cold", 8), _queue("warm", 8, images=[IMAGE])]
+    strategy = placement.get_strategy(name)
+    assert strategy.select(queues, REQUEST) == "warm"
+
+
+def test_nothing_fits_still_placed():
+    queues = [_queue("a", 0.25, running=2), _queue("b", 0.25, running=1)]
+    strategy = placement.get_strategy("spread")
+    assert strategy.select(queues, REQUEST) == "b"
+
+
+def test_unknown_capacity_is_neutral():
+    queues = [
+        QueueStatus(name="unknown", live_workers=1),
+        _queue("busy", 1),
+    ]
+    strategy = placement.get_strategy("spread")
+    assert strategy.select(queues, REQUEST) == "unknown"
+
+
+def test_get_strategy_by_import_path():
+    strategy = placement.get_strategy(
+        "aap_eda.tasks.placement.BinPackStrategy"
+    )
+    assert isinstance(strategy, placement.BinPackStrategy)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "nearest",
+        "aap_eda.tasks.placement.least_busy",
+        "aap_eda.tasks.placement.PlacementStrategy",
+    ],
+)
+def test_get_strategy_invalid(name):
+    with pytest.raises(ImproperlyConfigured):
+        placement.get_strategy(name)
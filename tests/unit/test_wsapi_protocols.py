@@ -0,0 +1,90 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import base64
+import json
+
+import msgpack
+import pytest
+
+from aap_eda.wsapi import protocols
+from aap_eda.wsapi.messages import ControllerInfo, FileContentMessage, Rulebook
+
+
+def test_negotiate():
+    assert protocols.negotiate([]) is protocols.JSON_PROTOCOL
+    assert protocols.negotiate(["other"]) is protocols.JSON_PROTOCOL
+    assert (
+        protocols.negotiate(["other", protocols.MSGPACK_SUBPROTOCOL])
+        is protocols.MSGPACK_PROTOCOL
+    )
+
+
+def test_json_protocol():
+    message = Rulebook(data=base64.b64encode(b"- name: x\n").decode())
+    frame = protocols.JSON_PROTOCOL.encode(message)
+    assert json.loads(frame["text_data"]) == message.dict()
+
+    assert protocols.JSON_PROTOCOL.decode('{"a": 1}', None) == {"a": 1}
+    assert protocols.JSON_PROTOCOL.decode(None, b'{"a": 1}') == {"a": 1}
+
+
+def test_msgpack_protocol_sends_raw_payloads():
+    rulebook = "- name: é\n".encode()
+    frame = protocols.MSGPACK_PROTOCOL.encode(
+        Rulebook(data=base64.b64encode(rulebook).decode())
+    )
+    assert msgpack.unpackb(frame["bytes_data"]) == {
+        "type": "Rulebook",
+        "data": rulebook,
+    }
+
+    frame = protocols.MSGPACK_PROTOCOL.encode(
+        FileContentMessage(
+            template_key="cert",
+            data=base64.b64encode(b"\x00\xff").decode(),
+            data_format="binary",
+            eof=True,
+        )
+    )
+    data = msgpack.unpackb(frame["bytes_data"])
+    assert data["data"] == b"\x00\xff"
+    assert data["encoding"] is None
+    assert data["data_format"] == "binary"
+
+    info = ControllerInfo(url="https://aap", ssl_verify="yes", token="x")
+    frame = protocols.MSGPACK_PROTOCOL.encode(info)
+    assert msgpack.unpackb(frame["bytes_data"]) == info.dict()
+
+
+def test_msgpack_protocol_decode():
+    data = {"type": "Worker", "activation_id": 1}
+    assert protocols.MSGPACK_PROTOCOL.decode(None, msgpack.packb(data)) == (
+        data
+    )
+    assert protocols.MSGPACK_PROTOCOL.decode(json.dumps(data), None) == data
+
+
+@pytest.mark.parametrize(
+    ("protocol", "text_data", "bytes_data"),
+    [
+        (protocols.JSON_PROTOCOL, "{", None),
+        (protocols.JSON_PROTOCOL, None, None),
+        (protocols.MSGPACK_PROTOCOL, None, b"\xc1"),
+        (protocols.MSGPACK_PROTOCOL, None, msgpack.packb([1, 2])),
+        (protocols.MSGPACK_PROTOCOL, None, msgpack.packb({"a": 1}) + b"x"),
+    ],
+)
+def test_decode_invalid_frame(protocol, text_data, bytes_data):
+    with pytest.raises(protocols.ProtocolError):
+        protocol.decode(text_data, bytes_data)
@@ -0,0 +1,154 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Compare parsing webhook bodies as YAML with the JSON fast path.
+
+Uses payloads shaped like those sent by GitHub, Alertmanager and
+Dynatrace, e.g.:
+
+    EDA_MODE=development python \
+        tools/benchmarks/event_stream_body_benchmark.py --iterations 500
+"""
+import argparse
+import json
+import os
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aap_eda.settings.default")
+django.setup()
+
+import yaml  # noqa: E402
+
+from aap_eda.api.views.external_event_stream import (  # noqa: E402
+    ExternalEventStreamMixin,
+)
+
+GITHUB_PUSH = {
+    "ref": "refs/heads/main",
+    "before": "6113728f27ae82c7b1a177c8d03f9e96e0adf246",
+    "after": "59b20b8d5c6ff8d09518454d4dd8b7b30f095ab5",
+    "repository": {
+        "id": 186853002,
+        "name": "eda-server",
+        "full_name": "ansible/eda-server",
+        "private": False,
+        "owner": {"login": "ansible", "id": 1507452, "type": "Organization"},
+        "html_url": "https://github.com/ansible/eda-server",
+        "default_branch": "main",
+        "topics": ["ansible", "event-driven-automation"],
+    },
+    "pusher": {"name": "octocat", "email": "octocat@example.com"},
+    "sender": {"login": "octocat", "id": 583231, "site_admin": False},
+    "commits": [
+        {
+            "id": f"{i:040x}",
+            "message": f"Fix the flaky test number {i}\n\nSigned-off-by: x",
+            "timestamp": "2025-01-20T10:21:34+01:00",
+            "author": {"name": "Octo Cat", "email": "octocat@example.com"},
+            "added": [f"src/module_{i}.py"],
+            "removed": [],
+            "modified": ["README.md", f"tests/test_module_{i}.py"],
+        }
+        for i in range(20)
+    ],
+}
+
+ALERTMANAGER = {
+    "version": "4",
+    "groupKey": '{}:{alertname="HighCPU"}',
+    "status": "firing",
+    "receiver": "eda",
+    "groupLabels": {"alertname": "HighCPU"},
+    "commonLabels": {"alertname": "HighCPU", "severity": "critical"},
+    "commonAnnotations": {"summary": "CPU usage above 95%"},
+    "externalURL": "http://alertmanager.example.com:9093",
+    "alerts": [
+        {
+            "status": "firing",
+            "labels": {
+                "alertname": "HighCPU",
+                "instance": f"node-{i}.example.com:9100",
+                "job": "node",
+                "severity": "critical",
+            },
+            "annotations": {"description": f"node-{i} CPU is at 97.3%"},
+            "startsAt": "2025-01-20T09:15:00.000Z",
+            "endsAt": "0001-01-01T00:00:00Z",
+            "generatorURL": "http://prometheus.example.com:9090/graph",
+            "fingerprint": f"{i:016x}",
+        }
+        for i in range(10)
+    ],
+}
+
+DYNATRACE = {
+    "ProblemID": "P-250120123",
+    "PID": "-1234567890123456789_1737364500000V2",
+    "ProblemTitle": "Response time degradation",
+    "State": "OPEN",
+    "ProblemSeverity": "PERFORMANCE",
+    "ProblemImpact": "SERVICE",
+    "ProblemURL": "https://abc123.live.dynatrace.com/#problems/problemdetails",
+    "Tags": "env:prod, team:payments",
+    "ImpactedEntities": [
+        {
+            "type": "SERVICE",
+            "name": f"payments-api-{i}",
+            "entity": f"SERVICE-{i:016X}",
+        }
+        for i in range(5)
+    ],
+    "ProblemDetailsText": "Response time degraded by 250% " * 10,
+}
+
+PAYLOADS = {
+    "github": GITHUB_PUSH,
+    "alertmanager": ALERTMANAGER,
+    "dynatrace": DYNATRACE,
+}
+
+
+def parse_as_yaml(body: bytes):
+    """Parse the body the way it was before the JSON fast path."""
+    return yaml.safe_load(body.decode())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    view = ExternalEventStreamMixin()
+    for name, payload in PAYLOADS.items():
+        body = json.dumps(payload).encode()
+        assert view._parse_body("application/json", body) == payload
+
+        yaml_time = timeit.timeit(
+            lambda: parse_as_yaml(body), number=args.iterations
+        )
+        json_time = timeit.timeit(
+            lambda: view._parse_body("application/json", body),
+            number=args.iterations,
+        )
+        print(
+            f"{name:>12} ({len(body):6d} bytes): "
+            f"yaml {yaml_time / args.iterations * 1e6:9.1f} us, "
+            f"json {json_time / args.iterations * 1e6:7.1f} us, "
+            f"{yaml_time / json_time:6.1f}x faster"
+        )
+
+
+if __name__ == "__main__":
+    main()
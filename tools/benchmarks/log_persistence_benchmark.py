@@ -0,0 +1,150 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Compare rulebook process log persistence before and after COPY.
+
+Parses and writes -vv shaped ansible-rulebook log lines the way DBLogger
+did with strptime and bulk_create, and the way it does now. Run against
+the database configured for the EDA server, e.g.:
+
+    EDA_MODE=development python \
+        tools/benchmarks/log_persistence_benchmark.py --lines 50000
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aap_eda.settings.default")
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from django.utils.timezone import make_aware  # noqa: E402
+
+from aap_eda.core import models  # noqa: E402
+from aap_eda.core.models.utils import get_default_organization  # noqa: E402
+from aap_eda.core.utils.rulebook_process_logs import (  # noqa: E402
+    TIMESTAMP_PATTERNS,
+    extract_datetime_and_message_from_log_entry,
+)
+from aap_eda.services.activation.db_log_handler import DBLogger  # noqa: E402
+
+DATETIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S,%f",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S %f",
+)
+
+LINES = [
+    "2025-01-17 18:39:55,215 - ansible_rulebook.rule_set_runner - DEBUG - "
+    "Posting data to ruleset Long Running Range => {'i': 42}",
+    "** 2025-01-17 18:39:55.222773 [debug] **** ruleset: Long Running Range",
+    "2025-01-17 18:43:38 638 [main] DEBUG org.drools.ansible.rulebook."
+    "integration.api.RulesExecutor - Processing event",
+    "Ruleset: Long Running Range",
+]
+
+
+def extract_with_strptime(log_entry: str):
+    """Parse a line the way it was done before the fixed offsets."""
+    match = TIMESTAMP_PATTERNS.match(log_entry)
+    if not match:
+        return None, log_entry.strip()
+
+    groups = match.groups()
+    prefix = log_entry.startswith("** ")
+    timestamp_str = (
+        f"{groups[0]}-{groups[1]}-{groups[2]} "
+        f"{groups[3]}:{groups[4]}:{groups[5]}"
+        f"{'.' if prefix else ','}{groups[6].ljust(6, '0')}"
+    )
+    for fmt in DATETIME_FORMATS:
+        try:
+            dt = make_aware(datetime.strptime(timestamp_str, fmt))
+            break
+        except ValueError:
+            continue
+
+    message = log_entry[match.end() :].strip()
+    if message.startswith("- "):
+        message = message[2:]
+    return dt, message
+
+
+def write_with_bulk_create(process_id: int, lines: list[str]) -> None:
+    """Write the lines the way DBLogger did before COPY."""
+    log_timestamp = int(time.time())
+    buffer = []
+    for line in lines:
+        dt, message = extract_with_strptime(line)
+        buffer.append(
+            models.RulebookProcessLog(
+                log=message,
+                activation_instance_id=process_id,
+                log_timestamp=log_timestamp,
+                log_created_at=dt,
+            )
+        )
+        if len(buffer) == 100:
+            models.RulebookProcessLog.objects.bulk_create(buffer)
+            buffer = []
+    if buffer:
+        models.RulebookProcessLog.objects.bulk_create(buffer)
+
+
+def write_with_copy(process_id: int, lines: list[str]) -> None:
+    log_timestamp = int(time.time())
+    logger = DBLogger(process_id)
+    for line in lines:
+        logger.write(line, timestamp=False, log_timestamp=log_timestamp)
+    logger.flush()
+
+
+def rate(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return len(args[-1]) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=20000)
+    args = parser.parse_args()
+    lines = [LINES[i % len(LINES)] for i in range(args.lines)]
+
+    for name, func in (
+        ("strptime", extract_with_strptime),
+        ("fixed offsets", extract_datetime_and_message_from_log_entry),
+    ):
+        parsed = rate(lambda lines: [func(line) for line in lines], lines)
+        print(f"{'parse ' + name:>24}: {parsed:12.1f} lines/sec")
+
+    # Nothing is left in the database
+    with transaction.atomic():
+        process = models.RulebookProcess.objects.create(
+            name="log-persistence-benchmark",
+            organization=get_default_organization(),
+        )
+        for name, func in (
+            ("bulk_create", write_with_bulk_create),
+            ("COPY", write_with_copy),
+        ):
+            written = rate(func, process.id, lines)
+            print(f"{'write ' + name:>24}: {written:12.1f} lines/sec")
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Compare rulebook process log searches with and without trigram index.
+
+Loads rows spread over daily partitions and many rulebook processes,
+then times the searches of the logs endpoint and of the cross instance
+search, with the trigram index and with the sequential scan the log
+filter did before. Run against the database configured for the EDA
+server, e.g.:
+
+    EDA_MODE=development python \
+        tools/benchmarks/log_search_benchmark.py --rows 10000000
+"""
+import argparse
+import datetime
+import os
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aap_eda.settings.default")
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+
+from aap_eda.core import models  # noqa: E402
+from aap_eda.core.models.utils import get_default_organization  # noqa: E402
+from aap_eda.services import log_partitions  # noqa: E402
+
+# One rare line per this many rows
+RARE_EVERY = 100000
+
+LOAD_SQL = f"""
+INSERT INTO {log_partitions.TABLE}
+    (activation_instance_id, log, log_timestamp, log_created_at)
+SELECT
+    (%(process_ids)s::bigint[])[1 + i %% %(processes)s],
+    CASE
+        WHEN i %% {RARE_EVERY} = 0 THEN 'Unreachable host web-' || i
+        WHEN i %% 3 = 0 THEN 'ansible_rulebook.rule_set_runner - DEBUG - '
+            'Posting data to ruleset Long Running Range => {{''i'': '
+            || i || '}}'
+        WHEN i %% 3 = 1 THEN '[main] DEBUG org.drools.ansible.rulebook.'
+            'integration.api.RulesExecutor - Processing event ' || i
+        ELSE 'Ruleset: Long Running Range'
+    END,
+    (%(start)s + i * %(step)s)::bigint,
+    NULL
+FROM generate_series(0, %(rows)s - 1) AS i
+"""
+
+
+def load(process_ids: list[int], rows: int, days: int) -> float:
+    now = int(time.time())
+    start = now - days * log_partitions.DAY_SECONDS
+    with connection.cursor() as cursor:
+        began = time.perf_counter()
+        cursor.execute(
+            LOAD_SQL,
+            {
+                "process_ids": process_ids,
+                "processes": len(process_ids),
+                "rows": rows,
+                "start": start,
+                "step": (now - start) / rows,
+            },
+        )
+        elapsed = time.perf_counter() - began
+        cursor.execute(f"ANALYZE {log_partitions.TABLE}")
+    return rows / elapsed
+
+
+def latency(queryset, repeat: int, index: bool) -> float:
+    """Return the median milliseconds to fetch the first page."""
+    timings = []
+    with connection.cursor() as cursor:
+        for _ in range(repeat):
+            # Scoped to the savepoint, as the filter ran before the index
+            with transaction.atomic():
+                if not index:
+                    cursor.execute("SET LOCAL enable_bitmapscan = off")
+                began = time.perf_counter()
+                list(queryset[:20])
+                timings.append((time.perf_counter() - began) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--processes", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logs = models.RulebookProcessLog.objects.order_by("-id")
+    day_ago = int(time.time()) - log_partitions.DAY_SECONDS
+
+    # Nothing is left in the database
+    with transaction.atomic():
+        today = datetime.datetime.now(tz=datetime.timezone.utc).date()
+        log_partitions.create_partitions(
+            today - datetime.timedelta(days=args.days), args.days
+        )
+        organization = get_default_organization()
+        processes = models.RulebookProcess.objects.bulk_create(
+            [
+                models.RulebookProcess(
+                    name=f"log-search-benchmark-{i}",
+                    organization=organization,
+                )
+                for i in range(args.processes)
+            ]
+        )
+        process_id = processes[0].id
+        inserted = load(
+            [process.id for process in processes], args.rows, args.days
+        )
+        print(f"{'insert with index':>40}: {inserted:12.1f} rows/sec")
+
+        for name, queryset in (
+            (
+                "one instance, common",
+                logs.filter(
+                    activation_instance_id=process_id,
+                    log__icontains="processing event",
+                ),
+            ),
+            (
+                "all instances, rare",
+                logs.filter(log__icontains="unreachable host"),
+            ),
+            (
+                "all instances, rare, last day",
+                logs.filter(
+                    log__icontains="unreachable host",
+                    log_timestamp__gte=day_ago,
+                ),
+            ),
+            (
+                "all instances, missing",
+                logs.filter(log__icontains="no such line"),
+            ),
+        ):
+            for index in (False, True):
+                label = f"{name} ({'index' if index else 'scan'})"
+                elapsed = latency(queryset, args.repeat, index)
+                print(f"{label:>40}: {elapsed:12.1f} ms")
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Compare PG Notify throughput with and without the connection pool.
+
+Run against the database configured for the EDA server, e.g.:
+
+    EDA_MODE=development python tools/benchmarks/pg_notify_benchmark.py \
+        --events 2000 --threads 8
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aap_eda.settings.default")
+django.setup()
+
+import psycopg  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from aap_eda.services.pg_notify import (  # noqa: E402
+    PGNotify,
+    close_connection_pools,
+)
+
+CHANNEL = "eda_benchmark_pg_notify"
+EVENT = {
+    "payload": {"alert": "disk usage high", "host": "node-1", "value": 97},
+    "meta": {"endpoint": "/benchmark", "headers": {"X-Bench": "1"}},
+}
+
+
+def notify_per_call_connection(dsn: str) -> None:
+    """Publish the way PGNotify did before connections were pooled."""
+    with psycopg.connect(conninfo=dsn, autocommit=True) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"NOTIFY {CHANNEL}, $${json.dumps(EVENT)}$$;")
+
+
+def notify_pooled(dsn: str) -> None:
+    PGNotify(dsn, CHANNEL, EVENT)()
+
+
+def run(func, dsn: str, events: int, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: func(dsn), range(events)))
+    return events / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=settings.PG_NOTIFY_DSN_SERVER)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    for name, func in (
+        ("per-call connection", notify_per_call_connection),
+        ("pooled connection", notify_pooled),
+    ):
+        rate = run(func, args.dsn, args.events, args.threads)
+        print(f"{name:>20}: {rate:10.1f} events/sec")
+    close_connection_pools()
+
+
+if __name__ == "__main__":
+    main()
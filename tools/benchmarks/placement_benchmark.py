@@ -0,0 +1,132 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Simulate the rulebook process placement strategies over a fleet.
+
+Places activations with decision environment images of skewed popularity
+on a synthetic fleet of nodes of mixed sizes and reports, per strategy,
+the processes placed on nodes without enough memory, the image pulls,
+the nodes used and the spread of their memory utilization, e.g.:
+
+    EDA_MODE=development python \
+        tools/benchmarks/placement_benchmark.py --nodes 20 --processes 400
+"""
+import argparse
+import copy
+import logging
+import os
+import random
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aap_eda.settings.default")
+django.setup()
+
+from aap_eda.services.activation.capacity import WorkerCapacity  # noqa: E402
+from aap_eda.tasks import placement  # noqa: E402
+from aap_eda.tasks.orchestrator import QueueStatus  # noqa: E402
+
+MIB = 1024**2
+GIB = 1024**3
+
+
+def fleet(nodes: int, images: list[str], rng: random.Random) -> list:
+    queues = []
+    for i in range(nodes):
+        total = rng.choice([8, 16, 32]) * GIB
+        queues.append(
+            QueueStatus(
+                name=f"node-{i}",
+                live_workers=1,
+                capacity=WorkerCapacity(
+                    total_memory=total,
+                    free_memory=int(total * rng.uniform(0.6, 0.9)),
+                    cpus=rng.choice([2, 4, 8]),
+                    load=rng.uniform(0.0, 1.0),
+                    images=frozenset(rng.sample(images, 3)),
+                ),
+            )
+        )
+    return queues
+
+
+def workload(
+    processes: int, images: list[str], rng: random.Random
+) -> list[placement.PlacementRequest]:
+    # A few decision environments are used by most of the activations
+    weights = [1 / (rank + 1) for rank in range(len(images))]
+    return [
+        placement.PlacementRequest(
+            image_url=rng.choices(images, weights)[0],
+            memory=rng.choice([200, 512, 1024]) * MIB,
+        )
+        for _ in range(processes)
+    ]
+
+
+def simulate(strategy_name: str, queues: list, requests: list) -> None:
+    strategy = placement.get_strategy(strategy_name)
+    queues = copy.deepcopy(queues)
+    by_name = {queue.name: queue for queue in queues}
+    overcommitted = pulls = 0
+
+    started = time.perf_counter()
+    for request in requests:
+        queue = by_name[strategy.select(queues, request)]
+        if queue.capacity.free_memory < request.memory:
+            overcommitted += 1
+        if request.image_url not in queue.capacity.images:
+            pulls += 1
+        queue.add_process(request)
+    elapsed = time.perf_counter() - started
+
+    used = [queue for queue in queues if queue.running_processes]
+    utilization = [
+        1 - queue.capacity.free_memory / queue.capacity.total_memory
+        for queue in queues
+    ]
+    print(
+        f"{strategy_name:>10}: {overcommitted:4d} overcommitted, "
+        f"{pulls:4d} image pulls, {len(used):3d}/{len(queues)} nodes used, "
+        f"memory utilization max {max(utilization):5.0%} "
+        f"stdev {statistics.pstdev(utilization):5.1%}, "
+        f"{elapsed / len(requests) * 1e6:6.1f} us/placement"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=200)
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Overcommitting nodes is reported in the results
+    logging.getLogger(placement.__name__).setLevel(logging.ERROR)
+    rng = random.Random(args.seed)
+    images = [
+        f"quay.io/example/decision-environment-{i}:latest"
+        for i in range(args.images)
+    ]
+    queues = fleet(args.nodes, images, rng)
+    requests = workload(args.processes, images, rng)
+    for name in placement.STRATEGIES:
+        random.seed(args.seed)
+        simulate(name, queues, requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#  Copyright 2025 Red Hat, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""Compare the JSON and MessagePack ansible-rulebook websocket protocols.
+
+Measures the bytes on the wire and the time to decode the frames of a
+worker handshake and of streams of Action and Job messages, e.g.:
+
+    EDA_MODE=development python \
+        tools/benchmarks/websocket_protocol_benchmark.py --iterations 200
+"""
+import argparse
+import base64
+import os
+import timeit
+import uuid
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aap_eda.settings.default")
+django.setup()
+
+from pydantic import BaseModel  # noqa: E402
+
+from aap_eda.wsapi import protocols  # noqa: E402
+from aap_eda.wsapi.messages import (  # noqa: E402
+    ActionMessage,
+    ControllerInfo,
+    EndOfResponse,
+    EnvVars,
+    ExtraVars,
+    FileContentMessage,
+    JobMessage,
+    Rulebook,
+)
+
+RULEBOOK = "\n".join(
+    f"""- name: ruleset {i}
+  hosts: all
+  sources:
+    - ansible.eda.webhook:
+        host: 0.0.0.0
+        port: {5000 + i}
+  rules:
+    - name: rule {i}
+      condition: event.payload.status == "firing"
+      action:
+        run_job_template:
+          name: remediate
+          organization: Default
+"""
+    for i in range(20)
+)
+
+
+def b64(content: bytes) -> str:
+    return base64.b64encode(content).decode()
+
+
+def handshake() -> list[BaseModel]:
+    return [
+        ExtraVars(data=b64(b"var_1: value\nvar_2: [1, 2, 3]\n" * 20)),
+        Rulebook(data=b64(RULEBOOK.encode())),
+        ControllerInfo(
+            url="https://controller.example.com/api/",
+            ssl_verify="yes",
+            token="t" * 40,
+        ),
+        FileContentMessage(
+            template_key="eda.filename.cert",
+            data=b64(os.urandom(4096)),
+            data_format="binary",
+            eof=True,
+        ),
+        EnvVars(data=b64(b"API_TOKEN: secret\nREGION: us-east-1\n")),
+        EndOfResponse(),
+    ]
+
+
+def actions(count: int) -> list[BaseModel]:
+    return [
+        ActionMessage(
+            type="Action",
+            action="run_job_template",
+            action_uuid=str(uuid.uuid4()),
+            activation_id=1,
+            run_at="2025-01-20T10:21:34.123456Z",
+            ruleset="ruleset 1",
+            ruleset_uuid=str(uuid.uuid4()),
+            rule="rule 1",
+            rule_uuid=str(uuid.uuid4()),
+            matching_events={
+                "m_0": {
+                    "payload": {"status": "firing", "host": f"node-{i}"},
+                    "meta": {
+                        "uuid": str(uuid.uuid4()),
+                        "received_at": "2025-01-20T10:21:34.000000Z",
+                        "source": {"name": "webhook", "type": "webhook"},
+                    },
+                }
+            },
+            status="successful",
+            url="https://controller.example.com/#/jobs/1",
+            rule_run_at="2025-01-20T10:21:34.123456Z",
+            job_template_name="remediate",
+            organization="Default",
+            job_id=str(uuid.uuid4()),
+            rc=0,
+        )
+        for i in range(count)
+    ]
+
+
+def jobs(count: int) -> list[BaseModel]:
+    return [
+        JobMessage(
+            type="Job",
+            job_id=str(uuid.uuid4()),
+            ansible_rulebook_id=1,
+            name="remediate",
+            ruleset="ruleset 1",
+            rule="rule 1",
+            hosts="all",
+            action="run_job_template",
+        )
+        for _ in range(count)
+    ]
+
+
+def frame_size(frame: dict) -> int:
+    if "text_data" in frame:
+        return len(frame["text_data"].encode())
+    return len(frame["bytes_data"])
+
+
+def compare(name: str, messages: list[BaseModel], iterations: int) -> None:
+    for protocol in (protocols.JSON_PROTOCOL, protocols.MSGPACK_PROTOCOL):
+        frames = [protocol.encode(message) for message in messages]
+        size = sum(frame_size(frame) for frame in frames)
+        elapsed = timeit.timeit(
+            lambda: [
+                protocol.decode(
+                    frame.get("text_data"), frame.get("bytes_data")
+                )
+                for frame in frames
+            ],
+            number=iterations,
+        )
+        label = protocol.subprotocol or "json"
+        print(
+            f"{name:>10} {label:>15}: {len(frames):4d} frames, "
+            f"{size:8d} bytes, "
+            f"decode {elapsed / iterations * 1e6:9.1f} us"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=100)
+    args = parser.parse_args()
+
+    compare("handshake", handshake(), args.iterations)
+    compare("actions", actions(args.messages), args.iterations)
+    compare("jobs", jobs(args.messages), args.iterations)
+
+
+if __name__ == "__main__":
+    main()